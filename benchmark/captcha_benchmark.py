@@ -0,0 +1,116 @@
+"""
+验证码识别基准测试，回放 CAPTCHA_CORPUS_DIR 采集的样本，统计识别成功率、耗时与内存。
+
+用法:
+    python -m benchmark.captcha_benchmark --corpus data/captcha_corpus [--repeat 3] [--tolerance 4] [--json result.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from common.captcha_corpus import CaptchaCorpus
+from common.captcha_solver import CaptchaSolver
+from common.metrics import percentile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def run(corpus_dir: str, repeat: int = 1, tolerance: float = 4) -> dict[str, Any]:
+    """
+    回放样本并统计结果
+
+    :param corpus_dir: 样本目录
+    :param repeat: 每个样本重复识别次数（用于稳定耗时统计）
+    :param tolerance: 与服务端已通过的滑动距离的允许误差（像素）
+    :return: 统计结果
+    """
+    samples = 0
+    answered = 0
+    # 服务端验证通过的样本（有正确答案）
+    labeled = 0
+    correct = 0
+    # 服务端验证未通过、且识别结果与当时提交结果一致的样本（已知错误）
+    known_wrong = 0
+    durations: list[float] = []
+    memory_peaks: list[int] = []
+
+    tracemalloc.start()
+    for sample in CaptchaCorpus.load(corpus_dir):
+        samples += 1
+        offset = None
+        for _ in range(max(1, repeat)):
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            offset = CaptchaSolver.identify_offset(sample.get("jigsawImageBase64"), sample.get("originalImageBase64"))
+            durations.append((time.perf_counter() - start) * 1000)
+            memory_peaks.append(tracemalloc.get_traced_memory()[1])
+
+        if offset is not None:
+            answered += 1
+
+        submitted_x = sample.get("submittedX")
+        if sample.get("verified") is True and submitted_x is not None:
+            labeled += 1
+            if offset is not None and abs(offset - submitted_x) <= tolerance:
+                correct += 1
+        elif sample.get("verified") is False and submitted_x is not None:
+            if offset is not None and abs(offset - submitted_x) <= tolerance:
+                known_wrong += 1
+    tracemalloc.stop()
+    durations.sort()
+
+    return {
+        "samples": samples,
+        "answered": answered,
+        "answerRate": answered / samples if samples else 0.0,
+        "labeled": labeled,
+        "correct": correct,
+        "successRate": correct / labeled if labeled else 0.0,
+        "knownWrong": known_wrong,
+        "solveMs": {
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": max(durations, default=0.0),
+            "mean": statistics.fmean(durations) if durations else 0.0,
+        },
+        "pythonPeakKiB": max(memory_peaks, default=0) / 1024,
+        # Linux 下 ru_maxrss 单位为 KiB
+        "maxRssKiB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="验证码识别基准测试")
+    parser.add_argument("--corpus", default=str(CaptchaCorpus.capture_dir() or "data/captcha_corpus"),
+                        help="样本目录")
+    parser.add_argument("--repeat", type=int, default=1, help="每个样本重复识别次数")
+    parser.add_argument("--tolerance", type=float, default=4, help="允许误差（像素）")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    result = run(args.corpus, args.repeat, args.tolerance)
+
+    print(f"样本数: {result['samples']}, 给出答案: {result['answered']} ({result['answerRate']:.1%})")
+    print(f"有标注样本: {result['labeled']}, 识别正确: {result['correct']} ({result['successRate']:.1%}), "
+          f"已知错误: {result['knownWrong']}")
+    print(f"识别耗时(ms): p50 {result['solveMs']['p50']:.2f}, p95 {result['solveMs']['p95']:.2f}, "
+          f"max {result['solveMs']['max']:.2f}")
+    print(f"Python 内存峰值: {result['pythonPeakKiB']:.1f} KiB, 进程 RSS 峰值: {result['maxRssKiB']} KiB")
+
+    if args.json_path:
+        with open(file=args.json_path, mode="w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=4)
+
+    if result["samples"] == 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
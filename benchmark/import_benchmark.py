@@ -0,0 +1,118 @@
+"""
+启动耗时基准测试，在全新的 Python 子进程中导入指定模块，统计冷启动导入耗时、导入后的进程 RSS，
+以及导入后已加载的重量级依赖（验证码、AI、邮件相关的依赖应在首次使用时才加载）。
+
+用法:
+    python -m benchmark.import_benchmark [--modules main,service.login,common.utils] [--repeat 5] [--json result.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+
+# 默认测试的模块（main 对应 --single 与定时任务的启动）
+DEFAULT_MODULES: tuple[str, ...] = ("main", "service.login", "common.utils")
+
+# 需要跟踪是否被加载的重量级依赖
+HEAVY_MODULES: tuple[str, ...] = ("cv2", "numpy", "openai", "httpx", "Crypto", "smtplib", "email.mime")
+
+# 子进程中执行的脚本: 导入模块并输出耗时、RSS 与已加载的重量级依赖
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+if sys.argv[1]:
+    __import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:  # Windows
+    max_rss = None
+print(json.dumps({
+    "seconds": elapsed,
+    "maxRssKiB": max_rss,
+    "loaded": [name for name in json.loads(sys.argv[2]) if name in sys.modules],
+}))
+"""
+
+
+def measure_once(module: str) -> dict[str, Any]:
+    """
+    在全新的子进程中导入一次模块
+
+    :param module: 模块名称，空字符串表示只启动解释器（基线）
+    :return: 导入耗时、RSS 与已加载的重量级依赖
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, module, json.dumps(HEAVY_MODULES)],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str, repeat: int) -> dict[str, Any]:
+    """
+    多次测量模块的冷启动导入
+
+    :param module: 模块名称
+    :param repeat: 测量次数
+    :return: 统计结果
+    """
+    samples = [measure_once(module) for _ in range(repeat)]
+    seconds = [sample["seconds"] for sample in samples]
+    rss = [sample["maxRssKiB"] for sample in samples if sample["maxRssKiB"] is not None]
+    return {
+        "medianSeconds": statistics.median(seconds),
+        "minSeconds": min(seconds),
+        "maxRssKiB": int(statistics.median(rss)) if rss else None,
+        "loadedHeavyModules": samples[-1]["loaded"],
+    }
+
+
+def run(modules: list[str] = None, repeat: int = 5) -> dict[str, Any]:
+    """
+    执行基准测试
+
+    :param modules: 测试的模块列表
+    :param repeat: 每个模块的测量次数
+    :return: 统计结果
+    """
+    baseline = measure("", repeat)
+    result: dict[str, Any] = {"baseline": baseline, "modules": {}}
+    for module in modules or DEFAULT_MODULES:
+        item = measure(module, repeat)
+        # 相对于空解释器增加的内存
+        if item["maxRssKiB"] is not None and baseline["maxRssKiB"] is not None:
+            item["rssIncreaseKiB"] = item["maxRssKiB"] - baseline["maxRssKiB"]
+        result["modules"][module] = item
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="测试的模块，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块的测量次数")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    result = run(modules, args.repeat)
+
+    print(f"空解释器: RSS {result['baseline']['maxRssKiB']} KiB")
+    for module, item in result["modules"].items():
+        print(f"{module}: 导入耗时 中位数 {item['medianSeconds'] * 1000:.1f} ms, 最小 {item['minSeconds'] * 1000:.1f} ms, "
+              f"RSS {item['maxRssKiB']} KiB (+{item.get('rssIncreaseKiB')} KiB), "
+              f"已加载: {', '.join(item['loadedHeavyModules']) or '无'}")
+
+    if args.json_path:
+        with open(file=args.json_path, mode="w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+"""
+本地模拟工学云服务端，实现脚本使用的接口（验证码、登陆、实习计划、签到、周报、月报）以及兼容 OpenAI 的对话接口，
+支持配置响应延迟与错误注入，用于在不请求真实服务端的情况下进行压测。
+
+验证码接口返回按脚本识别算法可识别的拼图图片，登陆接口返回与真实服务端相同格式（AES 加密的十六进制）的登陆信息；
+token 超过有效期后接口返回 401，用于测试重新登陆流程。
+
+用法:
+    python -m benchmark.mock_server [--port 9000] [--latency-ms 50] [--jitter-ms 20] [--error-rate 0.01]
+                                    [--captcha-fail-rate 0.1] [--token-ttl 0] [--ai-latency-ms 500]
+
+    脚本中设置 MOGUDING_BASE_URL="http://127.0.0.1:9000"，AI_BASE_URL="http://127.0.0.1:9000/v1" 即可使用模拟服务端。
+"""
+import argparse
+import base64
+import json
+import random
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+from Crypto.Util.Padding import unpad
+
+from common.constant import Constant
+from common.signing import Signing
+
+# 拼图图片尺寸与拼图块边长（识别算法只识别面积在 1600~2500 之间的白色轮廓）
+IMAGE_WIDTH = 310
+IMAGE_HEIGHT = 155
+PIECE_SIZE = 45
+# 预生成的验证码图片数量
+CAPTCHA_POOL_SIZE = 32
+# 滑动距离允许误差（像素）
+CAPTCHA_TOLERANCE = 3
+
+
+@dataclass
+class MockConfig:
+    """
+    模拟服务端配置
+    """
+    # 平均响应延迟（毫秒）
+    latency_ms: float = 0.0
+    # 响应延迟的随机波动范围（毫秒）
+    jitter_ms: float = 0.0
+    # 返回 HTTP 500 的比例
+    error_rate: float = 0.0
+    # 验证码验证失败的比例（识别正确时）
+    captcha_fail_rate: float = 0.0
+    # token 有效期（秒），0表示不过期
+    token_ttl: float = 0.0
+    # AI 对话接口的响应延迟（毫秒）
+    ai_latency_ms: float = 0.0
+
+
+class MockState:
+    """
+    模拟服务端的数据: 验证码、token、实习计划与报告提交记录
+    """
+
+    def __init__(self, config: MockConfig) -> None:
+        self.config = config
+        self.lock = threading.Lock()
+        # 验证码 token → {"secretKey", "x", "verified"}
+        self.captchas: dict[str, dict[str, Any]] = {}
+        # 客户端标识 → 最近获取的验证码 token
+        self.client_captchas: dict[str, str] = {}
+        # 登陆 token → {"phone", "issuedAt"}
+        self.tokens: dict[str, dict[str, Any]] = {}
+        # 手机号 → 用户数据 {"userId", "planId", "reports": {"week": [...], "month": [...]}}
+        self.accounts: dict[str, dict[str, Any]] = {}
+        # 请求计数: 接口 → 次数
+        self.request_counts: dict[str, int] = {}
+        # 预生成的验证码图片: (滑块图片, 拼图图片, 缺口x坐标)
+        self.captcha_pool: list[tuple[str, str, int]] = [self.generate_captcha() for _ in range(CAPTCHA_POOL_SIZE)]
+        # 实习计划时间（所有模拟用户相同）
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.plan_start = today - timedelta(days=today.weekday() + 28)
+        self.plan_end = self.plan_start + timedelta(days=180) - timedelta(seconds=1)
+
+    @staticmethod
+    def encode_image(image: np.ndarray) -> str:
+        _, buffer = cv2.imencode(".png", image)
+        return "data:image/png;base64," + base64.b64encode(buffer.tobytes()).decode("utf-8")
+
+    @classmethod
+    def generate_captcha(cls) -> tuple[str, str, int]:
+        """
+        生成一组拼图验证码图片，拼图块与缺口使用白色描边，背景亮度低于描边
+
+        :return: (滑块图片, 拼图图片, 缺口x坐标)
+        """
+        x = random.randint(PIECE_SIZE + 10, IMAGE_WIDTH - PIECE_SIZE - 5)
+        y = random.randint(5, IMAGE_HEIGHT - PIECE_SIZE - 5)
+
+        # 背景拼图: 随机噪点（亮度不超过200），缺口为白色描边
+        original = np.random.randint(0, 200, (IMAGE_HEIGHT, IMAGE_WIDTH, 3), dtype=np.uint8)
+        cv2.rectangle(original, (x, y), (x + PIECE_SIZE - 1, y + PIECE_SIZE - 1), (255, 255, 255), 2)
+
+        # 滑块图片: 与拼图同高，拼图块位于相同的y坐标
+        jigsaw = np.zeros((IMAGE_HEIGHT, PIECE_SIZE + 4, 3), dtype=np.uint8)
+        cv2.rectangle(jigsaw, (1, y), (PIECE_SIZE, y + PIECE_SIZE - 1), (255, 255, 255), 2)
+
+        return cls.encode_image(jigsaw), cls.encode_image(original), x
+
+    def count(self, path: str) -> None:
+        with self.lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+    def account(self, phone: str) -> dict[str, Any]:
+        with self.lock:
+            account = self.accounts.get(phone)
+            if account is None:
+                account = self.accounts[phone] = {
+                    "userId": uuid.uuid4().hex,
+                    "planId": uuid.uuid4().hex,
+                    "reports": {"week": [], "month": []},
+                }
+            return account
+
+    def check_token(self, token: str | None) -> dict[str, Any] | None:
+        """
+        校验登陆 token
+
+        :return: 用户数据，token 无效或过期返回None
+        """
+        with self.lock:
+            info = self.tokens.get(token or "")
+            if info is None:
+                return None
+            if self.config.token_ttl and time.time() - info.get("issuedAt") > self.config.token_ttl:
+                self.tokens.pop(token, None)
+                return None
+        return self.account(info.get("phone"))
+
+    def weeks(self) -> list[dict[str, Any]]:
+        """
+        实习计划中已开始的周（与服务端一致，按时间倒序）
+
+        :return: 周列表
+        """
+        now = datetime.now()
+        weeks = []
+        start = self.plan_start
+        number = 1
+        while start <= now and start < self.plan_end:
+            end = start + timedelta(days=7) - timedelta(seconds=1)
+            weeks.append({
+                "weeks": f"第{number}周",
+                "startTime": start.strftime("%Y-%m-%d %H:%M:%S"),
+                "endTime": end.strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            start += timedelta(days=7)
+            number += 1
+        return weeks[::-1]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    模拟服务端请求处理（HTTP/1.1 长连接）
+    """
+    protocol_version = "HTTP/1.1"
+    state: MockState
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, data: dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def delay(self, latency_ms: float) -> None:
+        config = self.state.config
+        delay = latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def do_GET(self) -> None:
+        self.dispatch()
+
+    def do_POST(self) -> None:
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        path = self.path.split("?")[0]
+        data = self.read_json()
+        handler = ROUTES.get(path)
+        self.state.count(path)
+
+        if handler is None:
+            self.send_json({"code": 404, "msg": "not found"}, 404)
+            return
+
+        config = self.state.config
+        self.delay(config.ai_latency_ms if path == "/v1/chat/completions" else config.latency_ms)
+
+        # 错误注入
+        if random.random() < config.error_rate:
+            self.send_json({"code": 500, "msg": "injected error"}, 500)
+            return
+
+        self.send_json(handler(self, data))
+
+    def current_account(self) -> dict[str, Any] | None:
+        return self.state.check_token(self.headers.get("Authorization"))
+
+    def captcha_get(self, data: dict[str, Any]) -> dict[str, Any]:
+        jigsaw, original, x = random.choice(self.state.captcha_pool)
+        token = uuid.uuid4().hex
+        secret_key = secrets.token_hex(8)
+        with self.state.lock:
+            self.state.captchas[token] = {"secretKey": secret_key, "x": x, "verified": False}
+            self.state.client_captchas[data.get("clientUid") or ""] = token
+        return {"code": 200, "msg": "success", "data": {
+            "token": token,
+            "secretKey": secret_key,
+            "jigsawImageBase64": jigsaw,
+            "originalImageBase64": original,
+        }}
+
+    def captcha_check(self, data: dict[str, Any]) -> dict[str, Any]:
+        with self.state.lock:
+            captcha = self.state.captchas.get(data.get("token") or "")
+        if captcha is None:
+            return {"code": 6110, "msg": "验证码已失效，请重新获取"}
+
+        try:
+            point = json.loads(unpad(Signing.cipher(captcha.get("secretKey")).decrypt(
+                base64.b64decode(data.get("pointJson") or "")), 16))
+            offset = float(point.get("x"))
+        except (ValueError, TypeError, KeyError):
+            return {"code": 6111, "msg": "验证失败"}
+
+        if abs(offset - captcha.get("x")) > CAPTCHA_TOLERANCE or random.random() < self.state.config.captcha_fail_rate:
+            with self.state.lock:
+                self.state.captchas.pop(data.get("token"), None)
+            return {"code": 6111, "msg": "验证失败"}
+
+        with self.state.lock:
+            captcha["verified"] = True
+        return {"code": 200, "msg": "success", "data": {"token": data.get("token"), "result": True}}
+
+    def login(self, data: dict[str, Any]) -> dict[str, Any]:
+        # 登陆请求需要使用获取验证码时的客户端标识，且验证码已验证通过
+        with self.state.lock:
+            captcha_token = self.state.client_captchas.pop(data.get("uuid") or "", None)
+            captcha = self.state.captchas.pop(captcha_token, None) if captcha_token else None
+        if not captcha or not captcha.get("verified"):
+            return {"code": 6110, "msg": "验证码已失效，请重新获取"}
+
+        try:
+            captcha_text = unpad(Signing.cipher(captcha.get("secretKey")).decrypt(
+                base64.b64decode(data.get("captcha") or "")), 16).decode("utf-8")
+            phone = unpad(Signing.cipher(Constant.AES_ENCRYPT_SECRET_KEY).decrypt(
+                bytes.fromhex(data.get("phone") or "")), 16).decode("utf-8")
+        except ValueError:
+            return {"code": 500, "msg": "参数错误"}
+        if not captcha_text.startswith(captcha_token + "---"):
+            return {"code": 6111, "msg": "验证码错误"}
+
+        account = self.state.account(phone)
+        token = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.tokens[token] = {"phone": phone, "issuedAt": time.time()}
+
+        login_info = {
+            "token": token,
+            "userId": account.get("userId"),
+            "roleKey": "student",
+            "phone": phone,
+            "nikeName": phone,
+        }
+        return {"code": 200, "msg": "success", "data": Signing.aes_encrypt(json.dumps(login_info))}
+
+    def plan(self, data: dict[str, Any]) -> dict[str, Any]:
+        account = self.current_account()
+        if account is None:
+            return {"code": 401, "msg": "token失效"}
+        return {"code": 200, "msg": "success", "data": [{
+            "planId": account.get("planId"),
+            "planName": "模拟实习计划",
+            "startTime": self.state.plan_start.strftime("%Y-%m-%d %H:%M:%S"),
+            "endTime": self.state.plan_end.strftime("%Y-%m-%d %H:%M:%S"),
+        }]}
+
+    def clock_save(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self.current_account() is None:
+            return {"code": 401, "msg": "token失效"}
+        return {"code": 200, "msg": "success", "data": {"attendanceId": uuid.uuid4().hex}}
+
+    def weeks(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self.current_account() is None:
+            return {"code": 401, "msg": "token失效"}
+        return {"code": 200, "msg": "success", "data": self.state.weeks()}
+
+    def report_list(self, data: dict[str, Any]) -> dict[str, Any]:
+        account = self.current_account()
+        if account is None:
+            return {"code": 401, "msg": "token失效"}
+        with self.state.lock:
+            reports = list(account.get("reports").get(data.get("reportType"), []))
+        return {"code": 200, "msg": "success", "data": reports[:int(data.get("pageSize") or 25)],
+                "flag": len(reports)}
+
+    def report_save(self, data: dict[str, Any]) -> dict[str, Any]:
+        account = self.current_account()
+        if account is None:
+            return {"code": 401, "msg": "token失效"}
+
+        report_type = data.get("reportType")
+        if report_type == "week":
+            report = {"weeks": data.get("weeks"), "startTime": data.get("startTime"), "endTime": data.get("endTime")}
+        elif report_type == "month":
+            report = {"yearmonth": data.get("yearmonth")}
+        else:
+            return {"code": 500, "msg": "参数错误"}
+
+        report.update(reportId=uuid.uuid4().hex, title=data.get("title"),
+                      createTime=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        with self.state.lock:
+            # 提交列表按时间倒序
+            account.get("reports").get(report_type).insert(0, report)
+        return {"code": 200, "msg": "success", "data": {"reportId": report.get("reportId")}}
+
+    def chat_completions(self, data: dict[str, Any]) -> dict[str, Any]:
+        content = "本周主要完成了岗位相关的日常工作，按计划推进各项任务，并总结了工作中遇到的问题与改进方法。"
+        return {
+            "id": "chatcmpl-" + uuid.uuid4().hex,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": data.get("model") or "mock",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+# 接口路径 → 处理函数
+ROUTES: dict[str, Callable[[MockHandler, dict[str, Any]], dict[str, Any]]] = {
+    "/session/captcha/v1/get": MockHandler.captcha_get,
+    "/session/captcha/v1/check": MockHandler.captcha_check,
+    "/session/user/v6/login": MockHandler.login,
+    "/practice/plan/v4/getPlanByStu": MockHandler.plan,
+    "/attendence/clock/v4/save": MockHandler.clock_save,
+    "/practice/paper/v3/getWeeks1": MockHandler.weeks,
+    "/practice/paper/v2/listByStu": MockHandler.report_list,
+    "/practice/paper/v6/save": MockHandler.report_save,
+    "/v1/chat/completions": MockHandler.chat_completions,
+}
+
+
+class MockServer:
+    """
+    模拟服务端，可在当前进程的后台线程中运行
+    """
+
+    def __init__(self, config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.state = MockState(config)
+        handler = type("BoundMockHandler", (MockHandler,), {"state": self.state})
+        ThreadingHTTPServer.request_queue_size = 1024
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockServer":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    添加模拟服务端配置参数（benchmark.throughput_benchmark 共用）
+    """
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="平均响应延迟(毫秒)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="响应延迟的随机波动范围(毫秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 HTTP 500 的比例")
+    parser.add_argument("--captcha-fail-rate", type=float, default=0.0, help="验证码验证失败的比例")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="token 有效期(秒)，0表示不过期")
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="AI 对话接口的响应延迟(毫秒)")
+
+
+def config_from_arguments(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                      captcha_fail_rate=args.captcha_fail_rate, token_ttl=args.token_ttl,
+                      ai_latency_ms=args.ai_latency_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟工学云服务端")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=9000, help="监听端口")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(config_from_arguments(args), args.host, args.port)
+    print(f"模拟服务端已启动: {server.base_url}", flush=True)
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
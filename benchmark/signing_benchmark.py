@@ -0,0 +1,124 @@
+"""
+请求加密与签名微基准测试，对比每次新建加密器、重新计算签名的方式与 Signing 缓存方式的单次耗时。
+
+用法:
+    python -m benchmark.signing_benchmark [--number 20000] [--repeat 5] [--json result.json]
+"""
+import argparse
+import binascii
+import hashlib
+import json
+import time
+import timeit
+from typing import Any, Callable
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+from common.constant import Constant
+from common.signing import Signing
+
+# 模拟的用户登陆信息
+USER_LOGIN_INFO: dict[str, Any] = {
+    "loginInfo": {"userId": "1234567890abcdef", "roleKey": "student", "token": "token"},
+    "planInfo": {"planId": "fedcba0987654321"},
+}
+PHONE = "13800138000"
+PASSWORD = "your_password"
+
+
+def legacy_aes_encrypt(input_string: str, key: bytes = Constant.AES_ENCRYPT_SECRET_KEY) -> str:
+    # 每次调用新建加密器（原 Utils.aes_encrypt 的实现）
+    cipher = AES.new(key, AES.MODE_ECB)
+    return binascii.hexlify(cipher.encrypt(pad(input_string.encode("utf-8"), AES.block_size))).decode("utf-8").upper()
+
+
+def legacy_md5(data: str) -> str:
+    return hashlib.md5(data.encode("utf-8")).hexdigest()
+
+
+def legacy_timestamp() -> str:
+    return legacy_aes_encrypt(str(int(time.time() * 1000)))
+
+
+def legacy_list_request() -> tuple[str, str]:
+    # 获取提交列表: t + Sign
+    login_info = USER_LOGIN_INFO.get("loginInfo")
+    return legacy_timestamp(), legacy_md5(login_info.get("userId") + login_info.get("roleKey") + "week"
+                                          + Constant.MD5_SALT)
+
+
+def signing_list_request() -> tuple[str, str]:
+    return Signing.timestamp(), Signing.report_list_sign(USER_LOGIN_INFO, "week")
+
+
+def legacy_login_request() -> tuple[str, str, str]:
+    # 登陆: 手机号、密码、t
+    return legacy_aes_encrypt(PHONE), legacy_aes_encrypt(PASSWORD), legacy_timestamp()
+
+
+def signing_login_request() -> tuple[str, str, str]:
+    return Signing.aes_encrypt_static(PHONE), Signing.aes_encrypt_static(PASSWORD), Signing.timestamp()
+
+
+# 基准测试用例: 名称 → (原实现, Signing 实现)
+CASES: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+    "timestamp": (legacy_timestamp, Signing.timestamp),
+    "listRequest": (legacy_list_request, signing_list_request),
+    "loginRequest": (legacy_login_request, signing_login_request),
+}
+
+
+def measure(func: Callable[[], Any], number: int, repeat: int) -> float:
+    """
+    测量单次调用耗时（取多轮中的最小值）
+
+    :return: 单次耗时（微秒）
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1_000_000
+
+
+def run(number: int = 20000, repeat: int = 5) -> dict[str, Any]:
+    """
+    执行基准测试
+
+    :param number: 每轮调用次数
+    :param repeat: 轮数
+    :return: 统计结果
+    """
+    # 校验两种实现结果一致
+    assert legacy_aes_encrypt(PHONE) == Signing.aes_encrypt(PHONE)
+    assert legacy_list_request()[1] == signing_list_request()[1]
+
+    result: dict[str, Any] = {}
+    for name, (legacy, signing) in CASES.items():
+        legacy_us = measure(legacy, number, repeat)
+        signing_us = measure(signing, number, repeat)
+        result[name] = {
+            "legacyUs": legacy_us,
+            "signingUs": signing_us,
+            "speedup": legacy_us / signing_us if signing_us else 0.0,
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="请求加密与签名微基准测试")
+    parser.add_argument("--number", type=int, default=20000, help="每轮调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="轮数")
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    result = run(args.number, args.repeat)
+
+    for name, item in result.items():
+        print(f"{name}: 原实现 {item['legacyUs']:.2f} us, Signing {item['signingUs']:.2f} us, "
+              f"加速 {item['speedup']:.2f}x")
+
+    if args.json_path:
+        with open(file=args.json_path, mode="w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+端到端吞吐量基准测试，生成 N 个模拟用户的 users.json，在子进程中启动 benchmark.mock_server，
+通过 ScheduledTask.task 执行一轮或多轮任务，统计吞吐量、用户耗时与请求耗时的尾延迟、进程 RSS 峰值与线程数峰值。
+
+第一轮需要登陆（验证码识别、登陆、获取实习计划），之后的轮次复用已保存的 token。
+所有数据（登陆信息、报告、日志、指标）写入临时目录，不影响 data/ 与 log/。
+
+用法:
+    python -m benchmark.throughput_benchmark [--users 200] [--rounds 2] [--mode thread] [--workers 32]
+                                             [--tasks signIn,weeklyReport] [--latency-ms 50] [--error-rate 0.01]
+                                             [--server-url http://127.0.0.1:9000] [--json result.json]
+
+    月报任务在连续提交多个月份时每次间隔60秒，压测时一般不包含 monthlyReport。
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any
+
+import main as app
+from benchmark.mock_server import MockConfig, MockServer, add_config_arguments, config_from_arguments
+from common.constant import Constant
+from common.logger_manager import LoggerManager
+from common.schedule_index import ScheduleIndex
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def serve_mock(config: MockConfig, connection: Connection) -> None:
+    """
+    在子进程中运行模拟服务端，避免与被测脚本争用 GIL
+    """
+    server = MockServer(config)
+    connection.send(server.base_url)
+    server.server.serve_forever()
+
+
+def build_users(count: int, tasks: list[str], now: datetime) -> list[dict[str, Any]]:
+    """
+    生成在当前整点需要执行指定任务的模拟用户
+
+    :param count: 用户数量
+    :param tasks: 任务名称列表
+    :param now: 当前时间
+    :return: 用户配置信息列表
+    """
+    time_setting: dict[str, Any] = {}
+    if ScheduleIndex.TASK_SIGN_IN in tasks:
+        time_setting["signInTime"] = {"start": str(now.hour), "end": str((now.hour + 1) % 24)}
+    if ScheduleIndex.TASK_WEEKLY_REPORT in tasks:
+        time_setting["weeklyReportTime"] = {"week": str(now.isoweekday()), "time": str(now.hour)}
+    if ScheduleIndex.TASK_MONTHLY_REPORT in tasks:
+        time_setting["monthlyReportTime"] = {"day": str(now.day), "time": str(now.hour)}
+
+    return [{
+        "username": f"bench-{index:05d}",
+        "email": "",
+        "phone": f"139{index:08d}",
+        "password": "benchmark",
+        "configInfo": {
+            "jobSetting": {"post": "软件开发"},
+            "timeSetting": time_setting,
+            "addressSetting": {
+                "country": "中国", "province": "北京市", "city": "北京市", "area": "海淀区",
+                "address": "北京市海淀区", "longitude": "116.3", "latitude": "39.9",
+            },
+        },
+    } for index in range(count)]
+
+
+def prepare_environment(work_dir: Path, base_url: str, mode: str, workers: int) -> None:
+    """
+    将脚本的配置、数据与日志指向临时目录和模拟服务端
+    """
+    os.environ.update({
+        "MOGUDING_BASE_URL": base_url,
+        "AI_BASE_URL": base_url + "/v1",
+        "AI_API_KEY": "benchmark",
+        "AI_MODEL": "benchmark",
+        "EXECUTION_MODE": mode,
+        "TASK_MAX_WORKERS": str(workers),
+        "SCHEDULE_JITTER_SECONDS": "0",
+        "WEEKLY_SUBMIT_INTERVAL": "0",
+        "LOGIN_INFO_STORE": "sqlite",
+        "LOGIN_INFO_DB_PATH": str(work_dir / "users_login_info.db"),
+        "REPORT_CONTENT_DB_PATH": str(work_dir / "report_content.db"),
+        "REPORT_LEDGER_DB_PATH": str(work_dir / "report_ledger.db"),
+        "METRICS_DIR": str(work_dir / "metrics"),
+    })
+    Constant.load_env()
+    app.USERS_PATH = work_dir / "users.json"
+    LoggerManager.LOG_BASE_DIR = work_dir / "log"
+
+
+class ThreadMonitor:
+    """
+    后台采样进程的线程数，记录峰值
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.peak = threading.active_count()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name="thread-monitor", daemon=True)
+
+    def loop(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> "ThreadMonitor":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+
+def summarize_round(summary: dict[str, Any], elapsed: float) -> dict[str, Any]:
+    """
+    从本轮运行的指标汇总中提取吞吐量与尾延迟
+
+    :param summary: run_summary.json 的内容
+    :param elapsed: 本轮耗时（秒）
+    :return: 本轮统计结果
+    """
+    histograms: dict[str, list[dict[str, Any]]] = summary.get("histograms", {})
+
+    user_latency = {}
+    for item in histograms.get("moguding_user_run_duration_seconds", []):
+        if item.get("labels", {}).get("result") == "success":
+            user_latency = {key: item.get(key) for key in ("p50", "p95", "p99", "max")}
+
+    request_latency = {
+        item.get("labels", {}).get("endpoint"): {key: item.get(key) for key in ("count", "p50", "p95", "p99")}
+        for item in histograms.get("moguding_request_duration_seconds", [])
+    }
+
+    return {
+        "users": summary.get("users"),
+        "succeeded": summary.get("succeeded"),
+        "failed": summary.get("failed"),
+        "elapsedSeconds": elapsed,
+        "usersPerSecond": summary.get("users", 0) / elapsed if elapsed else 0.0,
+        "userLatencySeconds": user_latency,
+        "requestLatencySeconds": request_latency,
+    }
+
+
+def run(users: int = 200, rounds: int = 2, mode: str = "thread", workers: int = 32,
+        tasks: list[str] = None, config: MockConfig = None, server_url: str = None) -> dict[str, Any]:
+    """
+    执行基准测试
+
+    :param users: 模拟用户数量
+    :param rounds: 执行轮数
+    :param mode: 任务执行模式，thread 或 async
+    :param workers: 线程池大小（TASK_MAX_WORKERS）
+    :param tasks: 每个用户执行的任务名称列表
+    :param config: 模拟服务端配置（未指定 server_url 时在子进程中启动）
+    :param server_url: 已启动的模拟服务端地址
+    :return: 统计结果
+    """
+    tasks = tasks or [ScheduleIndex.TASK_SIGN_IN]
+    process: multiprocessing.Process | None = None
+    if not server_url:
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=serve_mock, args=(config or MockConfig(), sender), daemon=True)
+        process.start()
+        server_url = receiver.recv()
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="throughput-benchmark-") as temp_dir:
+            work_dir = Path(temp_dir)
+            prepare_environment(work_dir, server_url, mode, workers)
+            with open(file=app.USERS_PATH, mode="w", encoding="utf-8") as file:
+                json.dump({"users": build_users(users, tasks, datetime.now())}, file, ensure_ascii=False)
+
+            round_results = []
+            with ThreadMonitor() as monitor:
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    app.ScheduledTask.task()
+                    elapsed = time.perf_counter() - start
+                    with open(file=work_dir / "metrics/run_summary.json", encoding="utf-8") as file:
+                        round_results.append(summarize_round(json.load(file), elapsed))
+
+            # 等待日志写入完成后再删除临时目录
+            LoggerManager.get_system_logger().complete()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+
+    return {
+        "users": users,
+        "mode": mode,
+        "workers": workers,
+        "tasks": tasks,
+        "rounds": round_results,
+        "peakThreads": monitor.peak,
+        # Linux 下 ru_maxrss 单位为 KiB
+        "maxRssKiB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="端到端吞吐量基准测试")
+    parser.add_argument("--users", type=int, default=200, help="模拟用户数量")
+    parser.add_argument("--rounds", type=int, default=2, help="执行轮数（第一轮包含登陆）")
+    parser.add_argument("--mode", choices=("thread", "async"), default="thread", help="任务执行模式")
+    parser.add_argument("--workers", type=int, default=32, help="线程池大小（TASK_MAX_WORKERS）")
+    parser.add_argument("--tasks", default=ScheduleIndex.TASK_SIGN_IN,
+                        help="每个用户执行的任务，逗号分隔: signIn,weeklyReport,monthlyReport")
+    parser.add_argument("--server-url", help="已启动的模拟服务端地址，不指定时在子进程中启动")
+    add_config_arguments(parser)
+    parser.add_argument("--json", dest="json_path", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    tasks = [task.strip() for task in args.tasks.split(",") if task.strip()]
+    result = run(args.users, args.rounds, args.mode, args.workers, tasks, config_from_arguments(args),
+                 args.server_url)
+
+    print(f"用户数: {result['users']}, 模式: {result['mode']}, 线程池: {result['workers']}, "
+          f"任务: {','.join(result['tasks'])}")
+    for index, item in enumerate(result["rounds"], start=1):
+        latency = item["userLatencySeconds"]
+        print(f"第{index}轮: 成功 {item['succeeded']}, 失败 {item['failed']}, 耗时 {item['elapsedSeconds']:.2f}s, "
+              f"吞吐量 {item['usersPerSecond']:.1f} 用户/s, 用户耗时(s) p50 {latency.get('p50', 0):.3f}, "
+              f"p95 {latency.get('p95', 0):.3f}, p99 {latency.get('p99', 0):.3f}")
+    print(f"线程数峰值: {result['peakThreads']}, 进程 RSS 峰值: {result['maxRssKiB']} KiB")
+
+    if args.json_path:
+        with open(file=args.json_path, mode="w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+class AIClientManager:
+    """
+    进程内共享的AI客户端管理，按 (base_url, api_key) 复用同一个 OpenAI 客户端及其连接池，
+    并限制同时进行中的请求数量，避免大量报告同时生成时向AI服务商建立过多连接。
+    """
+    _CLIENTS: dict[tuple[str, str], "OpenAI"] = {}
+    _CLIENTS_LOCK = threading.Lock()
+
+    # 同时进行中的请求数量限制
+    _SEMAPHORE: threading.BoundedSemaphore | None = None
+    _SEMAPHORE_LOCK = threading.Lock()
+
+    @staticmethod
+    def max_concurrency() -> int:
+        """
+        获取同时进行中的AI请求数量上限
+
+        :return: 请求数量上限
+        """
+        return max(1, int(os.getenv("AI_MAX_CONCURRENCY", "8")))
+
+    @staticmethod
+    def timeout() -> float:
+        """
+        获取单次AI请求的超时时间（秒）
+
+        :return: 超时时间
+        """
+        return float(os.getenv("AI_TIMEOUT", "120"))
+
+    @classmethod
+    def get_client(cls, base_url: str, api_key: str) -> "OpenAI":
+        """
+        获取AI客户端，不存在时创建
+
+        :param base_url: AI服务基础URL
+        :param api_key: AI服务API密钥
+        :return: AI客户端
+        """
+        key = (base_url, api_key)
+        client = cls._CLIENTS.get(key)
+        if client is None:
+            with cls._CLIENTS_LOCK:
+                client = cls._CLIENTS.get(key)
+                if client is None:
+                    # OpenAI SDK 导入较慢，首次创建客户端时再导入
+                    import httpx
+                    from openai import DefaultHttpxClient, OpenAI
+
+                    max_concurrency = cls.max_concurrency()
+                    client = OpenAI(
+                        base_url=base_url,
+                        api_key=api_key,
+                        timeout=cls.timeout(),
+                        # 连接池大小与请求数量上限一致
+                        http_client=DefaultHttpxClient(limits=httpx.Limits(
+                            max_connections=max_concurrency,
+                            max_keepalive_connections=max_concurrency,
+                        )),
+                    )
+                    cls._CLIENTS[key] = client
+        return client
+
+    @classmethod
+    @contextmanager
+    def slot(cls) -> Iterator[None]:
+        """
+        占用一个AI请求名额，名额用尽时等待
+        """
+        if cls._SEMAPHORE is None:
+            with cls._SEMAPHORE_LOCK:
+                if cls._SEMAPHORE is None:
+                    cls._SEMAPHORE = threading.BoundedSemaphore(cls.max_concurrency())
+
+        with cls._SEMAPHORE:
+            yield
+
+    @classmethod
+    def close(cls) -> None:
+        """
+        关闭所有AI客户端
+        """
+        with cls._CLIENTS_LOCK:
+            for client in cls._CLIENTS.values():
+                client.close()
+            cls._CLIENTS.clear()
+
+
+if __name__ == '__main__':
+    pass
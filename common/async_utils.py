@@ -0,0 +1,199 @@
+import asyncio
+import os
+import ssl
+import threading
+import time
+from typing import Any, Coroutine
+
+import httpx
+
+from common.constant import Constant
+from common.http_transport import HttpTransport
+from common.metrics import Metrics
+from common.rate_limiter import RateLimiter
+from common.retry_policy import CircuitBreaker, RetryBudget, RetryPolicy, response_status
+
+
+class SharedAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    用户客户端使用的传输层，请求交给共享连接池发送。
+    关闭用户客户端时不会关闭共享连接池，连接保留供其他用户复用。
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # 仅解除对共享连接池的引用
+        pass
+
+
+class AsyncUtils:
+    # 共享的 SSL 上下文，避免每个用户的客户端重复加载证书
+    _SSL_CONTEXT: ssl.SSLContext | None = None
+    # 事件循环 → 共享连接池（连接绑定在创建它的事件循环上，同一个事件循环中的所有用户共享）
+    _TRANSPORTS: dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+    _TRANSPORTS_LOCK = threading.Lock()
+
+    @classmethod
+    def get_transport(cls) -> httpx.AsyncHTTPTransport:
+        """
+        获取当前事件循环共享的连接池，连接池大小与同步模式一致（HTTP_POOL_MAXSIZE）
+
+        :return: 连接池
+        """
+        loop = asyncio.get_running_loop()
+        with cls._TRANSPORTS_LOCK:
+            transport = cls._TRANSPORTS.get(loop)
+            if transport is None:
+                if cls._SSL_CONTEXT is None:
+                    cls._SSL_CONTEXT = ssl.create_default_context()
+                transport = cls._TRANSPORTS[loop] = httpx.AsyncHTTPTransport(
+                    verify=cls._SSL_CONTEXT,
+                    # 与同步模式一致: 不限制并发连接数，最多保持 HTTP_POOL_MAXSIZE 个空闲连接
+                    limits=httpx.Limits(max_connections=None,
+                                        max_keepalive_connections=int(os.getenv("HTTP_POOL_MAXSIZE", "32"))),
+                    # 重试由 AsyncUtils.send_request 统一处理
+                    retries=0,
+                )
+            return transport
+
+    @classmethod
+    async def close_transport(cls) -> None:
+        """
+        关闭当前事件循环共享的连接池
+        """
+        with cls._TRANSPORTS_LOCK:
+            transport = cls._TRANSPORTS.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+    @classmethod
+    def run(cls, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        """
+        在新的事件循环中运行协程，结束后关闭该事件循环的共享连接池
+
+        :param coroutine: 协程
+        :return: 协程的返回值
+        """
+        async def main() -> Any:
+            try:
+                return await coroutine
+            finally:
+                await cls.close_transport()
+
+        return asyncio.run(main())
+
+    @classmethod
+    def create_client(cls) -> httpx.AsyncClient:
+        """
+        创建用户的异步HTTP客户端，只保存用户自身的请求头与cookie，底层连接池由同一事件循环中的所有用户共享
+
+        :return: 异步HTTP客户端
+        """
+        connect_timeout, read_timeout = HttpTransport.timeout()
+        return httpx.AsyncClient(transport=SharedAsyncTransport(cls.get_transport()), headers=Constant.HEADERS,
+                                 timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+
+    @staticmethod
+    async def send_request(request_class_config: dict[str, Any], url: str,
+                           method: str = "get", data: dict = None,
+                           response_type: str = "json", raise_for_status: bool = True, retries: int = None,
+                           delay: float = None) -> httpx.Response | dict:
+        """ 异步发送请求，支持重试机制，行为与 Utils.send_request 一致 """
+        # 获取logger
+        logger = request_class_config.get("logger")
+        # 获取业务异常
+        business_exception = request_class_config.get("business_exception")
+        # 获取异步客户端
+        client: httpx.AsyncClient = request_class_config.get("session")
+
+        # 确保 method 是小写
+        method = method.lower()
+
+        # 确定请求方法
+        if method not in ["get", "post", "put", "delete"]:
+            logger.error(f"不支持的 HTTP 方法: {method}")
+            raise business_exception
+
+        # 接口重试策略、全局重试预算、主机熔断器、接口分组限流器
+        policy = RetryPolicy.for_url(url, retries, delay)
+        budget = RetryBudget.get_instance()
+        breaker = CircuitBreaker.for_url(url)
+        limiter = RateLimiter.for_url(url)
+        budget.deposit()
+
+        # 发送请求并处理异常
+        for attempt in range(1, policy.retries + 1):
+            # 熔断打开时直接失败
+            if not breaker.allow():
+                logger.error(f"请求失败, 失败url: {url}, 失败原因: 服务暂时不可用, 熔断中")
+                Metrics.record_request(url, "circuit_open")
+                raise business_exception
+
+            # 等待限流名额（不占用线程），等待期间被取消时释放熔断器的探测名额
+            try:
+                await limiter.acquire_async()
+            except BaseException:
+                breaker.release_probe()
+                raise
+            start = time.perf_counter()
+            error: Exception | None = None
+            recorded = False
+            try:
+                # 根据方法发送请求
+                if method == "get":
+                    response = await client.request(method, url, params=data)  # GET 请求的参数通过 params 传递
+                else:
+                    response = await client.request(method, url, json=data)  # POST、PUT、DELETE 请求的参数通过 json 传递
+
+                # 非2xx抛出
+                if raise_for_status:
+                    response.raise_for_status()
+
+                # 根据类型返回值
+                result = response.json() if response_type.lower() == "json" else response
+
+                breaker.record_success()
+                recorded = True
+                Metrics.record_request(url, response.status_code, time.perf_counter() - start)
+                return result
+
+            except (httpx.HTTPError, ValueError) as e:
+                error = e
+                breaker.record_error(e)
+                recorded = True
+                Metrics.record_request(url, response_status(e) or type(e).__name__, time.perf_counter() - start)
+                logger.error(f"请求失败, 失败url: {url}, 失败原因: {e} (尝试 {attempt}/{policy.retries})")
+                if not policy.is_retryable(e):
+                    logger.error(f"请求失败, 失败url: {url}, 请求不可重试, 请求失败！")
+                    raise business_exception
+            finally:
+                # 释放限流名额，并根据耗时与结果调整并发上限
+                limiter.release(time.perf_counter() - start, error)
+                # 熔断器未记录结果时（请求被取消或出现其他异常）释放探测名额
+                if not recorded:
+                    breaker.release_probe()
+
+            # 如果已经到达最大重试次数，则抛出业务异常
+            if attempt == policy.retries:
+                logger.error(f"请求失败, 失败url: {url}, 超过最大重试次数, 请求失败！")
+                raise business_exception
+
+            # 全局重试预算耗尽时不再重试
+            if not budget.withdraw():
+                logger.error(f"请求失败, 失败url: {url}, 重试预算已耗尽, 请求失败！")
+                raise business_exception
+
+            # 否则退避后重试（不占用线程）
+            Metrics.record_retry(url)
+            await asyncio.sleep(policy.backoff(attempt))
+
+        raise business_exception
+
+
+if __name__ == '__main__':
+    pass
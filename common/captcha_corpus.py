@@ -0,0 +1,76 @@
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class CaptchaCorpus:
+    """
+    验证码样本库。设置环境变量 CAPTCHA_CORPUS_DIR 后，登陆时会将每个验证码的
+    滑块图片、背景图片、识别出的滑动距离以及服务端的验证结果保存为一个 JSON 文件，
+    供 benchmark.captcha_benchmark 离线回放，对比识别算法的成功率与耗时。
+    """
+
+    @staticmethod
+    def capture_dir() -> Path | None:
+        """
+        获取样本保存目录，未配置时返回None（不保存）
+
+        :return: 样本保存目录
+        """
+        corpus_dir = os.getenv("CAPTCHA_CORPUS_DIR")
+        return Path(corpus_dir) if corpus_dir else None
+
+    @classmethod
+    def capture(cls, captcha_data: dict[str, Any], slider_auth_data_str: str | None,
+                verify_res: dict[str, Any] | None) -> None:
+        """
+        保存一个验证码样本，未开启采集时不做任何处理；保存失败不影响登陆流程
+
+        :param captcha_data: 获取验证码请求的响应数据
+        :param slider_auth_data_str: 提交的滑动验证数据（未加密），识别失败为None
+        :param verify_res: 验证请求的响应数据，未提交验证时为None
+        """
+        corpus_dir = cls.capture_dir()
+        if corpus_dir is None:
+            return
+
+        data: dict[str, Any] = captcha_data.get("data") or {}
+        sample: dict[str, Any] = {
+            "capturedAt": time.time(),
+            "jigsawImageBase64": data.get("jigsawImageBase64"),
+            "originalImageBase64": data.get("originalImageBase64"),
+            # 提交的滑动距离，识别失败为None
+            "submittedX": json.loads(slider_auth_data_str).get("x") if slider_auth_data_str else None,
+            # 服务端验证结果: True 通过, False 未通过, None 未提交
+            "verified": None if verify_res is None else verify_res.get("code") == 200,
+            "verifyCode": None if verify_res is None else verify_res.get("code"),
+        }
+
+        try:
+            corpus_dir.mkdir(parents=True, exist_ok=True)
+            path = corpus_dir / f"{int(sample['capturedAt'] * 1000)}-{uuid.uuid4().hex[:8]}.json"
+            with open(file=path, mode="w", encoding="utf-8") as file:
+                json.dump(sample, file, ensure_ascii=False)
+        except OSError:
+            pass
+
+    @staticmethod
+    def load(corpus_dir: str | Path) -> Iterator[dict[str, Any]]:
+        """
+        按文件名顺序读取样本
+
+        :param corpus_dir: 样本目录
+        :return: 样本迭代器
+        """
+        for path in sorted(Path(corpus_dir).glob("*.json")):
+            with open(file=path, encoding="utf-8") as file:
+                sample = json.load(file)
+            sample["path"] = str(path)
+            yield sample
+
+
+if __name__ == '__main__':
+    pass
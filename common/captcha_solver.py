@@ -0,0 +1,74 @@
+from common.utils import Utils
+
+
+class CaptchaSolver:
+    """
+    滑块验证码识别
+    """
+
+    @staticmethod
+    def identify(jigsaw_image_base64: str, original_image_base64: str) -> tuple[int, float] | None:
+        """
+        识别滑块需要滑动的距离，并给出识别结果的置信度。
+
+        置信度由两部分组成:
+        滑块与拼图缺口的y值完全一致时为1，误差1、2像素时依次递减；
+        识别出的候选轮廓越多，结果越不确定，按候选数量等比降低。
+
+        :param jigsaw_image_base64: 滑块图片（Base64）
+        :param original_image_base64: 背景拼图图片（Base64）
+        :return: (滑动距离, 置信度 0-1)，识别失败返回None
+        """
+        # 获取滑块图像信息
+        slider_data: dict = Utils.picture_identify(Utils.decode_base64_image(jigsaw_image_base64))
+
+        # 获取拼图图像信息
+        jigsaw_data: dict = Utils.picture_identify(Utils.decode_base64_image(original_image_base64))
+
+        # 判断数据是否为空
+        if not slider_data or not jigsaw_data:
+            return None
+
+        # 滑块图形y值
+        slider_data_y: int = list(slider_data.keys())[0]
+        # 候选轮廓数量
+        candidate_count = len(slider_data) * len(jigsaw_data)
+
+        # 判断滑块值与拼图值是否相等，相等直接返回需要滑动的距离
+        if slider_data_y in jigsaw_data.keys():
+            return jigsaw_data.get(slider_data_y), 1.0 / candidate_count
+
+        # 如果不相等，进行范围判断（正负3的范围）
+        for jigsaw_slider_key in jigsaw_data.keys():
+            distance = abs(jigsaw_slider_key - slider_data_y)
+            if distance < 3:
+                return jigsaw_data.get(jigsaw_slider_key), (3 - distance) / 3 / candidate_count
+
+        # 识别失败
+        return None
+
+    @classmethod
+    def identify_offset(cls, jigsaw_image_base64: str, original_image_base64: str) -> int | None:
+        """
+        识别滑块需要滑动的距离（整数部分）。
+
+        :param jigsaw_image_base64: 滑块图片（Base64）
+        :param original_image_base64: 背景拼图图片（Base64）
+        :return: 滑动距离，识别失败返回None
+        """
+        result = cls.identify(jigsaw_image_base64, original_image_base64)
+        return result[0] if result else None
+
+    @staticmethod
+    def build_slider_auth_data(offset: int) -> str:
+        """
+        根据滑动距离构建滑动验证数据（未加密），距离附加随机小数部分。
+
+        :param offset: 滑动距离
+        :return: 滑动验证数据
+        """
+        return '{{"x":{},"y":5}}'.format(Utils.generate_random_float(offset))
+
+
+if __name__ == '__main__':
+    pass
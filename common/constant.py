@@ -1,3 +1,4 @@
+import os
 from typing import Any
 
 
@@ -8,7 +9,18 @@ class Constant:
     # 常量请求头
     HEADERS: dict[str, Any] = {"User-Agent": "Dart/2.17 (dart:io)"}
     # 工学云请求参数
-    BASE_URL: str = "https://api.moguding.net:9000"
+    DEFAULT_BASE_URL: str = "https://api.moguding.net:9000"
+    BASE_URL: str = DEFAULT_BASE_URL
     MD5_SALT: str = "3478cbbc33f84bd00d75d7dfa69e0daa"
     AES_ENCRYPT_SECRET_KEY: bytes = b"23DbtQHR2UMbH6mJ"
     AES_ENCRYPT_BASE64_SECRET_KEY: bytes = b"XwKsGlMcdPMEhR1B"
+
+    @classmethod
+    def load_env(cls) -> None:
+        """
+        读取环境变量中的配置，MOGUDING_BASE_URL 可将请求指向其他服务（如 benchmark.mock_server）
+        """
+        cls.BASE_URL = os.getenv("MOGUDING_BASE_URL", cls.DEFAULT_BASE_URL).rstrip("/")
+
+
+Constant.load_env()
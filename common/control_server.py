@@ -0,0 +1,242 @@
+import hmac
+import json
+import os
+import re
+import socketserver
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+# 默认的 Unix 套接字路径（未设置 CONTROL_API_PORT 与 CONTROL_API_SOCKET 时使用）
+CONTROL_SOCKET_PATH = (Path(__file__).parent.parent / "data/control.sock").resolve()
+
+# 路由处理函数: (请求体, 路径参数...) → (HTTP状态码, 响应内容)
+RouteHandler = Callable[..., tuple[int, dict[str, Any]]]
+
+
+@dataclass
+class ControlRun:
+    """
+    通过控制接口触发的一次任务执行
+    """
+    # 执行id
+    id: str
+    # 用户名称列表
+    users: list[str]
+    # 需要执行的任务名称列表（见 ScheduleIndex.TASK_ORDER）
+    tasks: list[str]
+    # 状态: pending、running、succeeded、failed
+    status: str = "pending"
+    # 创建、开始、结束时间（时间戳）
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # 每个用户的执行结果
+    results: list[dict[str, Any]] = field(default_factory=list)
+    # 执行异常
+    error: str | None = None
+    # 执行结束事件（wait 参数等待执行结束时使用）
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self, detail: bool = True) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "users": self.users,
+            "tasks": self.tasks,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "succeeded": sum(1 for result in self.results if result.get("success")),
+            "failed": sum(1 for result in self.results if not result.get("success")),
+            "error": self.error,
+        }
+        if detail:
+            data["results"] = self.results
+        return data
+
+
+class ControlRunRegistry:
+    """
+    控制接口触发的任务执行记录，只在内存中保留最近的 CONTROL_API_MAX_RUNS 条
+    """
+
+    def __init__(self, max_runs: int = None) -> None:
+        self.max_runs: int = max(1, max_runs or int(os.getenv("CONTROL_API_MAX_RUNS", "100")))
+        self.runs: dict[str, ControlRun] = {}
+        self.lock = threading.Lock()
+
+    def create(self, users: list[str], tasks: list[str]) -> ControlRun:
+        run = ControlRun(id=uuid.uuid4().hex[:12], users=users, tasks=tasks)
+        with self.lock:
+            self.runs[run.id] = run
+            # 超出上限时删除最早结束的记录（执行中的记录不删除）
+            finished = [run_id for run_id, item in self.runs.items() if item.done.is_set()]
+            for run_id in finished[:max(0, len(self.runs) - self.max_runs)]:
+                del self.runs[run_id]
+        return run
+
+    def get(self, run_id: str) -> ControlRun | None:
+        with self.lock:
+            return self.runs.get(run_id)
+
+    def list(self) -> list[ControlRun]:
+        with self.lock:
+            return list(self.runs.values())[::-1]
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    """
+    控制接口请求处理，请求与响应均为 JSON
+    """
+    server_version = "MogudingControl"
+    control: "ControlServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, data: dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict[str, Any] | None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            data = json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def do_GET(self) -> None:
+        self.dispatch("GET")
+
+    def do_POST(self) -> None:
+        self.dispatch("POST")
+
+    def dispatch(self, method: str) -> None:
+        # 设置 CONTROL_API_TOKEN 时校验 Authorization: Bearer <token>
+        token = self.control.token
+        if token and not hmac.compare_digest(self.headers.get("Authorization") or "", f"Bearer {token}"):
+            self.send_json({"error": "unauthorized"}, 401)
+            return
+
+        path = self.path.split("?")[0].rstrip("/") or "/"
+        path_matched = False
+        for route_method, pattern, handler in self.control.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            body = self.read_json() if method == "POST" else {}
+            if body is None:
+                self.send_json({"error": "请求内容不是有效的JSON对象"}, 400)
+                return
+            try:
+                status, data = handler(body, *match.groups())
+            except Exception as e:
+                self.control.logger.exception(f"控制接口处理失败 > 路径: {path}, 原因: {e}")
+                status, data = 500, {"error": f"{type(e).__name__}: {e}"}
+            self.send_json(data, status)
+            return
+        if path_matched:
+            self.send_json({"error": "method not allowed"}, 405)
+        else:
+            self.send_json({"error": "not found"}, 404)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    ThreadingUnixHTTPServer = None
+
+
+class ControlServer:
+    """
+    本地控制接口服务，在当前进程的后台线程中运行，请求在常驻进程中执行，复用已加载的模块、连接池与登陆信息。
+
+    默认监听仅当前用户可访问的 Unix 套接字（CONTROL_API_SOCKET，默认 data/control.sock）；
+    设置 CONTROL_API_PORT 时改为监听 TCP 端口（CONTROL_API_HOST:CONTROL_API_PORT），此时必须设置 CONTROL_API_TOKEN，
+    否则同一主机上的任意进程都可以为所有用户触发登陆、签到与提交报告。
+    """
+
+    def __init__(self, logger: Any, host: str = None, port: int = None, socket_path: str = None,
+                 token: str = None) -> None:
+        self.logger = logger
+        self.host: str = host or os.getenv("CONTROL_API_HOST", "127.0.0.1")
+        self.port: int | None = port if port is not None else (
+            int(os.getenv("CONTROL_API_PORT")) if os.getenv("CONTROL_API_PORT") else None)
+        # 指定套接字路径或未指定端口时监听 Unix 套接字
+        self.socket_path: str | None = socket_path or os.getenv("CONTROL_API_SOCKET") or (
+            str(CONTROL_SOCKET_PATH) if self.port is None else None)
+        self.token: str | None = token or os.getenv("CONTROL_API_TOKEN") or None
+        # (请求方法, 路径正则, 处理函数)
+        self.routes: list[tuple[str, re.Pattern, RouteHandler]] = []
+        self.server: socketserver.BaseServer | None = None
+        self.thread: threading.Thread | None = None
+
+    def route(self, method: str, path: str, handler: RouteHandler) -> None:
+        """
+        注册路由，路径中的 {name} 作为位置参数传给处理函数
+
+        :param method: 请求方法
+        :param path: 路径，如 /runs/{id}
+        :param handler: 处理函数
+        """
+        pattern = re.compile(re.sub(r"\{\w+}", r"([^/]+)", path))
+        self.routes.append((method.upper(), pattern, handler))
+
+    @property
+    def address(self) -> str:
+        if self.socket_path:
+            return f"unix:{self.socket_path}"
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ControlServer":
+        handler = type("BoundControlHandler", (ControlHandler,), {"control": self})
+        if self.socket_path:
+            if ThreadingUnixHTTPServer is None:
+                raise ValueError("当前平台不支持 Unix 套接字, 请设置 CONTROL_API_PORT 与 CONTROL_API_TOKEN")
+            # 删除上次运行残留的套接字文件，创建时即仅允许当前用户访问
+            Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.socket_path).unlink(missing_ok=True)
+            umask = os.umask(0o177)
+            try:
+                self.server = ThreadingUnixHTTPServer(self.socket_path, handler)
+            finally:
+                os.umask(umask)
+        else:
+            # 监听 TCP 端口时必须设置访问令牌
+            if not self.token:
+                raise ValueError("控制接口监听 TCP 端口时必须设置 CONTROL_API_TOKEN")
+            self.server = ThreadingHTTPServer((self.host, self.port), handler)
+            self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="control-api", daemon=True)
+        self.thread.start()
+        self.logger.info(f"控制接口已启动 > 地址: {self.address}")
+        return self
+
+    def stop(self) -> None:
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        if self.socket_path:
+            Path(self.socket_path).unlink(missing_ok=True)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class TaskResult:
+    """
+    单个用户任务的执行结果
+    """
+    # 用户名称
+    username: str
+    # 是否执行成功
+    success: bool = False
+    # 失败原因
+    error: str | None = None
+    # 开始时间（时间戳）
+    start_time: float = 0.0
+    # 执行耗时（秒）
+    duration: float = 0.0
+
+
+class TaskExecutor:
+    """
+    有界任务执行器，使用固定大小的线程池执行用户任务，并按批次（波次）提交，
+    避免用户数量增长时线程数、会话数以及并发请求数随之线性增长。
+    """
+
+    def __init__(self, max_workers: int = None, queue_size: int = None, wave_size: int = None,
+                 wave_interval: float = None) -> None:
+        # 最大工作线程数
+        self.max_workers: int = max(1, max_workers or int(os.getenv("TASK_MAX_WORKERS", "16")))
+        # 等待队列大小（已提交但未开始执行的任务上限）
+        self.queue_size: int = max(0, queue_size if queue_size is not None else int(
+            os.getenv("TASK_QUEUE_SIZE", str(self.max_workers))))
+        # 每批次用户数量，0表示不分批
+        self.wave_size: int = max(0, wave_size if wave_size is not None else int(os.getenv("TASK_WAVE_SIZE", "0")))
+        # 批次之间的间隔时间（秒）
+        self.wave_interval: float = max(0.0, wave_interval if wave_interval is not None else float(
+            os.getenv("TASK_WAVE_INTERVAL", "0")))
+
+    @staticmethod
+    def _execute(func: Callable[[dict[str, Any]], bool | None], user: dict[str, Any]) -> TaskResult:
+        """
+        执行单个用户任务并记录结果
+
+        :param func: 用户任务函数，返回False表示失败
+        :param user: 用户配置信息
+        :return: 任务执行结果
+        """
+        result = TaskResult(username=user.get("username"), start_time=time.time())
+        start = time.perf_counter()
+        try:
+            result.success = func(user) is not False
+            if not result.success:
+                result.error = "任务执行失败"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.duration = time.perf_counter() - start
+
+        return result
+
+    def run(self, func: Callable[[dict[str, Any]], bool | None], users: list[dict[str, Any]],
+            delays: list[float] = None) -> list[TaskResult]:
+        """
+        按批次执行所有用户的任务，并等待执行完成
+
+        :param func: 用户任务函数
+        :param users: 用户配置信息列表
+        :param delays: 每个用户相对本次执行开始的延迟提交时间（秒），用于错峰执行
+        :return: 按用户顺序排列的执行结果列表
+        """
+        if not users:
+            return []
+
+        # 分批
+        wave_size = self.wave_size or len(users)
+        waves = [users[i:i + wave_size] for i in range(0, len(users), wave_size)]
+
+        # 提交许可，限制等待执行的任务数量
+        slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+        futures: list[Future] = []
+        # 延迟提交的基准时间
+        run_start = time.monotonic()
+        position = 0
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(users)),
+                                thread_name_prefix="task-worker") as executor:
+            for index, wave in enumerate(waves):
+                wave_futures: list[Future] = []
+                for user in wave:
+                    # 未到提交时间则等待（在提交线程中等待，不占用工作线程）
+                    if delays:
+                        wait = run_start + delays[position] - time.monotonic()
+                        if wait > 0:
+                            time.sleep(wait)
+                    position += 1
+                    # 队列已满时阻塞，直到有任务执行完成
+                    slots.acquire()
+                    future = executor.submit(self._execute, func, user)
+                    future.add_done_callback(lambda _: slots.release())
+                    wave_futures.append(future)
+
+                # 等待当前批次执行完成
+                for future in wave_futures:
+                    future.result()
+                futures.extend(wave_futures)
+
+                # 批次间隔
+                if self.wave_interval and index < len(waves) - 1:
+                    time.sleep(self.wave_interval)
+
+        return [future.result() for future in futures]
+
+
+class AsyncTaskExecutor:
+    """
+    异步任务执行器，所有用户任务作为协程运行在同一个事件循环中，
+    通过信号量限制同时执行的用户数量，并支持与 TaskExecutor 相同的分批方式。
+    """
+
+    def __init__(self, max_concurrency: int = None, wave_size: int = None, wave_interval: float = None) -> None:
+        # 最大并发用户数
+        self.max_concurrency: int = max(1, max_concurrency or int(os.getenv("ASYNC_MAX_CONCURRENCY", "256")))
+        # 每批次用户数量，0表示不分批
+        self.wave_size: int = max(0, wave_size if wave_size is not None else int(os.getenv("TASK_WAVE_SIZE", "0")))
+        # 批次之间的间隔时间（秒）
+        self.wave_interval: float = max(0.0, wave_interval if wave_interval is not None else float(
+            os.getenv("TASK_WAVE_INTERVAL", "0")))
+
+    @staticmethod
+    async def _execute(func: Callable[[dict[str, Any]], Awaitable[bool | None]], user: dict[str, Any],
+                       semaphore: asyncio.Semaphore, delay: float = 0) -> TaskResult:
+        """
+        执行单个用户协程任务并记录结果
+
+        :param func: 用户协程任务函数，返回False表示失败
+        :param user: 用户配置信息
+        :param semaphore: 并发限制信号量
+        :param delay: 延迟执行时间（秒）
+        :return: 任务执行结果
+        """
+        # 错峰等待，等待期间不占用并发名额
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        async with semaphore:
+            result = TaskResult(username=user.get("username"), start_time=time.time())
+            start = time.perf_counter()
+            try:
+                result.success = await func(user) is not False
+                if not result.success:
+                    result.error = "任务执行失败"
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+            finally:
+                result.duration = time.perf_counter() - start
+
+        return result
+
+    async def run(self, func: Callable[[dict[str, Any]], Awaitable[bool | None]],
+                  users: list[dict[str, Any]], delays: list[float] = None) -> list[TaskResult]:
+        """
+        按批次执行所有用户的协程任务，并等待执行完成
+
+        :param func: 用户协程任务函数
+        :param users: 用户配置信息列表
+        :param delays: 每个用户相对本次执行开始的延迟执行时间（秒），用于错峰执行
+        :return: 按用户顺序排列的执行结果列表
+        """
+        if not users:
+            return []
+
+        # 分批
+        wave_size = self.wave_size or len(users)
+        waves = [users[i:i + wave_size] for i in range(0, len(users), wave_size)]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: list[TaskResult] = []
+        # 延迟执行的基准时间
+        loop = asyncio.get_running_loop()
+        run_start = loop.time()
+        position = 0
+
+        for index, wave in enumerate(waves):
+            wave_delays = [
+                run_start + delays[position + offset] - loop.time() if delays else 0 for offset in range(len(wave))
+            ]
+            position += len(wave)
+            results.extend(await asyncio.gather(
+                *(self._execute(func, user, semaphore, delay) for user, delay in zip(wave, wave_delays))))
+
+            # 批次间隔
+            if self.wave_interval and index < len(waves) - 1:
+                await asyncio.sleep(self.wave_interval)
+
+        return results
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,92 @@
+import os
+import threading
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from common.constant import Constant
+
+
+class UserSession(Session):
+    """
+    用户会话，只保存用户自身的请求头（Authorization、Sign等），底层连接池由所有用户共享。
+    关闭会话时不会关闭共享连接池，连接保留供后续请求（包括下一轮定时任务）复用。
+    """
+
+    def __init__(self, adapter: HTTPAdapter, timeout: tuple[float, float]) -> None:
+        super().__init__()
+        # 挂载共享连接池
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        # 伪装请求头
+        self.headers.update(Constant.HEADERS)
+        # 默认请求超时时间（连接超时, 读取超时）
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+    def close(self) -> None:
+        # 仅解除对共享连接池的引用
+        self.adapters.clear()
+
+
+class HttpTransport:
+    """
+    进程内共享的HTTP连接池，所有用户会话挂载同一个 HTTPAdapter，复用与服务端的 TCP/TLS 连接。
+    """
+    _ADAPTER: HTTPAdapter | None = None
+    _ADAPTER_LOCK = threading.Lock()
+
+    @classmethod
+    def get_adapter(cls) -> HTTPAdapter:
+        """
+        获取共享的连接池
+
+        :return: 连接池
+        """
+        if cls._ADAPTER is None:
+            with cls._ADAPTER_LOCK:
+                if cls._ADAPTER is None:
+                    cls._ADAPTER = HTTPAdapter(
+                        # 缓存连接池的主机数量
+                        pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", "4")),
+                        # 每个主机保持的最大连接数量
+                        pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "32")),
+                        # 重试由 Utils.send_request 统一处理
+                        max_retries=0,
+                    )
+        return cls._ADAPTER
+
+    @staticmethod
+    def timeout() -> tuple[float, float]:
+        """
+        获取默认请求超时时间
+
+        :return: (连接超时, 读取超时)
+        """
+        return float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")), float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+    @classmethod
+    def create_session(cls) -> UserSession:
+        """
+        创建用户会话
+
+        :return: 挂载共享连接池的用户会话
+        """
+        return UserSession(cls.get_adapter(), cls.timeout())
+
+    @classmethod
+    def close(cls) -> None:
+        """
+        关闭共享连接池
+        """
+        with cls._ADAPTER_LOCK:
+            if cls._ADAPTER is not None:
+                cls._ADAPTER.close()
+                cls._ADAPTER = None
+
+
+if __name__ == '__main__':
+    pass
@@ -1,7 +1,9 @@
+import os
 import sys
-from datetime import datetime
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Set
+from typing import Any, TextIO
 
 from loguru import logger
 
@@ -9,57 +11,122 @@ from loguru import logger
 logger.remove()
 
 
+class UserLogSink:
+    """
+    按用户分发日志的sink，根据 extra["username"] 将日志写入日期目录下对应用户的日志文件。
+
+    只在日志队列的工作线程中调用（enqueue=True），同时保持打开的文件数量不超过上限，
+    超出时关闭最久未写入的文件，之后再有日志时重新以追加模式打开。
+    """
+
+    def __init__(self, base_dir: Path, max_open_files: int) -> None:
+        self.base_dir = base_dir
+        self.max_open_files = max(1, max_open_files)
+        # (日期, 用户名) → 打开的日志文件
+        self.files: "OrderedDict[tuple[str, str], TextIO]" = OrderedDict()
+        # 当前日志日期
+        self.current_date: str | None = None
+
+    def get_file(self, date: str, username: str) -> TextIO:
+        """
+        获取用户在指定日期的日志文件，不存在时打开
+
+        :param date: 日期（YYYY-MM-DD）
+        :param username: 用户名
+        :return: 日志文件
+        """
+        key = (date, username)
+        file = self.files.get(key)
+        if file is not None:
+            self.files.move_to_end(key)
+            return file
+
+        # 日期变化后关闭前一天的日志文件
+        if date != self.current_date:
+            for old_key in [old_key for old_key in self.files if old_key[0] != date]:
+                self.files.pop(old_key).close()
+            self.current_date = date
+
+        # 超过上限时关闭最久未写入的文件
+        while len(self.files) >= self.max_open_files:
+            _, old_file = self.files.popitem(last=False)
+            old_file.close()
+
+        log_dir = self.base_dir / date
+        log_dir.mkdir(parents=True, exist_ok=True)
+        # 行缓冲，与 loguru 文件sink的写入方式一致
+        file = open(file=log_dir / f"{username}.log", mode="a", encoding="utf-8", buffering=1)
+        self.files[key] = file
+        return file
+
+    def write(self, message: Any) -> None:
+        record = message.record
+        username = record["extra"].get("username")
+        if not username:
+            return
+        self.get_file(record["time"].strftime("%Y-%m-%d"), username).write(message)
+
+    def stop(self) -> None:
+        # 移除sink时（包括进程退出）关闭所有日志文件
+        while self.files:
+            _, file = self.files.popitem()
+            file.close()
+
+
 class LoggerManager:
-    USER_LOGGERS: Dict[str, int] = {}  # 用户名到handler_id的映射
-    USER_LOG_DATES: Dict[str, str] = {}  # 记录每个用户上次记录日志的日期
-    GLOBAL_HANDLERS: Set[int] = set()  # 全局handler集合
     LOG_BASE_DIR = (Path(__file__).parent.parent / "log").resolve()  # 路径解析
+    SYSTEM_LOGGER_NAME = "_system"  # 系统日志名称（记录调度、执行器等非用户维度的日志）
+    LOG_FORMAT = (
+        "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+        "<level>{level: <8}</level> | "
+        "<cyan>{extra[username]}</cyan> | "
+        "<magenta>{module}:{line}</magenta> | "
+        "<level>{message}</level>"
+    )
+    SINK_ID: int | None = None  # 按用户分发日志的handler_id
+    CONSOLE_ID: int | None = None  # 控制台handler_id（--single模式）
+    _SINK_LOCK = threading.Lock()
 
     @classmethod
-    def get_user_logger(cls, username: str) -> logger:
-        """获取或创建用户的logger，自动按日期切换日志目录"""
-        current_date = datetime.now().strftime('%Y-%m-%d')
-
-        # 检查是否需要更新日志路径（日期变化或首次创建）
-        if username not in cls.USER_LOGGERS or cls.USER_LOG_DATES.get(username) != current_date:
-            # 为每个用户创建独立的日志目录（按日期）
-            log_dir = cls.LOG_BASE_DIR / current_date
-            log_dir.mkdir(parents=True, exist_ok=True)
-            log_file = log_dir / f"{username}.log"
-
-            # 如果已有handler，先移除旧的
-            if username in cls.USER_LOGGERS:
-                logger.remove(cls.USER_LOGGERS[username])
-                if cls.USER_LOGGERS[username] in cls.GLOBAL_HANDLERS:
-                    cls.GLOBAL_HANDLERS.remove(cls.USER_LOGGERS[username])
-
-            # 添加新的日志处理器
-            handler_id = logger.add(
-                log_file,
-                format=(
-                    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-                    "<level>{level: <8}</level> | "
-                    "<cyan>{extra[username]}</cyan> | "
-                    "<magenta>{module}:{line}</magenta> | "
-                    "<level>{message}</level>"
-                ),
+    def install(cls) -> None:
+        """
+        添加按用户分发日志的sink（所有用户共享一个日志队列和工作线程），只添加一次
+        """
+        if cls.SINK_ID is not None:
+            return
+
+        with cls._SINK_LOCK:
+            if cls.SINK_ID is not None:
+                return
+
+            # 同时打开的用户日志文件数量上限
+            max_open_files = int(os.getenv("LOG_MAX_OPEN_FILES", "128"))
+            cls.SINK_ID = logger.add(
+                UserLogSink(cls.LOG_BASE_DIR, max_open_files),
+                format=cls.LOG_FORMAT,
+                colorize=False,
                 enqueue=True,  # 异步安全写入
-                filter=lambda record: record["extra"].get("username") == username
+                filter=lambda record: "username" in record["extra"],
             )
-            cls.USER_LOGGERS[username] = handler_id
-            cls.USER_LOG_DATES[username] = current_date
 
             # 处理命令行参数（--single模式）
-            args = sys.argv
-            if len(args) > 1 and args[1] == "--single":
-                console_id = logger.add(
+            if "--single" in sys.argv:
+                cls.CONSOLE_ID = logger.add(
                     sys.stderr,
                     format="<level>{message}</level>",
-                    filter=lambda record: record["extra"].get("username") == username,
+                    filter=lambda record: "username" in record["extra"],
                     enqueue=True,
                     colorize=True,  # 启用颜色输出
                     level="DEBUG"  # 设置日志级别
                 )
-                cls.GLOBAL_HANDLERS.add(console_id)
 
+    @classmethod
+    def get_system_logger(cls) -> logger:
+        """获取系统logger，日志写入日期目录下的 _system.log"""
+        return cls.get_user_logger(cls.SYSTEM_LOGGER_NAME)
+
+    @classmethod
+    def get_user_logger(cls, username: str) -> logger:
+        """获取用户的logger，日志按记录时间的日期写入 log/<日期>/<用户名>.log"""
+        cls.install()
         return logger.bind(username=username)
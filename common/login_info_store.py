@@ -0,0 +1,305 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from common.sqlite_database import SqliteDatabase
+from common.utils import Utils
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DATA_DIR = (Path(__file__).parent.parent / "data").resolve()
+USERS_LOGIN_INFO_PATH = DATA_DIR / "users_login_info.json"
+USERS_LOGIN_INFO_DB_PATH = DATA_DIR / "users_login_info.db"
+
+
+class LoginInfoStore(ABC):
+    """
+    用户登陆信息存储，按用户读写，替代整文件读取-修改-写回的方式。
+    通过环境变量 LOGIN_INFO_STORE 选择实现: sqlite（默认）或 json。
+    """
+    _INSTANCE: "LoginInfoStore | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "LoginInfoStore":
+        """
+        获取进程内共享的登陆信息存储
+
+        :return: 登陆信息存储
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    backend = os.getenv("LOGIN_INFO_STORE", "sqlite").lower()
+                    if backend == "json":
+                        cls._INSTANCE = JsonLoginInfoStore(USERS_LOGIN_INFO_PATH)
+                    elif backend == "sqlite":
+                        cls._INSTANCE = SqliteLoginInfoStore(
+                            Path(os.getenv("LOGIN_INFO_DB_PATH", str(USERS_LOGIN_INFO_DB_PATH))),
+                            USERS_LOGIN_INFO_PATH)
+                    else:
+                        raise ValueError(f"不支持的登陆信息存储类型: {backend}")
+        return cls._INSTANCE
+
+    @abstractmethod
+    def get(self, username: str) -> dict[str, Any] | None:
+        """
+        读取用户登陆信息
+
+        :param username: 用户名称
+        :return: 登陆信息副本，不存在返回None
+        """
+
+    @abstractmethod
+    def set(self, username: str, user_login_info: dict[str, Any]) -> None:
+        """
+        写入用户登陆信息
+
+        :param username: 用户名称
+        :param user_login_info: 登陆信息
+        """
+
+    @abstractmethod
+    def delete(self, username: str) -> None:
+        """
+        删除用户登陆信息
+
+        :param username: 用户名称
+        """
+
+    @abstractmethod
+    def all(self) -> dict[str, dict[str, Any]]:
+        """
+        读取所有用户的登陆信息
+
+        :return: 用户名称 → 登陆信息
+        """
+
+    @abstractmethod
+    def acquire_lease(self, username: str, owner: str, seconds: float) -> bool:
+        """
+        获取用户的登陆租约（跨进程），同一时间只有一个持有者可以为该用户登陆并写入登陆信息；
+        持有者再次调用时续期租约
+
+        :param username: 用户名称
+        :param owner: 持有者id
+        :param seconds: 租约时长（秒），持有者异常退出时租约在到期后失效
+        :return: 是否获取成功
+        """
+
+    @abstractmethod
+    def release_lease(self, username: str, owner: str) -> None:
+        """
+        释放用户的登陆租约
+
+        :param username: 用户名称
+        :param owner: 持有者id
+        """
+
+
+class JsonLoginInfoStore(LoginInfoStore):
+    """
+    基于 JSON 文件的登陆信息存储，文件内容缓存在内存中，仅在文件被外部修改后重新读取；
+    写入时先写临时文件再原子替换，避免写入中途崩溃导致文件损坏。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        # 内存缓存及其对应的文件修改时间
+        self.cache: dict[str, dict[str, Any]] = {}
+        self.cache_mtime: float | None = None
+        # 登陆租约的锁文件目录，以及已持有的锁文件: (用户名称, 持有者id) → 文件描述符
+        self.lease_dir = path.parent / "login_lease"
+        self.lease_files: dict[tuple[str, str], int] = {}
+
+        if not self.path.exists():
+            self._write({})
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        # 文件未被修改时直接使用缓存
+        mtime = self.path.stat().st_mtime if self.path.exists() else None
+        if mtime is None:
+            self.cache, self.cache_mtime = {}, None
+        elif mtime != self.cache_mtime:
+            self.cache = Utils.operate_json_file(self.path) or {}
+            self.cache_mtime = mtime
+        return self.cache
+
+    def _write(self, data: dict[str, dict[str, Any]]) -> None:
+        # 写入临时文件后原子替换
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        self.cache = data
+        self.cache_mtime = self.path.stat().st_mtime
+
+    def get(self, username: str) -> dict[str, Any] | None:
+        with self.lock:
+            return copy.deepcopy(self._load().get(username))
+
+    def set(self, username: str, user_login_info: dict[str, Any]) -> None:
+        with self.lock:
+            data = dict(self._load())
+            data[username] = copy.deepcopy(user_login_info)
+            self._write(data)
+
+    def delete(self, username: str) -> None:
+        with self.lock:
+            data = dict(self._load())
+            if data.pop(username, None) is not None:
+                self._write(data)
+
+    def all(self) -> dict[str, dict[str, Any]]:
+        with self.lock:
+            return copy.deepcopy(self._load())
+
+    def acquire_lease(self, username: str, owner: str, seconds: float) -> bool:
+        # 使用 flock 文件锁，持有者进程退出时由操作系统释放，不依赖租约时长；不支持 fcntl 的平台上只在进程内互斥
+        with self.lock:
+            if (username, owner) in self.lease_files:
+                return True
+            if fcntl is None:
+                if any(key[0] == username for key in self.lease_files):
+                    return False
+                self.lease_files[(username, owner)] = -1
+                return True
+
+            self.lease_dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.lease_dir / f"{username}.lock", os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            self.lease_files[(username, owner)] = fd
+            return True
+
+    def release_lease(self, username: str, owner: str) -> None:
+        with self.lock:
+            fd = self.lease_files.pop((username, owner), None)
+            if fd is not None and fd >= 0:
+                # 关闭文件描述符时释放文件锁
+                os.close(fd)
+
+
+class SqliteLoginInfoStore(LoginInfoStore):
+    """
+    基于 SQLite（WAL 模式）的登陆信息存储，每个用户一行，按行读写。
+    读取结果缓存在内存中，其他进程提交修改后（PRAGMA data_version 变化）缓存自动失效。
+    首次使用时自动从 users_login_info.json 迁移已有数据。
+    登陆租约记录在 login_lease 表中，共享同一个数据库文件的多个进程之间互斥。
+    """
+
+    def __init__(self, path: Path, json_path: Path = None) -> None:
+        self.database = SqliteDatabase(path, [
+            "CREATE TABLE IF NOT EXISTS login_info ("
+            "username TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+            "CREATE TABLE IF NOT EXISTS login_lease ("
+            "username TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)",
+        ])
+        # 内存缓存
+        self.cache: dict[str, dict[str, Any] | None] = {}
+        self.data_version: int | None = None
+
+        if json_path is not None:
+            self.migrate_from_json(json_path)
+
+    def migrate_from_json(self, json_path: Path) -> int:
+        """
+        从 JSON 文件迁移登陆信息，只执行一次，已存在的用户不会被覆盖
+
+        :param json_path: users_login_info.json 路径
+        :return: 迁移的用户数量
+        """
+        with self.database.lock:
+            if self.database.fetchone("SELECT 1 FROM meta WHERE key = 'json_migrated'"):
+                return 0
+
+            data: dict[str, dict[str, Any]] = {}
+            if json_path.exists():
+                try:
+                    data = Utils.operate_json_file(json_path) or {}
+                except ValueError:
+                    data = {}
+
+            now = time.time()
+            with self.database.transaction() as connection:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO login_info (username, data, updated_at) VALUES (?, ?, ?)",
+                    [(username, json.dumps(info, ensure_ascii=False), now) for username, info in data.items() if info])
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(now),))
+
+            self.cache.clear()
+            return len(data)
+
+    def _check_cache(self) -> None:
+        # 其他进程提交修改后，data_version 会发生变化，此时清空缓存
+        data_version = self.database.data_version()
+        if data_version != self.data_version:
+            self.cache.clear()
+            self.data_version = data_version
+
+    def get(self, username: str) -> dict[str, Any] | None:
+        with self.database.lock:
+            self._check_cache()
+            if username not in self.cache:
+                row = self.database.fetchone("SELECT data FROM login_info WHERE username = ?", (username,))
+                self.cache[username] = json.loads(row[0]) if row else None
+            return copy.deepcopy(self.cache[username])
+
+    def set(self, username: str, user_login_info: dict[str, Any]) -> None:
+        data = json.dumps(user_login_info, ensure_ascii=False)
+        with self.database.lock:
+            self._check_cache()
+            self.database.execute(
+                "INSERT OR REPLACE INTO login_info (username, data, updated_at) VALUES (?, ?, ?)",
+                (username, data, time.time()))
+            self.cache[username] = json.loads(data)
+
+    def delete(self, username: str) -> None:
+        with self.database.lock:
+            self._check_cache()
+            self.database.execute("DELETE FROM login_info WHERE username = ?", (username,))
+            self.cache[username] = None
+
+    def all(self) -> dict[str, dict[str, Any]]:
+        rows = self.database.fetchall("SELECT username, data FROM login_info")
+        return {username: json.loads(data) for username, data in rows}
+
+    def acquire_lease(self, username: str, owner: str, seconds: float) -> bool:
+        now = time.time()
+        with self.database.transaction() as connection:
+            row = connection.execute("SELECT owner, expires_at FROM login_lease WHERE username = ?",
+                                     (username,)).fetchone()
+            # 其他持有者的租约未过期
+            if row and row[0] != owner and row[1] > now:
+                return False
+            connection.execute("INSERT OR REPLACE INTO login_lease (username, owner, expires_at) VALUES (?, ?, ?)",
+                               (username, owner, now + seconds))
+        return True
+
+    def release_lease(self, username: str, owner: str) -> None:
+        self.database.execute("DELETE FROM login_lease WHERE username = ? AND owner = ?", (username, owner))
+
+
+if __name__ == '__main__':
+    pass
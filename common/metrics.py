@@ -0,0 +1,293 @@
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+# 耗时直方图默认分桶（秒）
+DEFAULT_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# 每轮运行保留的原始样本数量上限（用于运行汇总中的精确百分位）
+RUN_SAMPLE_LIMIT = 10000
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """
+    计算百分位数（最近秩法: 第 ceil(percent * n / 100) 小的值）
+
+    :param ordered: 升序排列的数据
+    :param percent: 百分位（0-100）
+    :return: 百分位数，没有数据时返回0
+    """
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, math.ceil(percent * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+class Histogram:
+    """
+    直方图，累计分桶计数（进程生命周期）并保留本轮运行的原始样本
+    """
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.run_samples: list[float] = []
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if len(self.run_samples) < RUN_SAMPLE_LIMIT:
+            self.run_samples.append(value)
+
+
+class Metrics:
+    """
+    进程内指标，按名称与标签记录计数器和直方图。
+
+    设置 METRICS_DIR 后，每轮定时任务结束时导出 Prometheus textfile（metrics.prom，可由 node_exporter 的
+    textfile collector 采集）以及本轮运行的 JSON 汇总（run_summary.json，并追加到 run_summaries.jsonl）。
+    """
+    _LOCK = threading.Lock()
+    # 计数器: 名称 → {标签: 数值}
+    _COUNTERS: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+    # 本轮运行的计数器增量
+    _RUN_COUNTERS: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+    # 直方图: 名称 → {标签: 直方图}
+    _HISTOGRAMS: dict[str, dict[tuple[tuple[str, str], ...], Histogram]] = {}
+    # 指标说明
+    _HELP: dict[str, str] = {}
+
+    @staticmethod
+    def _labels(labels: dict[str, Any] | None) -> tuple[tuple[str, str], ...]:
+        return tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+    @classmethod
+    def inc(cls, name: str, labels: dict[str, Any] = None, value: float = 1, description: str = None) -> None:
+        """
+        计数器增加
+
+        :param name: 指标名称
+        :param labels: 标签
+        :param value: 增加的数值
+        :param description: 指标说明
+        """
+        key = cls._labels(labels)
+        with cls._LOCK:
+            counters = cls._COUNTERS.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + value
+            run_counters = cls._RUN_COUNTERS.setdefault(name, {})
+            run_counters[key] = run_counters.get(key, 0) + value
+            if description:
+                cls._HELP.setdefault(name, description)
+
+    @classmethod
+    def observe(cls, name: str, value: float, labels: dict[str, Any] = None,
+                buckets: tuple[float, ...] = DEFAULT_BUCKETS, description: str = None) -> None:
+        """
+        直方图记录一个样本
+
+        :param name: 指标名称
+        :param value: 样本值
+        :param labels: 标签
+        :param buckets: 分桶上界
+        :param description: 指标说明
+        """
+        key = cls._labels(labels)
+        with cls._LOCK:
+            histograms = cls._HISTOGRAMS.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+            if description:
+                cls._HELP.setdefault(name, description)
+
+    @classmethod
+    @contextmanager
+    def timer(cls, name: str, labels: dict[str, Any] = None, description: str = None) -> Iterator[dict[str, Any]]:
+        """
+        记录代码块耗时（秒），代码块抛出异常时 result 标签为 failure，可在代码块中修改返回的标签
+
+        :return: 标签（可修改）
+        """
+        labels = dict(labels or {})
+        start = time.perf_counter()
+        try:
+            yield labels
+            labels.setdefault("result", "success")
+        except BaseException:
+            labels["result"] = "failure"
+            raise
+        finally:
+            cls.observe(name, time.perf_counter() - start, labels, description=description)
+
+    @classmethod
+    def record_request(cls, url: str, status: Any, duration: float = None) -> None:
+        """
+        记录一次HTTP请求（每次尝试）
+
+        :param url: 请求url
+        :param status: 响应状态码，未收到响应时为异常类型名称
+        :param duration: 请求耗时（秒），未发送请求时为None
+        """
+        endpoint = urlsplit(url).path
+        cls.inc("moguding_requests_total", {"endpoint": endpoint, "status": status},
+                description="HTTP requests by endpoint and status code")
+        if duration is not None:
+            cls.observe("moguding_request_duration_seconds", duration, {"endpoint": endpoint},
+                        description="HTTP request latency by endpoint")
+
+    @classmethod
+    def record_retry(cls, url: str) -> None:
+        """
+        记录一次HTTP请求重试
+
+        :param url: 请求url
+        """
+        cls.inc("moguding_request_retries_total", {"endpoint": urlsplit(url).path},
+                description="HTTP request retries by endpoint")
+
+    @staticmethod
+    def _format_labels(key: tuple[tuple[str, str], ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        items = key + extra
+        if not items:
+            return ""
+        # 标签值中的反斜杠、双引号、换行需要转义
+        escape = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+        return "{" + ",".join(f'{name}="{value.translate(escape)}"' for name, value in items) + "}"
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        """
+        生成 Prometheus 文本格式的指标
+
+        :return: 指标文本
+        """
+        lines: list[str] = []
+        with cls._LOCK:
+            for name, counters in sorted(cls._COUNTERS.items()):
+                if name in cls._HELP:
+                    lines.append(f"# HELP {name} {cls._HELP[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(counters.items()):
+                    lines.append(f"{name}{cls._format_labels(key)} {value:g}")
+
+            for name, histograms in sorted(cls._HISTOGRAMS.items()):
+                if name in cls._HELP:
+                    lines.append(f"# HELP {name} {cls._HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(histograms.items()):
+                    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                        lines.append(f"{name}_bucket{cls._format_labels(key, (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{name}_bucket{cls._format_labels(key, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{cls._format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{cls._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def run_summary(cls) -> dict[str, Any]:
+        """
+        生成本轮运行的指标汇总
+
+        :return: 汇总数据
+        """
+        summary: dict[str, Any] = {"counters": {}, "histograms": {}}
+        with cls._LOCK:
+            for name, counters in sorted(cls._RUN_COUNTERS.items()):
+                summary["counters"][name] = [
+                    {"labels": dict(key), "value": value} for key, value in sorted(counters.items())]
+
+            for name, histograms in sorted(cls._HISTOGRAMS.items()):
+                items = []
+                for key, histogram in sorted(histograms.items()):
+                    if not histogram.run_samples:
+                        continue
+                    ordered = sorted(histogram.run_samples)
+                    items.append({
+                        "labels": dict(key),
+                        "count": len(ordered),
+                        "p50": percentile(ordered, 50),
+                        "p95": percentile(ordered, 95),
+                        "p99": percentile(ordered, 99),
+                        "max": ordered[-1],
+                        "mean": sum(ordered) / len(ordered),
+                    })
+                if items:
+                    summary["histograms"][name] = items
+        return summary
+
+    @classmethod
+    def reset_run(cls) -> None:
+        """
+        开始新一轮运行，清空本轮的计数器增量与原始样本
+        """
+        with cls._LOCK:
+            cls._RUN_COUNTERS.clear()
+            for histograms in cls._HISTOGRAMS.values():
+                for histogram in histograms.values():
+                    histogram.run_samples = []
+
+    @staticmethod
+    def metrics_dir() -> Path | None:
+        """
+        获取指标导出目录
+
+        :return: 导出目录，未设置时返回None
+        """
+        metrics_dir = os.getenv("METRICS_DIR")
+        return Path(metrics_dir) if metrics_dir else None
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str) -> None:
+        # 写入临时文件后原子替换，避免采集到写入一半的文件
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def export(cls, run_info: dict[str, Any] = None, instance: str = None) -> dict[str, Any] | None:
+        """
+        导出 Prometheus textfile 与本轮运行的 JSON 汇总，并开始新一轮运行
+
+        :param run_info: 本轮运行信息（开始时间、用户数等），写入 JSON 汇总
+        :param instance: 实例名称，多个工作进程共享 METRICS_DIR 时作为文件名后缀（metrics-<实例>.prom）
+        :return: 本轮运行汇总，未设置 METRICS_DIR 时返回None
+        """
+        metrics_dir = cls.metrics_dir()
+        if metrics_dir is None:
+            cls.reset_run()
+            return None
+
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        summary = dict(run_info or {}, **cls.run_summary())
+
+        suffix = f"-{instance}" if instance else ""
+        cls._write_atomic(metrics_dir / f"metrics{suffix}.prom", cls.render_prometheus())
+        cls._write_atomic(metrics_dir / f"run_summary{suffix}.json",
+                          json.dumps(summary, ensure_ascii=False, indent=4))
+        with open(file=metrics_dir / f"run_summaries{suffix}.jsonl", mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+        cls.reset_run()
+        return summary
+
+
+if __name__ == '__main__':
+    pass
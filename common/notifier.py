@@ -0,0 +1,201 @@
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from loguru import logger as loguru_logger
+
+from common.utils import Utils
+
+if TYPE_CHECKING:
+    from smtplib import SMTP_SSL
+
+
+@dataclass
+class EmailMessage:
+    """
+    待发送的提醒邮件
+    """
+    receiver_email: str
+    body: str
+    # 发送结果写入的日志（通常为用户日志）
+    logger: loguru_logger
+
+
+class EmailNotifier:
+    """
+    后台提醒邮件队列。
+
+    任务线程只负责将邮件放入队列，由单个后台线程复用同一个 SMTP 连接依次发送，
+    连接断开时自动重连，并按 EMAIL_RATE_PER_MINUTE 限制发送速率。
+    开启 EMAIL_DIGEST 后，同一轮任务中发给同一收件人的提醒会在本轮结束时合并为一封邮件发送。
+    """
+    # 空闲超过该秒数后关闭 SMTP 连接，避免被服务端断开
+    IDLE_TIMEOUT = 60
+
+    _INSTANCE: "EmailNotifier | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self, rate_per_minute: float = None, digest: bool = None) -> None:
+        # 每分钟最多发送的邮件数量
+        self.rate_per_minute: float = max(0.1, rate_per_minute or float(os.getenv("EMAIL_RATE_PER_MINUTE", "20")))
+        # 是否合并同一轮任务中的提醒
+        self.digest: bool = digest if digest is not None else os.getenv("EMAIL_DIGEST", "0") == "1"
+
+        self.queue: queue.Queue[EmailMessage] = queue.Queue()
+        # 合并中的提醒: 收件人 → 提醒内容列表
+        self.pending: dict[str, list[EmailMessage]] = {}
+        self.pending_lock = threading.Lock()
+
+        self.server: "SMTP_SSL | None" = None
+        self.last_send_time = 0.0
+
+        self.worker = threading.Thread(target=self._run, name="email-notifier", daemon=True)
+        self.worker.start()
+
+    @classmethod
+    def get_instance(cls) -> "EmailNotifier":
+        """
+        获取进程内共享的提醒邮件队列
+
+        :return: 提醒邮件队列
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    cls._INSTANCE = EmailNotifier()
+        return cls._INSTANCE
+
+    def notify(self, receiver_email: str, body: str, logger: loguru_logger) -> None:
+        """
+        提交提醒邮件，不等待发送完成
+
+        :param receiver_email: 收件人邮箱
+        :param body: 邮件正文
+        :param logger: 记录发送结果的日志
+        """
+        if not receiver_email:
+            logger.error("未配置提醒邮箱, 无法发送邮件提醒")
+            return
+
+        message = EmailMessage(receiver_email, body, logger)
+        if self.digest:
+            with self.pending_lock:
+                self.pending.setdefault(receiver_email, []).append(message)
+        else:
+            self.queue.put(message)
+
+    def flush(self) -> None:
+        """
+        本轮任务结束，将合并中的提醒按收件人各合并为一封邮件放入发送队列
+        """
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+
+        for receiver_email, messages in pending.items():
+            if len(messages) == 1:
+                self.queue.put(messages[0])
+                continue
+
+            body = "\n\n".join(f"{index}. {message.body}" for index, message in enumerate(messages, start=1))
+            self.queue.put(EmailMessage(receiver_email, f"本轮任务共有{len(messages)}条提醒:\n\n{body}",
+                                        messages[-1].logger))
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        等待队列中的邮件发送完毕
+
+        :param timeout: 最长等待秒数，None表示一直等待
+        :return: 是否全部发送完毕
+        """
+        self.flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def _connect(self) -> "SMTP_SSL":
+        import smtplib
+
+        # 复用已有连接，连接失效时重新连接并登录
+        if self.server is not None:
+            try:
+                if self.server.noop()[0] == 250:
+                    return self.server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._disconnect()
+
+        self.server = smtplib.SMTP_SSL(os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT")), timeout=30)
+        self.server.login(os.getenv("SENDER_EMAIL"), os.getenv("SENDER_PASSWORD"))
+        return self.server
+
+    def _disconnect(self) -> None:
+        import smtplib
+
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+    def _send(self, message: EmailMessage) -> None:
+        # 从环境变量中获取邮箱服务配置信息
+        sender_email = os.getenv("SENDER_EMAIL")
+        subject = os.getenv("SUBJECT")
+
+        # 检查必要的配置是否齐全
+        if not (sender_email and subject and os.getenv("SENDER_PASSWORD") and os.getenv("SMTP_SERVER")
+                and os.getenv("SMTP_PORT")):
+            message.logger.error("邮箱服务配置缺失, 无法发送邮件提醒")
+            return
+
+        text = Utils.build_email(sender_email, message.receiver_email, subject, message.body)
+
+        # 限制发送速率
+        wait = self.last_send_time + 60 / self.rate_per_minute - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        # 只在发送邮件时导入 smtplib
+        import smtplib
+
+        # 发送失败时重新连接再尝试一次
+        for attempt in range(2):
+            try:
+                self._connect().sendmail(sender_email, message.receiver_email, text)
+                message.logger.info(f"提醒邮件发送成功")
+                break
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as e:
+                self._disconnect()
+                if attempt == 1:
+                    message.logger.error(f"提醒邮件发送失败, 失败原因: {e}")
+            except Exception as e:
+                message.logger.error(f"提醒邮件发送失败, 失败原因: {e}")
+                break
+        self.last_send_time = time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                message = self.queue.get(timeout=self.IDLE_TIMEOUT)
+            except queue.Empty:
+                # 空闲时关闭连接
+                self._disconnect()
+                continue
+
+            try:
+                self._send(message)
+            except Exception as e:
+                message.logger.error(f"提醒邮件发送失败, 失败原因: {e}")
+            finally:
+                self.queue.task_done()
+
+
+if __name__ == '__main__':
+    pass
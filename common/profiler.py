@@ -0,0 +1,302 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, ContextManager, Iterator
+
+from common.logger_manager import LoggerManager
+
+PROFILE_DIR = (Path(__file__).parent.parent / "log/profile").resolve()
+
+# 锁、队列等待（只匹配最内层的调用栈）
+LOCK_WAIT_FILES: tuple[str, ...] = ("threading.py", "queue.py", "concurrent/futures")
+
+# 耗时分类规则，按调用栈从内到外匹配文件路径（AI 请求、锁等待单独判断，见 Profiler.classify）
+CATEGORY_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("network", ("socket.py", "ssl.py", "selectors.py", "http/client.py", "urllib3", "requests", "httpx",
+                 "httpcore", "anyio")),
+    ("captcha", ("captcha_solver.py", "cv2", "numpy")),
+    ("aes", ("signing.py", "Crypto")),
+    ("file_io", ("json", "sqlite", "login_info_store.py", "report_content_store.py", "report_ledger.py")),
+    ("logging", ("loguru", "logger_manager.py")),
+)
+
+
+class ProfileSession:
+    """
+    一次运行的剖析数据: 统计采样（所有线程的调用栈）以及 cProfile
+    """
+
+    def __init__(self, name: str, interval: float, sample_rate: float, profile_caller: bool) -> None:
+        self.name = name
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.started_at = datetime.now()
+        # 线程id → 用户名（被抽中的用户任务线程）
+        self.user_threads: dict[int, str] = {}
+        # 未被抽中的用户任务线程，不采样
+        self.skipped_threads: set[int] = set()
+        # 折叠调用栈 → 采样次数
+        self.stacks: Counter[str] = Counter()
+        # 线程标签 → {"samples", "wallSeconds", "breakdown"}
+        self.threads: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.sampler: threading.Thread | None = None
+        # 合并的 cProfile 统计
+        self.stats: pstats.Stats | None = None
+        self.caller_profile = cProfile.Profile() if profile_caller else None
+
+    def start(self) -> None:
+        self.sampler = threading.Thread(target=self.sample_loop, name="profile-sampler", daemon=True)
+        self.sampler.start()
+        if self.caller_profile is not None:
+            self.caller_profile.enable()
+
+    def stop(self) -> None:
+        if self.caller_profile is not None:
+            self.caller_profile.disable()
+            self.add_profile(self.caller_profile)
+        self.stop_event.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+    def add_profile(self, profile: cProfile.Profile) -> None:
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def sample_loop(self) -> None:
+        sampler_ident = threading.get_ident()
+        last = time.perf_counter()
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            with self.lock:
+                user_threads = dict(self.user_threads)
+                skipped_threads = set(self.skipped_threads)
+
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler_ident or ident in skipped_threads:
+                    continue
+                username = user_threads.get(ident)
+                self.record(frame, f"user:{username}" if username else thread_names.get(ident, str(ident)),
+                            "user" if username else thread_names.get(ident, str(ident)), elapsed)
+
+    def record(self, frame: FrameType, label: str, root: str, elapsed: float) -> None:
+        # 从内到外的调用栈
+        frames: list[FrameType] = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+
+        category = Profiler.classify(frames)
+        stack = ";".join([root] + [Profiler.frame_name(item) for item in reversed(frames)])
+
+        self.stacks[stack] += 1
+        thread = self.threads.setdefault(label, {"samples": 0, "wallSeconds": 0.0, "breakdown": {}})
+        thread["samples"] += 1
+        thread["wallSeconds"] += elapsed
+        thread["breakdown"][category] = thread["breakdown"].get(category, 0.0) + elapsed
+
+    def write(self, base_dir: Path) -> Path:
+        """
+        写入剖析结果
+
+        :param base_dir: 输出目录
+        :return: 本次运行的结果目录
+        """
+        run_dir = base_dir / f"{self.started_at:%Y%m%d-%H%M%S}-{self.name}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        # 折叠调用栈（flamegraph.pl、speedscope 可直接读取）
+        with open(file=run_dir / "stacks.collapsed", mode="w", encoding="utf-8") as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(f"{stack} {count}\n")
+
+        # 每个线程的耗时分类
+        threads = {
+            label: dict(item, wallSeconds=round(item["wallSeconds"], 3),
+                        breakdown={key: round(value, 3) for key, value in
+                                   sorted(item["breakdown"].items(), key=lambda entry: -entry[1])})
+            for label, item in sorted(self.threads.items())
+        }
+        with open(file=run_dir / "threads.json", mode="w", encoding="utf-8") as file:
+            json.dump({
+                "name": self.name,
+                "startedAt": self.started_at.isoformat(timespec="seconds"),
+                "intervalSeconds": self.interval,
+                "sampleRate": self.sample_rate,
+                "threads": threads,
+            }, file, ensure_ascii=False, indent=4)
+
+        # cProfile 统计（可用 pstats、snakeviz 等工具查看）
+        if self.stats is not None:
+            self.stats.dump_stats(run_dir / "cprofile.prof")
+            text = io.StringIO()
+            pstats.Stats(str(run_dir / "cprofile.prof"), stream=text).sort_stats("cumulative").print_stats(50)
+            (run_dir / "cprofile.txt").write_text(text.getvalue(), encoding="utf-8")
+
+        return run_dir
+
+
+class Profiler:
+    """
+    运行剖析（--profile）。
+
+    每轮定时任务（或单次执行模式下的每个任务）记录一次剖析结果，写入 PROFILE_DIR 下以时间和名称命名的目录:
+    统计采样的折叠调用栈（stacks.collapsed）、每个线程的耗时分类（threads.json）以及 cProfile 统计（cprofile.prof）。
+    线程池模式下按 PROFILE_SAMPLE_RATE 抽样用户，只有被抽中的用户任务线程会被采样和记录 cProfile。
+    """
+    _SESSION: ProfileSession | None = None
+    _SESSION_LOCK = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return "--profile" in sys.argv
+
+    @staticmethod
+    def sample_rate() -> float:
+        """
+        获取用户抽样比例（0~1）
+
+        :return: 抽样比例
+        """
+        return min(1.0, max(0.0, float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))))
+
+    @staticmethod
+    def interval() -> float:
+        """
+        获取统计采样间隔（秒）
+
+        :return: 采样间隔
+        """
+        return max(0.001, float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000)
+
+    @staticmethod
+    def output_dir() -> Path:
+        return Path(os.getenv("PROFILE_DIR", str(PROFILE_DIR)))
+
+    @staticmethod
+    def frame_name(frame: FrameType) -> str:
+        code = frame.f_code
+        return f"{Path(code.co_filename).stem}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    @staticmethod
+    def classify(frames: list[FrameType]) -> str:
+        """
+        按调用栈判断当前耗时的类别
+
+        :param frames: 从内到外的调用栈
+        :return: 类别
+        """
+        filenames = [frame.f_code.co_filename.replace("\\", "/") for frame in frames]
+        # 等待 AI 接口的时间单独统计，不计入 network
+        if any("/openai/" in filename for filename in filenames):
+            return "ai"
+        if any(pattern in filenames[0] for pattern in LOCK_WAIT_FILES):
+            return "lock_wait"
+        for filename in filenames:
+            for category, patterns in CATEGORY_RULES:
+                if any(pattern in filename for pattern in patterns):
+                    return category
+        return "other"
+
+    @classmethod
+    def run(cls, name: str, profile_caller: bool = True) -> ContextManager[ProfileSession | None]:
+        """
+        剖析一次运行，未开启 --profile 时不做任何处理
+
+        :param name: 运行名称，用于结果目录名
+        :param profile_caller: 是否对调用线程记录 cProfile（协程模式、单次执行模式）
+        :return: 上下文管理器
+        """
+        if not cls.enabled():
+            return nullcontext()
+        return cls._run(name, profile_caller)
+
+    @classmethod
+    @contextmanager
+    def _run(cls, name: str, profile_caller: bool) -> Iterator[ProfileSession]:
+        session = ProfileSession(name, cls.interval(), cls.sample_rate(), profile_caller)
+        with cls._SESSION_LOCK:
+            cls._SESSION = session
+        session.start()
+        try:
+            yield session
+        finally:
+            session.stop()
+            with cls._SESSION_LOCK:
+                cls._SESSION = None
+
+            logger = LoggerManager.get_system_logger()
+            try:
+                logger.info(f"剖析结果已写入 > {session.write(cls.output_dir())}")
+            except OSError as e:
+                logger.error(f"写入剖析结果失败 > 原因: {e}")
+
+    @classmethod
+    @contextmanager
+    def user(cls, username: str) -> Iterator[None]:
+        """
+        在当前线程执行用户任务，按抽样比例决定是否采样该用户
+        """
+        session = cls._SESSION
+        if session is None:
+            yield
+            return
+
+        ident = threading.get_ident()
+        sampled = random.random() < session.sample_rate
+        profile: cProfile.Profile | None = None
+        with session.lock:
+            if sampled:
+                session.user_threads[ident] = username
+            else:
+                session.skipped_threads.add(ident)
+
+        if sampled:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ 同一时间只能启用一个 cProfile，此时只保留统计采样
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                session.add_profile(profile)
+            with session.lock:
+                session.user_threads.pop(ident, None)
+                session.skipped_threads.discard(ident)
+
+    @classmethod
+    def wrap_user(cls, func: Callable[[dict[str, Any]], Any]) -> Callable[[dict[str, Any]], Any]:
+        """
+        包装用户任务函数，在 Profiler.user 中执行
+        """
+        def wrapper(user: dict[str, Any]) -> Any:
+            with cls.user(user.get("username")):
+                return func(user)
+
+        return wrapper
+
+
+if __name__ == '__main__':
+    pass
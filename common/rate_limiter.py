@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from common.metrics import Metrics
+from common.retry_policy import response_status
+
+# 接口分组，按路径前缀匹配，未匹配的接口使用默认分组
+ENDPOINT_FAMILIES: list[tuple[str, str]] = [
+    ("/session/captcha/", "captcha"),
+    ("/session/user/v6/login", "login"),
+    ("/attendence/clock/v4/save", "clock_save"),
+    ("/practice/paper/v6/save", "paper_save"),
+]
+DEFAULT_FAMILY = "default"
+
+# 各分组默认的每秒请求数（令牌桶速率），0 表示不限制
+DEFAULT_RATES: dict[str, float] = {
+    "captcha": 20,
+    "login": 10,
+    "clock_save": 20,
+    "paper_save": 10,
+    DEFAULT_FAMILY: 50,
+}
+
+
+class RateLimiter:
+    """
+    按接口分组共享的自适应限流器，进程内所有用户的请求都经过对应分组的限流器。
+
+    令牌桶限制每秒请求数（RATE_LIMIT_<分组>_RPS），并发上限按 AIMD 方式调整:
+    请求正常时每个请求将并发上限增加 1/上限（约每轮增加1），出现 429、5xx、超时
+    或耗时超过基线耗时的 RATE_LIMIT_LATENCY_TOLERANCE 倍时将并发上限减半（每秒最多一次），
+    使整点集中执行时的请求量保持在服务端可以承受的范围内。
+    """
+    # 两次减小并发上限的最短间隔（秒）
+    DECREASE_COOLDOWN = 1.0
+    # 协程等待名额时的轮询间隔（秒）
+    ASYNC_POLL_INTERVAL = 0.01
+
+    _LIMITERS: dict[str, "RateLimiter"] = {}
+    _LIMITERS_LOCK = threading.Lock()
+
+    def __init__(self, name: str, rate: float = None, initial_concurrency: float = None,
+                 min_concurrency: float = None, max_concurrency: float = None) -> None:
+        self.name = name
+        # 是否开启限流
+        self.enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+        # 每秒请求数，0表示不限制
+        self.rate: float = max(0.0, rate if rate is not None else float(
+            os.getenv(f"RATE_LIMIT_{name.upper()}_RPS", str(DEFAULT_RATES.get(name, DEFAULT_RATES[DEFAULT_FAMILY])))))
+        # 令牌桶容量（允许1秒的突发请求）
+        self.capacity: float = max(1.0, self.rate)
+        # 并发上限范围
+        self.min_concurrency: float = max(1.0, min_concurrency or float(os.getenv("RATE_LIMIT_MIN_CONCURRENCY", "1")))
+        self.max_concurrency: float = max(self.min_concurrency, max_concurrency or float(
+            os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "64")))
+        # 耗时超过基线耗时的该倍数（且超过最低阈值）时视为服务端过载
+        self.latency_tolerance: float = max(1.0, float(os.getenv("RATE_LIMIT_LATENCY_TOLERANCE", "3")))
+        self.latency_floor: float = max(0.0, float(os.getenv("RATE_LIMIT_LATENCY_FLOOR_MS", "1000")) / 1000)
+
+        # 当前并发上限
+        self.limit: float = min(self.max_concurrency, max(self.min_concurrency, initial_concurrency or float(
+            os.getenv("RATE_LIMIT_INITIAL_CONCURRENCY", "16"))))
+        # 进行中的请求数量
+        self.in_flight = 0
+        # 令牌桶
+        self.tokens: float = self.capacity
+        self.last_refill = time.monotonic()
+        # 基线耗时（观测到的最小耗时，缓慢上浮以适应服务端变化）
+        self.baseline_latency: float | None = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    @classmethod
+    def for_url(cls, url: str) -> "RateLimiter":
+        """
+        获取请求url所属接口分组的限流器
+
+        :param url: 请求url
+        :return: 限流器
+        """
+        path = urlsplit(url).path
+        name = next((family for prefix, family in ENDPOINT_FAMILIES if path.startswith(prefix)), DEFAULT_FAMILY)
+        limiter = cls._LIMITERS.get(name)
+        if limiter is None:
+            with cls._LIMITERS_LOCK:
+                limiter = cls._LIMITERS.setdefault(name, RateLimiter(name))
+        return limiter
+
+    @staticmethod
+    def is_overload(error: Exception) -> bool:
+        """
+        判断请求异常是否说明服务端过载（429、5xx、超时）
+
+        :param error: 请求异常
+        :return: 是否过载
+        """
+        status = response_status(error)
+        if status is not None:
+            return status == 429 or status >= 500
+        return "Timeout" in type(error).__name__
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _try_acquire(self) -> float | None:
+        """
+        尝试占用一个请求名额（调用方持有锁）
+
+        :return: 获取成功返回None，否则返回建议的等待时间（秒），等待并发名额时为0
+        """
+        if self.in_flight >= int(self.limit):
+            return 0.0
+        if self.rate > 0:
+            self._refill()
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+        self.in_flight += 1
+        return None
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            Metrics.observe("moguding_rate_limit_wait_seconds", waited, {"family": self.name},
+                            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+                            description="Time spent waiting for the rate limiter by endpoint family")
+
+    def acquire(self) -> float:
+        """
+        等待并占用一个请求名额，请求结束后需要调用 release
+
+        :return: 等待时间（秒）
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                wait = self._try_acquire()
+                if wait is None:
+                    break
+                # 等待并发名额时由 release 唤醒，等待令牌时按令牌补充时间唤醒
+                self.condition.wait(wait or None)
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """
+        等待并占用一个请求名额（异步模式，等待期间不阻塞事件循环）
+
+        :return: 等待时间（秒）
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.monotonic()
+        while True:
+            with self.condition:
+                wait = self._try_acquire()
+            if wait is None:
+                break
+            await asyncio.sleep(max(wait, self.ASYNC_POLL_INTERVAL))
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        return waited
+
+    def release(self, latency: float, error: Exception = None) -> None:
+        """
+        释放请求名额，并根据请求耗时与结果调整并发上限
+
+        :param latency: 请求耗时（秒）
+        :param error: 请求异常，请求成功时为None
+        """
+        if not self.enabled:
+            return
+
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - 1)
+
+            if error is None:
+                if self.baseline_latency is None or latency < self.baseline_latency:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency += (latency - self.baseline_latency) * 0.01
+            slow = latency > max(self.latency_floor, (self.baseline_latency or latency) * self.latency_tolerance)
+
+            now = time.monotonic()
+            if (error is not None and self.is_overload(error)) or slow:
+                # 乘性减小
+                if now - self.last_decrease >= self.DECREASE_COOLDOWN:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.last_decrease = now
+                    Metrics.inc("moguding_rate_limit_decreases_total", {"family": self.name},
+                                description="Concurrency limit decreases by endpoint family")
+            elif error is None:
+                # 加性增加
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            self.condition.notify_all()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+from common.sqlite_database import SqliteDatabase
+
+REPORT_CONTENT_DB_PATH = (Path(__file__).parent.parent / "data/report_content.db").resolve()
+
+
+class ReportContentStore:
+    """
+    周报、月报内容存储，按 (用户, 实习计划, 报告类型, 周期) 保存AI生成的内容。
+    内容在空闲时段预先生成，提交时直接读取；提交成功后标记为已使用，
+    提交失败时内容保留，下次提交无需重新生成。
+    """
+    # 内容状态
+    STATUS_READY = "ready"
+    STATUS_CONSUMED = "consumed"
+
+    _INSTANCE: "ReportContentStore | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self, path: Path) -> None:
+        self.database = SqliteDatabase(path, [
+            "CREATE TABLE IF NOT EXISTS report_content ("
+            "username TEXT NOT NULL, plan_id TEXT NOT NULL, report_type TEXT NOT NULL, period TEXT NOT NULL, "
+            "content TEXT NOT NULL, status TEXT NOT NULL, created_at REAL NOT NULL, consumed_at REAL, "
+            "PRIMARY KEY (username, plan_id, report_type, period))",
+        ])
+
+    @classmethod
+    def get_instance(cls) -> "ReportContentStore":
+        """
+        获取进程内共享的报告内容存储
+
+        :return: 报告内容存储
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    cls._INSTANCE = ReportContentStore(
+                        Path(os.getenv("REPORT_CONTENT_DB_PATH", str(REPORT_CONTENT_DB_PATH))))
+        return cls._INSTANCE
+
+    def get_ready(self, username: str, plan_id: str, report_type: str, period: str) -> str | None:
+        """
+        读取未使用的报告内容
+
+        :return: 报告内容，不存在或已使用返回None
+        """
+        row = self.database.fetchone(
+            "SELECT content FROM report_content "
+            "WHERE username = ? AND plan_id = ? AND report_type = ? AND period = ? AND status = ?",
+            (username, plan_id, report_type, period, self.STATUS_READY))
+        return row[0] if row else None
+
+    def is_consumed(self, username: str, plan_id: str, report_type: str, period: str) -> bool:
+        """
+        判断报告是否已提交成功
+
+        :return: 是否已提交成功
+        """
+        row = self.database.fetchone(
+            "SELECT 1 FROM report_content "
+            "WHERE username = ? AND plan_id = ? AND report_type = ? AND period = ? AND status = ?",
+            (username, plan_id, report_type, period, self.STATUS_CONSUMED))
+        return row is not None
+
+    def put(self, username: str, plan_id: str, report_type: str, period: str, content: str) -> None:
+        """
+        保存报告内容，已使用的内容不会被覆盖
+        """
+        self.database.execute(
+            "INSERT INTO report_content (username, plan_id, report_type, period, content, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (username, plan_id, report_type, period) DO UPDATE SET "
+            "content = excluded.content, created_at = excluded.created_at WHERE status = ?",
+            (username, plan_id, report_type, period, content, self.STATUS_READY, time.time(), self.STATUS_READY))
+
+    def mark_consumed(self, username: str, plan_id: str, report_type: str, period: str) -> None:
+        """
+        报告提交成功后标记内容为已使用
+        """
+        self.database.execute(
+            "UPDATE report_content SET status = ?, consumed_at = ? "
+            "WHERE username = ? AND plan_id = ? AND report_type = ? AND period = ?",
+            (self.STATUS_CONSUMED, time.time(), username, plan_id, report_type, period))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from common.sqlite_database import SqliteDatabase
+
+REPORT_LEDGER_DB_PATH = (Path(__file__).parent.parent / "data/report_ledger.db").resolve()
+
+
+class ReportLedger:
+    """
+    周报、月报提交记录与实习计划周历缓存。
+
+    记录每个用户最后一次提交的周期，本地判断没有需要提交的报告时无需请求服务端；
+    记录定期（REPORT_RECONCILE_HOURS）与服务端提交列表核对，以发现在app中手动提交的报告。
+    实习计划周历按 planId 缓存，周历未覆盖当前时间时重新获取。
+    """
+    _INSTANCE: "ReportLedger | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self, path: Path) -> None:
+        self.database = SqliteDatabase(path, [
+            "CREATE TABLE IF NOT EXISTS plan_calendar ("
+            "plan_id TEXT PRIMARY KEY, weeks TEXT NOT NULL, fetched_at REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS report_ledger ("
+            "username TEXT NOT NULL, plan_id TEXT NOT NULL, report_type TEXT NOT NULL, "
+            "last_period TEXT, last_end_time TEXT, reconciled_at REAL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (username, plan_id, report_type))",
+        ])
+
+    @classmethod
+    def get_instance(cls) -> "ReportLedger":
+        """
+        获取进程内共享的提交记录
+
+        :return: 提交记录
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    cls._INSTANCE = ReportLedger(
+                        Path(os.getenv("REPORT_LEDGER_DB_PATH", str(REPORT_LEDGER_DB_PATH))))
+        return cls._INSTANCE
+
+    @staticmethod
+    def reconcile_seconds() -> float:
+        """
+        获取与服务端核对提交记录的间隔时间（秒），0表示每次都请求服务端
+
+        :return: 间隔时间
+        """
+        return max(0.0, float(os.getenv("REPORT_RECONCILE_HOURS", "24"))) * 3600
+
+    def get_calendar(self, plan_id: str) -> list[list[str]] | None:
+        """
+        读取缓存的实习计划周历
+
+        :param plan_id: 实习计划id
+        :return: 周历，元素为 [结束时间, 开始时间]，不存在返回None
+        """
+        row = self.database.fetchone("SELECT weeks FROM plan_calendar WHERE plan_id = ?", (plan_id,))
+        return json.loads(row[0]) if row else None
+
+    def put_calendar(self, plan_id: str, weeks: list[list[str]]) -> None:
+        """
+        缓存实习计划周历
+
+        :param plan_id: 实习计划id
+        :param weeks: 周历，元素为 [结束时间, 开始时间]
+        """
+        self.database.execute(
+            "INSERT OR REPLACE INTO plan_calendar (plan_id, weeks, fetched_at) VALUES (?, ?, ?)",
+            (plan_id, json.dumps(weeks), time.time()))
+
+    def get(self, username: str, plan_id: str, report_type: str) -> dict[str, Any] | None:
+        """
+        读取用户最后一次提交的周期
+
+        :return: 提交记录，lastPeriod 为最后提交的周（周报）或月份（月报），不存在返回None
+        """
+        row = self.database.fetchone(
+            "SELECT last_period, last_end_time, reconciled_at FROM report_ledger "
+            "WHERE username = ? AND plan_id = ? AND report_type = ?",
+            (username, plan_id, report_type))
+        if not row:
+            return None
+        return {"lastPeriod": row[0], "lastEndTime": row[1], "reconciledAt": row[2]}
+
+    def is_fresh(self, entry: dict[str, Any] | None) -> bool:
+        """
+        判断提交记录是否在核对间隔内，可以代替服务端的提交列表
+
+        :param entry: 提交记录
+        :return: 是否可以使用
+        """
+        return bool(entry and entry.get("lastPeriod") and entry.get("reconciledAt")
+                    and time.time() - entry.get("reconciledAt") < self.reconcile_seconds())
+
+    def record_submitted(self, username: str, plan_id: str, report_type: str, period: str,
+                         end_time: str = None) -> None:
+        """
+        记录本地提交成功的周期
+
+        :param period: 提交的周（周报）或月份（月报）
+        :param end_time: 提交周期的结束时间（周报）
+        """
+        self.database.execute(
+            "INSERT INTO report_ledger (username, plan_id, report_type, last_period, last_end_time, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (username, plan_id, report_type) DO UPDATE SET "
+            "last_period = excluded.last_period, last_end_time = excluded.last_end_time, "
+            "updated_at = excluded.updated_at",
+            (username, plan_id, report_type, period, end_time, time.time()))
+
+    def reconcile(self, username: str, plan_id: str, report_type: str, period: str | None,
+                  end_time: str = None) -> None:
+        """
+        使用服务端提交列表更新提交记录
+
+        :param period: 服务端最后一次提交的周（周报）或月份（月报），没有提交记录时为None
+        :param end_time: 提交周期的结束时间（周报）
+        """
+        now = time.time()
+        self.database.execute(
+            "INSERT INTO report_ledger "
+            "(username, plan_id, report_type, last_period, last_end_time, reconciled_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (username, plan_id, report_type) DO UPDATE SET "
+            "last_period = excluded.last_period, last_end_time = excluded.last_end_time, "
+            "reconciled_at = excluded.reconciled_at, updated_at = excluded.updated_at",
+            (username, plan_id, report_type, period, end_time, now, now))
+
+
+if __name__ == '__main__':
+    pass
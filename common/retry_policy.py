@@ -0,0 +1,300 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import httpx
+from requests import ConnectTimeout, ConnectionError as RequestsConnectionError
+from urllib3.exceptions import NewConnectionError
+
+from common.logger_manager import LoggerManager
+
+
+def response_status(error: Exception) -> int | None:
+    """
+    获取请求异常对应的响应状态码
+
+    :param error: 请求异常
+    :return: 响应状态码，未收到响应返回None
+    """
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_connect_error(error: Exception) -> bool:
+    """
+    判断请求是否在建立连接阶段失败（请求未发送到服务端，重试不会产生重复提交）
+
+    :param error: 请求异常
+    :return: 是否为连接阶段失败
+    """
+    if isinstance(error, (ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    if isinstance(error, RequestsConnectionError) and error.args:
+        # urllib3 将连接失败包装在 MaxRetryError.reason 中
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    接口重试策略，指数退避 + 随机抖动
+    """
+    # 最大尝试次数（包含首次请求）
+    retries: int = 5
+    # 退避基础时间（秒），第n次重试前等待 [0, base_delay * 2^(n-1)] 内的随机时间
+    base_delay: float = 1.0
+    # 单次退避最长时间（秒）
+    max_delay: float = 30.0
+    # 接口是否幂等；非幂等接口仅在请求未发送到服务端时重试，避免重复提交
+    idempotent: bool = True
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次请求失败后的等待时间
+
+        :param attempt: 已尝试次数
+        :return: 等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        判断请求异常是否可以重试
+
+        :param error: 请求异常
+        :return: 是否可以重试
+        """
+        if is_connect_error(error):
+            return True
+        if not self.idempotent:
+            return False
+
+        # 客户端错误重试无意义（限流除外）
+        status = response_status(error)
+        return status is None or status >= 500 or status == 429
+
+    @classmethod
+    def for_url(cls, url: str, retries: int = None, delay: float = None) -> "RetryPolicy":
+        """
+        获取接口对应的重试策略
+
+        :param url: 请求url
+        :param retries: 指定最大尝试次数（可选）
+        :param delay: 指定退避基础时间（可选）
+        :return: 重试策略
+        """
+        path = urlsplit(url).path
+        policy = next((policy for prefix, policy in ENDPOINT_POLICIES if path.startswith(prefix)), DEFAULT_POLICY)
+
+        if retries is not None or delay is not None:
+            policy = RetryPolicy(retries=retries if retries is not None else policy.retries,
+                                 base_delay=delay if delay is not None else policy.base_delay,
+                                 max_delay=policy.max_delay, idempotent=policy.idempotent)
+        return policy
+
+
+# 默认重试策略
+DEFAULT_POLICY = RetryPolicy()
+
+# 接口重试策略，按路径前缀匹配
+ENDPOINT_POLICIES: list[tuple[str, RetryPolicy]] = [
+    # 验证码有效期短，失败后尽快重试
+    ("/session/captcha/", RetryPolicy(retries=3, base_delay=0.5, max_delay=4.0)),
+    # 签到、提交周报/月报为非幂等接口
+    ("/attendence/clock/v4/save", RetryPolicy(retries=3, base_delay=2.0, idempotent=False)),
+    ("/practice/paper/v6/save", RetryPolicy(retries=3, base_delay=2.0, idempotent=False)),
+]
+
+
+class RetryBudget:
+    """
+    进程内共享的重试预算。
+
+    每个请求存入 ratio 个令牌，每次重试消耗一个令牌，另外每秒补充 min_per_second 个令牌，
+    服务端整体故障时重试请求数量最多约为正常请求数量的 ratio 倍，避免所有用户同时重试放大故障。
+    """
+    _INSTANCE: "RetryBudget | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self, ratio: float = None, min_per_second: float = None) -> None:
+        # 每个请求存入的令牌数
+        self.ratio: float = ratio if ratio is not None else float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))
+        # 每秒补充的令牌数
+        self.min_per_second: float = min_per_second if min_per_second is not None else float(
+            os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "1"))
+        # 令牌上限
+        self.capacity: float = max(10.0, self.min_per_second * 10)
+
+        self.tokens: float = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "RetryBudget":
+        """
+        获取进程内共享的重试预算
+
+        :return: 重试预算
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    cls._INSTANCE = RetryBudget()
+        return cls._INSTANCE
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.min_per_second)
+        self.last_refill = now
+
+    def deposit(self) -> None:
+        """
+        记录一次请求
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        申请一次重试
+
+        :return: 预算是否充足
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    按主机共享的熔断器。
+
+    连续失败达到 failure_threshold 次后打开，打开期间请求直接失败；
+    open_seconds 秒后进入半开状态，仅放行 half_open_probes 个探测请求，探测成功则关闭，失败则重新打开。
+    """
+    STATE_CLOSED = "closed"
+    STATE_OPEN = "open"
+    STATE_HALF_OPEN = "half_open"
+
+    _BREAKERS: dict[str, "CircuitBreaker"] = {}
+    _BREAKERS_LOCK = threading.Lock()
+
+    def __init__(self, name: str, failure_threshold: int = None, open_seconds: float = None,
+                 half_open_probes: int = None) -> None:
+        self.name = name
+        # 打开熔断的连续失败次数
+        self.failure_threshold: int = max(1, failure_threshold or int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "10")))
+        # 熔断打开持续时间（秒）
+        self.open_seconds: float = open_seconds if open_seconds is not None else float(
+            os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+        # 半开状态下允许的探测请求数量
+        self.half_open_probes: int = max(1, half_open_probes or int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1")))
+
+        self.state = self.STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_url(cls, url: str) -> "CircuitBreaker":
+        """
+        获取请求url所属主机的熔断器
+
+        :param url: 请求url
+        :return: 熔断器
+        """
+        host = urlsplit(url).netloc
+        breaker = cls._BREAKERS.get(host)
+        if breaker is None:
+            with cls._BREAKERS_LOCK:
+                breaker = cls._BREAKERS.setdefault(host, CircuitBreaker(host))
+        return breaker
+
+    @staticmethod
+    def is_failure(error: Exception) -> bool:
+        """
+        判断请求异常是否说明服务端不可用（网络错误、超时、5xx）
+
+        :param error: 请求异常
+        :return: 是否计入失败
+        """
+        status = response_status(error)
+        return status is None or status >= 500
+
+    def _transition(self, state: str) -> None:
+        # 记录状态变化
+        LoggerManager.get_system_logger().warning(
+            f"熔断器状态变化 > 主机: {self.name}, {self.state} -> {state}, 连续失败: {self.failures}")
+        self.state = state
+
+    def allow(self) -> bool:
+        """
+        判断是否允许发送请求
+
+        :return: 是否允许
+        """
+        with self.lock:
+            if self.state == self.STATE_OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.probes = 0
+                self._transition(self.STATE_HALF_OPEN)
+
+            if self.state == self.STATE_HALF_OPEN:
+                if self.probes >= self.half_open_probes:
+                    return False
+                self.probes += 1
+
+            return True
+
+    def release_probe(self) -> None:
+        """
+        释放半开状态下的探测名额（探测请求被取消或出现未记录结果的异常时调用），避免熔断器一直停留在半开状态
+        """
+        with self.lock:
+            if self.state == self.STATE_HALF_OPEN and self.probes > 0:
+                self.probes -= 1
+
+    def record_success(self) -> None:
+        """
+        记录请求成功
+        """
+        with self.lock:
+            self.failures = 0
+            if self.state != self.STATE_CLOSED:
+                self._transition(self.STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        记录请求失败
+        """
+        with self.lock:
+            self.failures += 1
+            if self.state == self.STATE_HALF_OPEN or (
+                    self.state == self.STATE_CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(self.STATE_OPEN)
+
+    def record_error(self, error: Exception) -> None:
+        """
+        记录请求异常，仅网络错误、超时、5xx计入失败，其余说明服务端可以正常响应
+
+        :param error: 请求异常
+        """
+        if self.is_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from common.schedule_index import ScheduleIndex
+
+
+@dataclass
+class RosterDiff:
+    """
+    两次加载之间的用户配置变化
+    """
+    # 新增的用户配置
+    added: list[dict[str, Any]] = field(default_factory=list)
+    # 修改的用户配置
+    changed: list[dict[str, Any]] = field(default_factory=list)
+    # 移除的用户名称
+    removed: list[str] = field(default_factory=list)
+    # 账号或密码发生变化的用户名称（已保存的登陆信息不再可用）
+    credentials_changed: list[str] = field(default_factory=list)
+    # 校验失败被跳过的条目
+    errors: list[str] = field(default_factory=list)
+    # 校验警告（条目仍然加载，但部分任务时间不会生效）
+    warnings: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed or self.errors or self.warnings)
+
+
+class Roster:
+    """
+    用户配置加载器，缓存解析与校验后的用户配置，文件未变化时不重新读取。
+
+    支持三种格式:
+    - JSON 文件（users.json）: {"users": [用户配置, ...]}
+    - JSON Lines 文件（*.jsonl）: 每行一个用户配置，逐行读取
+    - 目录: 每个 *.json 文件为一个用户配置
+
+    文件的修改时间与大小未变化时直接使用缓存；变化后计算内容的 SHA-256，内容未变化（如仅被 touch）时同样不重新解析。
+    每个条目按内容指纹缓存，未变化的条目无需再次解析和校验，每次加载返回与上一次相比新增、修改、移除的用户。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        # 用户名称 → 校验后的用户配置（按配置文件中的顺序）
+        self.users: dict[str, dict[str, Any]] = {}
+        # 用户名称 → 条目指纹
+        self.fingerprints: dict[str, str] = {}
+        # 条目指纹 → 校验后的用户配置，校验失败为None
+        self.entries: dict[str, dict[str, Any] | None] = {}
+        # 文件 → (修改时间, 大小, 内容指纹)
+        self.file_states: dict[Path, tuple[int, int, str]] = {}
+
+    @staticmethod
+    def fingerprint(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def validate_user(user: Any) -> tuple[list[str], list[str]]:
+        """
+        校验单个用户配置
+
+        :param user: 用户配置
+        :return: (错误列表, 警告列表)，存在错误时跳过该用户
+        """
+        if not isinstance(user, dict):
+            return ["用户配置不是JSON对象"], []
+
+        errors: list[str] = []
+        for key in ("username", "phone", "password"):
+            if not isinstance(user.get(key), str) or not user.get(key).strip():
+                errors.append(f"缺少 {key}")
+        config_info = user.get("configInfo")
+        if not isinstance(config_info, dict):
+            errors.append("缺少 configInfo")
+            return errors, []
+
+        # 任务时间: 配置了但无法识别时，对应的任务不会执行
+        warnings: list[str] = []
+        time_setting: dict[str, Any] = config_info.get("timeSetting") or {}
+        checks = (
+            ("signInTime", "start", 0, 23), ("signInTime", "end", 0, 23),
+            ("weeklyReportTime", "week", 1, 7), ("weeklyReportTime", "time", 0, 23),
+            ("monthlyReportTime", "day", 1, 31), ("monthlyReportTime", "time", 0, 23),
+        )
+        for setting, key, low, high in checks:
+            value = (time_setting.get(setting) or {}).get(key)
+            if value is None or value == "":
+                continue
+            number = ScheduleIndex.parse_int(value)
+            if number is None or not low <= number <= high:
+                warnings.append(f"{setting}.{key} 无效: {value}")
+        return errors, warnings
+
+    def _stat_changed(self, path: Path) -> tuple[int, int] | None:
+        # 返回新的 (修改时间, 大小)，未变化时返回None
+        stat = path.stat()
+        state = self.file_states.get(path)
+        if state is not None and state[:2] == (stat.st_mtime_ns, stat.st_size):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_json(self) -> list[tuple[str, Any, str]] | None:
+        stat = self._stat_changed(self.path)
+        if stat is None:
+            return None
+        data = self.path.read_bytes()
+        digest = self.fingerprint(data)
+        previous = self.file_states.get(self.path)
+        if previous is not None and previous[2] == digest:
+            self.file_states = {self.path: (*stat, digest)}
+            return None
+
+        # 解析成功后再记录文件状态，文件格式错误时下次加载重新解析
+        users: list[Any] = (json.loads(data) or {}).get("users") or []
+        self.file_states = {self.path: (*stat, digest)}
+        return [(self.fingerprint(json.dumps(user, ensure_ascii=False, sort_keys=True).encode("utf-8")), user,
+                 f"第{index + 1}个用户") for index, user in enumerate(users)]
+
+    def _read_jsonl(self) -> list[tuple[str, Any, str]] | None:
+        stat = self._stat_changed(self.path)
+        if stat is None:
+            return None
+
+        # 逐行读取，同时计算整个文件与每一行的指纹
+        digest = hashlib.sha256()
+        entries: list[tuple[str, Any, str]] = []
+        with open(file=self.path, mode="rb") as file:
+            for number, line in enumerate(file, start=1):
+                digest.update(line)
+                line = line.strip()
+                if line:
+                    entries.append((self.fingerprint(line), line, f"第{number}行"))
+
+        previous = self.file_states.get(self.path)
+        self.file_states = {self.path: (*stat, digest.hexdigest())}
+        if previous is not None and previous[2] == digest.hexdigest():
+            return None
+        return entries
+
+    def _read_directory(self) -> list[tuple[str, Any, str]] | None:
+        changed = False
+        file_states: dict[Path, tuple[int, int, str]] = {}
+        entries: list[tuple[str, Any, str]] = []
+        for path in sorted(self.path.glob("*.json")):
+            stat = self._stat_changed(path)
+            if stat is None:
+                # 未修改的文件只使用缓存的指纹（对应的条目已在缓存中）
+                file_states[path] = self.file_states[path]
+                entries.append((file_states[path][2], None, path.name))
+                continue
+            data = path.read_bytes()
+            file_states[path] = (*stat, self.fingerprint(data))
+            entries.append((file_states[path][2], data, path.name))
+            changed = changed or self.file_states.get(path, (0, 0, ""))[2] != file_states[path][2]
+
+        # 文件被删除
+        changed = changed or file_states.keys() != self.file_states.keys()
+        self.file_states = file_states
+        return entries if changed else None
+
+    def _parse_entry(self, raw: Any, source: str) -> tuple[dict[str, Any] | None, list[str], list[str]]:
+        try:
+            user = json.loads(raw) if isinstance(raw, (bytes, str)) else raw
+        except ValueError as e:
+            return None, [f"{source}: JSON格式错误: {e}"], []
+        errors, warnings = self.validate_user(user)
+        name = user.get("username") if isinstance(user, dict) else None
+        prefix = f"{source}({name})" if name else source
+        return (None if errors else user), [f"{prefix}: {error}" for error in errors], \
+            [f"{prefix}: {warning}" for warning in warnings]
+
+    def load(self) -> RosterDiff:
+        """
+        加载用户配置，返回与上一次加载相比的变化（首次加载时所有用户均为新增）
+
+        :return: 用户配置变化
+        """
+        with self.lock:
+            if self.path.is_dir():
+                entries = self._read_directory()
+            elif self.path.suffix.lower() == ".jsonl":
+                entries = self._read_jsonl()
+            else:
+                entries = self._read_json()
+            if entries is None:
+                return RosterDiff()
+
+            diff = RosterDiff()
+            users: dict[str, dict[str, Any]] = {}
+            fingerprints: dict[str, str] = {}
+            cached_entries: dict[str, dict[str, Any] | None] = {}
+            for fingerprint, raw, source in entries:
+                # 未变化的条目直接使用缓存，不再解析和校验
+                if fingerprint in self.entries:
+                    user = self.entries[fingerprint]
+                else:
+                    user, errors, warnings = self._parse_entry(raw, source)
+                    diff.errors.extend(errors)
+                    diff.warnings.extend(warnings)
+                cached_entries[fingerprint] = user
+                if user is None:
+                    continue
+
+                username: str = user.get("username")
+                if username in users:
+                    diff.errors.append(f"{source}: 用户名称重复: {username}")
+                    continue
+                users[username] = user
+                fingerprints[username] = fingerprint
+
+            for username, user in users.items():
+                previous = self.users.get(username)
+                if previous is None:
+                    diff.added.append(user)
+                elif self.fingerprints.get(username) != fingerprints[username]:
+                    diff.changed.append(user)
+                    if (previous.get("phone"), previous.get("password")) != (user.get("phone"), user.get("password")):
+                        diff.credentials_changed.append(username)
+            diff.removed = [username for username in self.users if username not in users]
+
+            self.users, self.fingerprints, self.entries = users, fingerprints, cached_entries
+            return diff
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,154 @@
+import datetime
+from typing import Any
+
+
+class ScheduleIndex:
+    """
+    用户任务时间索引，将 users.json 中的 timeSetting 预先编译为
+    (小时) / (星期, 小时) / (日期, 小时) → 用户名 的索引，
+    每次调度时只需查询当前时间对应的用户，而不必遍历所有用户。
+    """
+    # 任务名称
+    TASK_SIGN_IN = "signIn"
+    TASK_WEEKLY_REPORT = "weeklyReport"
+    TASK_MONTHLY_REPORT = "monthlyReport"
+    # 任务执行顺序
+    TASK_ORDER = (TASK_SIGN_IN, TASK_WEEKLY_REPORT, TASK_MONTHLY_REPORT)
+
+    def __init__(self, users: list[dict[str, Any]] = None) -> None:
+        # 用户名到用户配置信息的映射
+        self.users: dict[str, dict[str, Any]] = {}
+        # 签到索引: 小时 → 用户名集合
+        self.sign_in_index: dict[int, set[str]] = {}
+        # 周报索引: (星期1-7, 小时) → 用户名集合
+        self.weekly_report_index: dict[tuple[int, int], set[str]] = {}
+        # 月报索引: (日期, 小时) → 用户名集合
+        self.monthly_report_index: dict[tuple[int, int], set[str]] = {}
+        # 用户名到其所在索引键的映射，用于移除用户
+        self.user_keys: dict[str, list[tuple[dict, Any]]] = {}
+
+        for user in users or []:
+            self.add_user(user)
+
+    @staticmethod
+    def parse_int(value: Any) -> int | None:
+        """
+        将配置中的时间值（如 "09"、9）转换为整数，无法转换时返回None
+
+        :param value: 配置值
+        :return: 整数值
+        """
+        if value is None or value == "":
+            return None
+        try:
+            return int(str(value).strip())
+        except ValueError:
+            return None
+
+    @classmethod
+    def compile_user(cls, user: dict[str, Any]) -> list[tuple[str, Any]]:
+        """
+        将单个用户的 timeSetting 编译为 (任务名称, 索引键) 列表
+
+        :param user: 用户配置信息
+        :return: 索引键列表
+        """
+        time_setting: dict[str, Any] = (user.get("configInfo") or {}).get("timeSetting") or {}
+        keys: list[tuple[str, Any]] = []
+
+        # 签到时间（上班、下班）
+        sign_in_time = time_setting.get("signInTime") or {}
+        for hour in {cls.parse_int(sign_in_time.get("start")), cls.parse_int(sign_in_time.get("end"))}:
+            if hour is not None and 0 <= hour <= 23:
+                keys.append((cls.TASK_SIGN_IN, hour))
+
+        # 周报时间
+        weekly_report_time = time_setting.get("weeklyReportTime") or {}
+        week = cls.parse_int(weekly_report_time.get("week"))
+        hour = cls.parse_int(weekly_report_time.get("time"))
+        if week is not None and hour is not None and 1 <= week <= 7 and 0 <= hour <= 23:
+            keys.append((cls.TASK_WEEKLY_REPORT, (week, hour)))
+
+        # 月报时间
+        monthly_report_time = time_setting.get("monthlyReportTime") or {}
+        day = cls.parse_int(monthly_report_time.get("day"))
+        hour = cls.parse_int(monthly_report_time.get("time"))
+        if day is not None and hour is not None and 1 <= day <= 31 and 0 <= hour <= 23:
+            keys.append((cls.TASK_MONTHLY_REPORT, (day, hour)))
+
+        return keys
+
+    def _index_of(self, task: str) -> dict:
+        return {
+            self.TASK_SIGN_IN: self.sign_in_index,
+            self.TASK_WEEKLY_REPORT: self.weekly_report_index,
+            self.TASK_MONTHLY_REPORT: self.monthly_report_index,
+        }[task]
+
+    def add_user(self, user: dict[str, Any]) -> None:
+        """
+        添加（或更新）用户到索引中
+
+        :param user: 用户配置信息
+        """
+        username: str = user.get("username")
+        if username in self.users:
+            self.remove_user(username)
+
+        self.users[username] = user
+        self.user_keys[username] = []
+        for task, key in self.compile_user(user):
+            index = self._index_of(task)
+            index.setdefault(key, set()).add(username)
+            self.user_keys[username].append((index, key))
+
+    def remove_user(self, username: str) -> None:
+        """
+        从索引中移除用户
+
+        :param username: 用户名称
+        """
+        self.users.pop(username, None)
+        for index, key in self.user_keys.pop(username, []):
+            usernames = index.get(key)
+            if usernames is None:
+                continue
+            usernames.discard(username)
+            if not usernames:
+                del index[key]
+
+    def get_users(self, usernames: list[str]) -> list[dict[str, Any]]:
+        """
+        获取用户配置信息，跳过已被移除的用户（查询到期用户后、获取配置前用户配置可能被重新加载）
+
+        :param usernames: 用户名称列表
+        :return: 用户配置信息列表
+        """
+        users = [self.users.get(username) for username in usernames]
+        return [user for user in users if user is not None]
+
+    def due(self, now: datetime.datetime) -> dict[str, list[str]]:
+        """
+        获取指定时间需要执行的 (用户, 任务)
+
+        :param now: 调度时间
+        :return: 用户名 → 按执行顺序排列的任务名称列表
+        """
+        due_tasks: dict[str, set[str]] = {}
+
+        # 复制用户名集合后再遍历，避免用户配置更新时集合在遍历过程中被修改
+        for username in tuple(self.sign_in_index.get(now.hour, ())):
+            due_tasks.setdefault(username, set()).add(self.TASK_SIGN_IN)
+        for username in tuple(self.weekly_report_index.get((now.weekday() + 1, now.hour), ())):
+            due_tasks.setdefault(username, set()).add(self.TASK_WEEKLY_REPORT)
+        for username in tuple(self.monthly_report_index.get((now.day, now.hour), ())):
+            due_tasks.setdefault(username, set()).add(self.TASK_MONTHLY_REPORT)
+
+        return {
+            username: [task for task in self.TASK_ORDER if task in tasks]
+            for username, tasks in due_tasks.items()
+        }
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,153 @@
+import binascii
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+from common.constant import Constant
+
+
+class Signing:
+    """
+    请求加密与签名。
+
+    AES 加密器按密钥缓存复用（ECB 模式无链接状态，可在多线程中共享）；
+    用户固定不变的 Sign 请求头预先计算后随登陆信息一起保存（signInfo），所有模块通过本类统一获取请求参数 t 与 Sign 请求头。
+    """
+    # 按密钥缓存的加密器
+    _CIPHERS: "OrderedDict[bytes, Any]" = OrderedDict()
+    _CIPHERS_LOCK = threading.Lock()
+    # 缓存的加密器数量上限（验证码的密钥每次都不同，避免无限增长）
+    _CIPHERS_MAXSIZE = 64
+
+    @classmethod
+    def cipher(cls, key: str | bytes) -> Any:
+        """
+        获取指定密钥的 AES-ECB 加密器
+
+        :param key: 密钥（16、24 或 32 字节）
+        :return: 加密器
+        """
+        if type(key) != bytes:
+            key = key.encode("utf-8")
+
+        with cls._CIPHERS_LOCK:
+            cipher = cls._CIPHERS.get(key)
+            if cipher is not None:
+                cls._CIPHERS.move_to_end(key)
+                return cipher
+
+            cipher = AES.new(key, AES.MODE_ECB)
+            cls._CIPHERS[key] = cipher
+            if len(cls._CIPHERS) > cls._CIPHERS_MAXSIZE:
+                cls._CIPHERS.popitem(last=False)
+            return cipher
+
+    @classmethod
+    def aes_encrypt(cls, input_string: str, key: str | bytes = Constant.AES_ENCRYPT_SECRET_KEY) -> str:
+        """
+        AES-ECB 加密，Pkcs7 填充
+
+        :param input_string: 需要加密的字符串
+        :param key: 密钥
+        :return: 密文（大写十六进制）
+        """
+        encrypted_data = cls.cipher(key).encrypt(pad(input_string.encode("utf-8"), AES.block_size))
+        return binascii.hexlify(encrypted_data).decode("utf-8").upper()
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def aes_encrypt_static(input_string: str) -> str:
+        """
+        加密固定不变的内容（手机号、密码），结果缓存在进程内
+
+        :param input_string: 需要加密的字符串
+        :return: 密文（大写十六进制）
+        """
+        return Signing.aes_encrypt(input_string)
+
+    @classmethod
+    def timestamp(cls) -> str:
+        """
+        生成请求参数 t（加密的毫秒时间戳）
+
+        :return: 密文（大写十六进制）
+        """
+        return cls.aes_encrypt(str(int(time.time() * 1000)))
+
+    @staticmethod
+    def md5(data: str) -> str:
+        return hashlib.md5(data.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def material(cls, user_login_info: dict[str, Any]) -> dict[str, str]:
+        """
+        获取用户固定不变的签名，保存在登陆信息的 signInfo 中，userId、roleKey 变化后重新计算
+
+        :param user_login_info: 用户登陆信息
+        :return: 签名信息
+        """
+        login_info: dict[str, Any] = user_login_info.get("loginInfo")
+        fingerprint = f"{login_info.get('userId')}:{login_info.get('roleKey')}"
+
+        sign_info: dict[str, str] = user_login_info.get("signInfo") or {}
+        if sign_info.get("fingerprint") != fingerprint:
+            prefix = login_info.get("userId") + login_info.get("roleKey")
+            sign_info = {
+                "fingerprint": fingerprint,
+                # 获取实习计划等通用请求
+                "default": cls.md5(prefix + Constant.MD5_SALT),
+                # 获取周报、月报提交列表
+                "weekList": cls.md5(prefix + "week" + Constant.MD5_SALT),
+                "monthList": cls.md5(prefix + "month" + Constant.MD5_SALT),
+            }
+            user_login_info["signInfo"] = sign_info
+        return sign_info
+
+    @classmethod
+    def default_sign(cls, user_login_info: dict[str, Any]) -> str:
+        """
+        通用请求（获取实习计划等）的 Sign 请求头
+        """
+        return cls.material(user_login_info).get("default")
+
+    @classmethod
+    def report_list_sign(cls, user_login_info: dict[str, Any], report_type: str) -> str:
+        """
+        获取周报、月报提交列表的 Sign 请求头
+
+        :param report_type: 报告类型，week 或 month
+        """
+        return cls.material(user_login_info).get(f"{report_type}List")
+
+    @classmethod
+    def report_save_sign(cls, user_login_info: dict[str, Any], report_type: str, title: str) -> str:
+        """
+        提交周报、月报的 Sign 请求头
+
+        :param report_type: 报告类型，week 或 month
+        :param title: 报告标题
+        """
+        return cls.md5(user_login_info.get("loginInfo").get("userId") + report_type
+                       + user_login_info.get("planInfo").get("planId") + title + Constant.MD5_SALT)
+
+    @classmethod
+    def clock_sign(cls, user_login_info: dict[str, Any], device: str, clock_type: str, address: str) -> str:
+        """
+        签到的 Sign 请求头
+
+        :param device: 设备类型
+        :param clock_type: 签到类型
+        :param address: 签到地址
+        """
+        return cls.md5(device + clock_type + user_login_info.get("planInfo").get("planId")
+                       + user_login_info.get("loginInfo").get("userId") + address + Constant.MD5_SALT)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class SqliteDatabase:
+    """
+    SQLite 数据库连接封装，使用 WAL 模式，单连接 + 进程内锁，可在多线程中共享使用。
+    """
+
+    def __init__(self, path: Path, schema: list[str] = None) -> None:
+        """
+        :param path: 数据库文件路径
+        :param schema: 建表语句列表
+        """
+        self.path = path
+        self.lock = threading.RLock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema or []:
+            self.connection.execute(statement)
+
+    def execute(self, sql: str, parameters: tuple | list = ()) -> sqlite3.Cursor:
+        with self.lock:
+            return self.connection.execute(sql, parameters)
+
+    def fetchone(self, sql: str, parameters: tuple | list = ()) -> tuple | None:
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchone()
+
+    def fetchall(self, sql: str, parameters: tuple | list = ()) -> list[tuple]:
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        写事务（BEGIN IMMEDIATE），异常时回滚
+
+        :return: 数据库连接
+        """
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def data_version(self) -> Any:
+        """
+        获取数据版本，其他连接（进程）提交修改后会发生变化
+
+        :return: 数据版本
+        """
+        return self.fetchone("PRAGMA data_version")[0]
+
+
+if __name__ == '__main__':
+    pass
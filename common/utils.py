@@ -4,22 +4,20 @@ import hashlib
 import json
 import os
 import random
-import smtplib
 import time
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
 from typing import Any
 
-import cv2
-import numpy as np
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
-from openai import OpenAI, OpenAIError
-from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
 from requests import RequestException, Response
 
+from common.ai_client import AIClientManager
 from common.constant import Constant
+from common.metrics import Metrics
+from common.rate_limiter import RateLimiter
+from common.retry_policy import CircuitBreaker, RetryBudget, RetryPolicy, response_status
+from common.signing import Signing
 
 
 class Utils:
@@ -46,24 +44,8 @@ class Utils:
         :return: 加密后的密文（十六进制表示）
         """
 
-        # 将输入字符串转换为字节
-        data = input_string.encode('utf-8')
-
-        # 将输入密钥转换为字节
-        if type(key) != bytes:
-            key = key.encode('utf8')
-
-        # 填充数据
-        cipher = AES.new(key, AES.MODE_ECB)
-
-        # 使用 Pkcs7 填充
-        padded_data = pad(data, AES.block_size)
-
-        # 执行加密
-        encrypted_data = cipher.encrypt(padded_data)
-
-        # 返回密文，转为大写的十六进制字符串
-        return binascii.hexlify(encrypted_data).decode('utf-8').upper()
+        # 使用按密钥缓存的加密器
+        return Signing.aes_encrypt(input_string, key)
 
     @staticmethod
     def aes_encrypt_base64(plaintext, key: str | bytes = Constant.AES_ENCRYPT_BASE64_SECRET_KEY):
@@ -80,15 +62,11 @@ class Utils:
         # 将密钥和明文转换为字节
         plaintext_bytes = plaintext.encode('utf-8')
 
-        # 将输入密钥转换为字节
-        if type(key) != bytes:
-            key = key.encode('utf8')
-
         # 使用 PKCS7 填充明文
         padded_plaintext = pad(plaintext_bytes, AES.block_size)
 
-        # 初始化 AES 加密器
-        cipher = AES.new(key, AES.MODE_ECB)
+        # 获取 AES 加密器
+        cipher = Signing.cipher(key)
 
         # 加密消息
         ciphertext = cipher.encrypt(padded_plaintext)
@@ -106,8 +84,8 @@ class Utils:
         # 将字节转换为 Base64 编码的字符串
         base64_str = base64.b64encode(hex_bytes).decode('utf-8')
 
-        # 创建 AES 解密器
-        cipher = AES.new(key, AES.MODE_ECB)
+        # 获取 AES 解密器
+        cipher = Signing.cipher(key)
 
         # 将加密字符串解码为字节
         encrypted_bytes = base64.b64decode(base64_str)
@@ -156,6 +134,20 @@ class Utils:
 
     @staticmethod
     def picture_identify(image_data):
+        start = time.perf_counter()
+        try:
+            return Utils._picture_identify(image_data)
+        finally:
+            Metrics.observe("moguding_captcha_identify_duration_seconds", time.perf_counter() - start,
+                            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+                            description="Captcha jigsaw identification time")
+
+    @staticmethod
+    def _picture_identify(image_data):
+        # OpenCV 只在登陆处理验证码时使用，首次调用时再导入
+        import cv2
+        import numpy as np
+
         # 解码 base64 数据为图像
         image_array = np.frombuffer(image_data, dtype=np.uint8)
         image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
@@ -219,31 +211,39 @@ class Utils:
         if not (ai_base_url and ai_api_key and ai_model):
             raise ValueError("AI服务配置不完整, 无法自动撰写周报, 月报")
 
-        try:
-            client = OpenAI(
-                base_url=ai_base_url,
-                api_key=ai_api_key,
-            )
-
-            completion = client.chat.completions.create(
-                model=ai_model,
-                messages=[
-                    ChatCompletionSystemMessageParam(
-                        role="system",
-                        content="你是工作实习报告助手，专门撰写不同岗位的周报和月报"
-                    ),
-                    ChatCompletionUserMessageParam(
-                        role="user",
-                        content=content
-                    ),
-                ],
-            )
-
-            return completion.choices[0].message.content
-        except OpenAIError as e:
-            return e
-        except RequestException as e:
-            return e
+        # OpenAI SDK 只在撰写报告时使用，首次调用时再导入
+        from openai import OpenAIError
+        from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+
+        with Metrics.timer("moguding_ai_generation_duration_seconds",
+                           description="AI report generation time") as labels:
+            try:
+                # 复用进程内共享的客户端，并限制同时进行中的请求数量
+                client = AIClientManager.get_client(ai_base_url, ai_api_key)
+
+                with AIClientManager.slot():
+                    completion = client.chat.completions.create(
+                        model=ai_model,
+                        messages=[
+                            ChatCompletionSystemMessageParam(
+                                role="system",
+                                content="你是工作实习报告助手，专门撰写不同岗位的周报和月报"
+                            ),
+                            ChatCompletionUserMessageParam(
+                                role="user",
+                                content=content
+                            ),
+                        ],
+                        timeout=AIClientManager.timeout(),
+                    )
+
+                return completion.choices[0].message.content
+            except OpenAIError as e:
+                labels["result"] = "failure"
+                return e
+            except RequestException as e:
+                labels["result"] = "failure"
+                return e
 
     @staticmethod
     def generate_uuid():
@@ -271,9 +271,9 @@ class Utils:
     @staticmethod
     def send_request(request_class_config: dict[str, Any], url: str,
                      method: str = "get", data: dict = None,
-                     response_type: str = "json", raise_for_status: bool = True, retries: int = 5,
-                     delay: int = 5) -> Response | dict:
-        """ 发送请求，支持重试机制 """
+                     response_type: str = "json", raise_for_status: bool = True, retries: int = None,
+                     delay: float = None) -> Response | dict:
+        """ 发送请求，按接口重试策略进行指数退避重试，并受全局重试预算与熔断器限制 """
         # 获取logger
         logger = request_class_config.get("logger")
         # 获取业务异常
@@ -292,8 +292,26 @@ class Utils:
         # 根据请求方法选择合适的请求类型
         request_method = getattr(session, method)
 
+        # 接口重试策略、全局重试预算、主机熔断器、接口分组限流器
+        policy = RetryPolicy.for_url(url, retries, delay)
+        budget = RetryBudget.get_instance()
+        breaker = CircuitBreaker.for_url(url)
+        limiter = RateLimiter.for_url(url)
+        budget.deposit()
+
         # 发送请求并处理异常
-        for attempt in range(1, retries + 1):
+        for attempt in range(1, policy.retries + 1):
+            # 熔断打开时直接失败
+            if not breaker.allow():
+                logger.error(f"请求失败, 失败url: {url}, 失败原因: 服务暂时不可用, 熔断中")
+                Metrics.record_request(url, "circuit_open")
+                raise business_exception
+
+            # 等待限流名额
+            limiter.acquire()
+            start = time.perf_counter()
+            error: RequestException | None = None
+            recorded = False
             try:
                 # 根据方法发送请求
                 if method == "get":
@@ -306,24 +324,66 @@ class Utils:
                     response.raise_for_status()
 
                 # 根据类型返回值
-                if response_type.lower() == "json":
-                    return response.json()
+                result = response.json() if response_type.lower() == "json" else response
 
-                return response
+                breaker.record_success()
+                recorded = True
+                Metrics.record_request(url, response.status_code, time.perf_counter() - start)
+                return result
 
             except RequestException as e:
-                logger.error(f"请求失败, 失败url: {url}, 失败原因: {e} (尝试 {attempt}/{retries})")
-
-            # 如果已经到达最大重试次数，则返回None
-            if attempt == retries:
+                error = e
+                breaker.record_error(e)
+                recorded = True
+                Metrics.record_request(url, response_status(e) or type(e).__name__, time.perf_counter() - start)
+                logger.error(f"请求失败, 失败url: {url}, 失败原因: {e} (尝试 {attempt}/{policy.retries})")
+                if not policy.is_retryable(e):
+                    logger.error(f"请求失败, 失败url: {url}, 请求不可重试, 请求失败！")
+                    raise business_exception
+            finally:
+                # 释放限流名额，并根据耗时与结果调整并发上限
+                limiter.release(time.perf_counter() - start, error)
+                # 熔断器未记录结果时（请求被取消或出现其他异常）释放探测名额
+                if not recorded:
+                    breaker.release_probe()
+
+            # 如果已经到达最大重试次数，则抛出业务异常
+            if attempt == policy.retries:
                 logger.error(f"请求失败, 失败url: {url}, 超过最大重试次数, 请求失败！")
                 raise business_exception
 
-            # 否则等待后重试
-            time.sleep(delay)
+            # 全局重试预算耗尽时不再重试
+            if not budget.withdraw():
+                logger.error(f"请求失败, 失败url: {url}, 重试预算已耗尽, 请求失败！")
+                raise business_exception
+
+            # 否则退避后重试
+            Metrics.record_retry(url)
+            time.sleep(policy.backoff(attempt))
 
         raise business_exception
 
+    @staticmethod
+    def build_email(sender_email: str, receiver_email: str, subject: str, body: str) -> str:
+        """
+        构建MIME格式的提醒邮件
+
+        :return: 邮件内容
+        """
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        # 设置MIME格式邮件
+        msg = MIMEMultipart()
+        msg['From'] = sender_email
+        msg['To'] = receiver_email
+        msg['Subject'] = subject
+
+        # 添加邮件正文
+        msg.attach(MIMEText(body, 'plain'))
+
+        return msg.as_string()
+
     @staticmethod
     def send_email(receiver_email, body, logger):
         # 从环境变量中获取邮箱服务配置信息
@@ -338,17 +398,10 @@ class Utils:
             logger.error("邮箱服务配置缺失, 无法发送邮件提醒")
             return
 
+        import smtplib
+
         server = None  # 在外部初始化 server
         try:
-            # 设置MIME格式邮件
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = receiver_email
-            msg['Subject'] = subject
-
-            # 添加邮件正文
-            msg.attach(MIMEText(body, 'plain'))
-
             # 连接到SMTP服务器
             server = smtplib.SMTP_SSL(smtp_server, int(smtp_port))
 
@@ -356,7 +409,7 @@ class Utils:
             server.login(sender_email, sender_password)
 
             # 发送邮件
-            text = msg.as_string()
+            text = Utils.build_email(sender_email, receiver_email, subject, body)
             server.sendmail(sender_email, receiver_email, text)
 
             logger.info(f"提醒邮件发送成功")
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from common.sqlite_database import SqliteDatabase
+
+WORK_QUEUE_DB_PATH = (Path(__file__).parent.parent / "data/work_queue.db").resolve()
+
+
+@dataclass
+class Job:
+    """
+    队列中的一个用户任务: 某个整点需要为某个用户执行的任务列表
+    """
+    # 任务id
+    id: int
+    # 所属整点（YYYY-MM-DDTHH:MM）
+    slot: str
+    # 用户名称
+    username: str
+    # 需要执行的任务名称列表（见 ScheduleIndex.TASK_ORDER）
+    tasks: list[str]
+    # 入队时的用户配置信息（其他主机上的工作进程不需要 users.json）
+    user: dict[str, Any]
+    # 已领取次数
+    attempts: int = 0
+
+
+class WorkQueue:
+    """
+    用户任务队列，协调进程（--coordinator）按计划将到期的用户任务入队，
+    任意数量的工作进程（--worker，可在多台主机上运行）以租约方式领取任务并回报结果。
+
+    工作进程在租约期内定期续约，进程退出或失联导致租约过期后，任务可以被其他工作进程重新领取，
+    领取次数超过 WORK_QUEUE_MAX_ATTEMPTS 后不再领取。
+    任务保存在 SQLite（WAL 模式）中，领取任务在写事务（BEGIN IMMEDIATE）中完成，
+    同一主机上的多个工作进程不会领取到同一个任务；多台主机共享时需要将 WORK_QUEUE_DB_PATH 指向支持文件锁的共享存储。
+    """
+    # 任务状态
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    _INSTANCE: "WorkQueue | None" = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    def __init__(self, path: Path) -> None:
+        self.database = SqliteDatabase(path, [
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, slot TEXT NOT NULL, username TEXT NOT NULL, "
+            "tasks TEXT NOT NULL, user TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "worker TEXT, lease_expires_at REAL, available_at REAL NOT NULL, error TEXT, duration REAL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, UNIQUE (slot, username))",
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at)",
+        ])
+
+    @classmethod
+    def get_instance(cls) -> "WorkQueue":
+        """
+        获取进程内共享的任务队列
+
+        :return: 任务队列
+        """
+        if cls._INSTANCE is None:
+            with cls._INSTANCE_LOCK:
+                if cls._INSTANCE is None:
+                    cls._INSTANCE = WorkQueue(Path(os.getenv("WORK_QUEUE_DB_PATH", str(WORK_QUEUE_DB_PATH))))
+        return cls._INSTANCE
+
+    @staticmethod
+    def lease_seconds() -> float:
+        """
+        获取任务租约时长（秒），工作进程每隔租约时长的 1/3 续约一次
+
+        :return: 租约时长
+        """
+        return max(10.0, float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "120")))
+
+    @staticmethod
+    def max_attempts() -> int:
+        """
+        获取任务的最大领取次数
+
+        :return: 最大领取次数
+        """
+        return max(1, int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3")))
+
+    def enqueue(self, slot: str, jobs: list[tuple[dict[str, Any], list[str], float]]) -> int:
+        """
+        将到期的用户任务入队，同一整点的同一用户只入队一次（多个协调进程或重复调用不会重复执行）
+
+        :param slot: 所属整点（YYYY-MM-DDTHH:MM）
+        :param jobs: (用户配置信息, 任务名称列表, 可领取时间戳) 列表
+        :return: 新入队的任务数量
+        """
+        now = time.time()
+        with self.database.transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO jobs (slot, username, tasks, user, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(slot, user.get("username"), json.dumps(tasks), json.dumps(user, ensure_ascii=False),
+                  self.STATUS_PENDING, available_at, now, now) for user, tasks, available_at in jobs])
+            return connection.total_changes - before
+
+    def claim(self, worker: str, limit: int) -> list[Job]:
+        """
+        领取可执行的任务（已到可领取时间的待执行任务，以及租约已过期的执行中任务）
+
+        :param worker: 工作进程id
+        :param limit: 最多领取的任务数量
+        :return: 领取到的任务列表
+        """
+        now = time.time()
+        with self.database.transaction() as connection:
+            # 租约过期且领取次数已达上限的任务不再领取
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (self.STATUS_FAILED, "租约过期次数超过上限", now, self.STATUS_RUNNING, now, self.max_attempts()))
+
+            rows = connection.execute(
+                "SELECT id, slot, username, tasks, user, attempts FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY available_at, id LIMIT ?",
+                (self.STATUS_PENDING, now, self.STATUS_RUNNING, now, max(1, limit))).fetchall()
+            if not rows:
+                return []
+
+            connection.executemany(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                [(self.STATUS_RUNNING, worker, now + self.lease_seconds(), now, row[0]) for row in rows])
+
+        return [Job(id=row[0], slot=row[1], username=row[2], tasks=json.loads(row[3]), user=json.loads(row[4]),
+                    attempts=row[5] + 1) for row in rows]
+
+    def renew(self, worker: str) -> int:
+        """
+        续约工作进程正在执行的所有任务
+
+        :param worker: 工作进程id
+        :return: 续约的任务数量
+        """
+        now = time.time()
+        return self.database.execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE status = ? AND worker = ?",
+            (now + self.lease_seconds(), now, self.STATUS_RUNNING, worker)).rowcount
+
+    def complete(self, job_id: int, worker: str, success: bool, error: str = None, duration: float = None) -> bool:
+        """
+        回报任务执行结果
+
+        :param job_id: 任务id
+        :param worker: 工作进程id
+        :param success: 是否执行成功
+        :param error: 失败原因
+        :param duration: 执行耗时（秒）
+        :return: 是否回报成功（租约已过期并被其他工作进程领取时为False）
+        """
+        return self.database.execute(
+            "UPDATE jobs SET status = ?, error = ?, duration = ?, lease_expires_at = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND worker = ?",
+            (self.STATUS_SUCCEEDED if success else self.STATUS_FAILED, error, duration, time.time(),
+             job_id, self.STATUS_RUNNING, worker)).rowcount > 0
+
+    def next_available(self) -> float | None:
+        """
+        获取最早的待执行任务的可领取时间
+
+        :return: 时间戳，没有待执行任务返回None
+        """
+        row = self.database.fetchone("SELECT MIN(available_at) FROM jobs WHERE status = ?", (self.STATUS_PENDING,))
+        return row[0] if row else None
+
+    def stats(self, slot: str = None) -> dict[str, int]:
+        """
+        统计各状态的任务数量
+
+        :param slot: 所属整点，为None时统计所有任务
+        :return: 状态 → 任务数量
+        """
+        if slot is None:
+            rows = self.database.fetchall("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        else:
+            rows = self.database.fetchall("SELECT status, COUNT(*) FROM jobs WHERE slot = ? GROUP BY status", (slot,))
+        return dict(rows)
+
+    def purge(self, before: float) -> int:
+        """
+        删除在指定时间之前结束的任务
+
+        :param before: 时间戳
+        :return: 删除的任务数量
+        """
+        return self.database.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (self.STATUS_SUCCEEDED, self.STATUS_FAILED, before)).rowcount
+
+
+if __name__ == '__main__':
+    pass
@@ -1,39 +1,154 @@
+import asyncio
+import dataclasses
 import datetime
+import multiprocessing
+import os
+import random
+import signal
+import socket
 import sys
 import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
-import requests
 import schedule
 from dotenv import load_dotenv
 from loguru import logger as loguru_logger
 from requests import Session
 
+from common.async_utils import AsyncUtils
 from common.constant import Constant
+from common.control_server import ControlRun, ControlRunRegistry, ControlServer
 from common.exception import BusinessException
+from common.executor import AsyncTaskExecutor, TaskExecutor, TaskResult
+from common.http_transport import HttpTransport
 from common.logger_manager import LoggerManager
-from common.utils import Utils
-from service.login import Login
-from service.monthly_report import MonthlyReport
-from service.sign_in import SignIn
-from service.weekly_report import WeeklyReport
+from common.login_info_store import LoginInfoStore
+from common.metrics import Metrics
+from common.notifier import EmailNotifier
+from common.profiler import Profiler
+from common.roster import Roster, RosterDiff
+from common.schedule_index import ScheduleIndex
+from common.work_queue import Job, WorkQueue
+from service.login import AsyncLogin, Login
+from service.monthly_report import AsyncMonthlyReport, MonthlyReport
+from service.sign_in import AsyncSignIn, SignIn
+from service.token_prewarm import TokenPrewarm
+from service.weekly_report import AsyncWeeklyReport, WeeklyReport
 
-USERS_LOGIN_INFO_PATH = (Path(__file__).parent / "data/users_login_info.json").resolve()
 USERS_PATH = (Path(__file__).parent / "data/users.json").resolve()
 
 
 class ScheduledTask:
+    # 用户配置加载器与用户任务时间索引，用户配置变化时只更新变化的用户
+    ROSTER: Roster | None = None
+    SCHEDULE_INDEX: ScheduleIndex | None = None
+    _ROSTER_LOCK = threading.Lock()
+    # 同一时间只执行一轮任务（剖析会话与本轮运行指标为进程内共享），后到的一轮等待上一轮结束
+    _RUN_LOCK = threading.Lock()
 
     @staticmethod
-    def task_for_user(user: dict[str, Any]) -> None:
+    def execution_mode() -> str:
+        """
+        获取任务执行模式: thread（线程池，默认）或 async（单事件循环协程）
+
+        :return: 执行模式
+        """
+        if "--async" in sys.argv:
+            return "async"
+        if "--thread" in sys.argv:
+            return "thread"
+        return "async" if os.getenv("EXECUTION_MODE", "thread").lower() == "async" else "thread"
+
+    @staticmethod
+    def users_path() -> Path:
+        """
+        获取用户配置路径: users.json、JSON Lines 文件（*.jsonl）或每个用户一个 JSON 文件的目录
+
+        :return: 用户配置路径
+        """
+        users_path = os.getenv("USERS_PATH")
+        return Path(users_path) if users_path else USERS_PATH
+
+    @classmethod
+    def get_roster(cls) -> Roster:
+        """
+        获取用户配置，用户配置变化时按新增、修改、移除的用户更新任务时间索引
+
+        :return: 用户配置加载器
+        """
+        cls.reload_roster()
+        return cls.ROSTER
+
+    @classmethod
+    def reload_roster(cls) -> RosterDiff:
+        """
+        重新加载用户配置（文件未变化时不重新读取），并应用到任务时间索引与登陆信息
+
+        :return: 与上一次加载相比的变化
+        """
+        with cls._ROSTER_LOCK:
+            path = cls.users_path()
+            if cls.ROSTER is None or cls.ROSTER.path != path:
+                cls.ROSTER = Roster(path)
+                cls.SCHEDULE_INDEX = ScheduleIndex()
+
+            diff = cls.ROSTER.load()
+            if diff:
+                cls.apply_roster_diff(diff)
+            return diff
+
+    @classmethod
+    def apply_roster_diff(cls, diff: RosterDiff) -> None:
+        """
+        将用户配置的变化应用到任务时间索引与登陆信息
+
+        :param diff: 用户配置变化
+        """
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+        for error in diff.errors:
+            logger.error(f"用户配置无效, 已跳过 > {error}")
+        for warning in diff.warnings:
+            logger.warning(f"用户配置时间无效, 对应任务不会执行 > {warning}")
+
+        for user in diff.added + diff.changed:
+            cls.SCHEDULE_INDEX.add_user(user)
+        for username in diff.removed:
+            cls.SCHEDULE_INDEX.remove_user(username)
+        # 账号或密码变化后，已保存的登陆信息属于原账号，下次执行任务时重新登陆
+        for username in diff.credentials_changed:
+            LoginInfoStore.get_instance().delete(username)
+
+        if diff.added or diff.changed or diff.removed:
+            logger.info(f"用户配置已加载 > 新增: {len(diff.added)}, 修改: {len(diff.changed)}, "
+                        f"移除: {len(diff.removed)}, 用户总数: {len(cls.SCHEDULE_INDEX.users)}")
+
+    @classmethod
+    def get_schedule_index(cls) -> ScheduleIndex:
+        """
+        获取用户任务时间索引，仅在用户配置修改后更新变化的用户
+
+        :return: 用户任务时间索引
+        """
+        cls.get_roster()
+        return cls.SCHEDULE_INDEX
+
+    @staticmethod
+    def task_for_user(user: dict[str, Any], tasks: list[str]) -> bool:
+        """
+        执行单个用户的自动化任务
+
+        :param user: 用户配置信息
+        :param tasks: 需要执行的任务名称列表（见 ScheduleIndex.TASK_ORDER）
+        :return: 所有任务是否执行成功
+        """
         # 获取logger
         logger: loguru_logger = LoggerManager.get_user_logger(user.get("username"))
-        # 创建会话对象
-        requests_session: Session = requests.Session()
-        # 伪装请求头
-        requests_session.headers.update(Constant.HEADERS)
+        # 创建会话对象（挂载共享连接池）
+        requests_session: Session = HttpTransport.create_session()
         # 模块参数
         module_parameter: dict[str, Any] = {
             "user": user,
@@ -43,6 +158,8 @@ class ScheduledTask:
         }
         # 提醒邮箱
         email: str = user.get("email")
+        # 执行结果
+        success = True
 
         # 自动化任务开始
         logger.info(f"自动化任务执行开始...")
@@ -50,7 +167,7 @@ class ScheduledTask:
         # 检查是否存在登陆信息，不存在则重新获取
         logger.info(f"获取登陆信息")
         # 读取用户登陆信息
-        user_login_info: dict[str, Any] = Utils.operate_json_file(USERS_LOGIN_INFO_PATH).get(user.get("username"))
+        user_login_info: dict[str, Any] = LoginInfoStore.get_instance().get(user.get("username"))
 
         if not user_login_info:
             logger.info(f"未获取到登陆信息, 调用登陆模块进行获取登陆信息")
@@ -58,9 +175,10 @@ class ScheduledTask:
                 Login(module_parameter).login()
             except BusinessException:
                 logger.error(f"获取登陆信息失败, 自动化任务结束")
-                Utils.send_email(email, "在获取登陆信息时, 发生未知错误导致获取失败, 影响自动化任务: 签到 周报 月报",
-                                 logger)
-                return
+                EmailNotifier.get_instance().notify(
+                    email, "在获取登陆信息时, 发生未知错误导致获取失败, 影响自动化任务: 签到 周报 月报", logger)
+                requests_session.close()
+                return False
         else:
             # 加载Authorization
             requests_session.headers.update({
@@ -70,91 +188,748 @@ class ScheduledTask:
             module_parameter.update(user_login_info=user_login_info)
         logger.info(f"获取登陆信息完成")
 
-        # 获取用户任务时间设置
-        time_setting = user.get("configInfo").get("timeSetting")
+        # 任务名称与执行函数
+        task_functions = {
+            ScheduleIndex.TASK_SIGN_IN: lambda: SignIn(module_parameter).sign_in(),
+            ScheduleIndex.TASK_WEEKLY_REPORT: lambda: WeeklyReport(module_parameter).submit_weekly_report(),
+            ScheduleIndex.TASK_MONTHLY_REPORT: lambda: MonthlyReport(module_parameter).sub_monthly_report(),
+        }
 
-        now = datetime.datetime.now()
+        for task in tasks:
+            with Metrics.timer("moguding_task_duration_seconds", {"task": task},
+                               description="Task duration by task name and result") as labels:
+                try:
+                    task_functions[task]()
+                except BusinessException as e:
+                    labels["result"] = "failure"
+                    success = False
+                    logger.error(f"{e}")
+                    EmailNotifier.get_instance().notify(email, str(e), logger)
+
+        # 资源释放
+        requests_session.close()
+
+        logger.info(f"自动化任务执行结束...")
 
-        # 签到时间
-        sign_in_time = time_setting.get('signInTime')
-        # 周报时间
-        weekly_report_time = time_setting.get('weeklyReportTime')
-        # 月报时间
-        monthly_report_time = time_setting.get('monthlyReportTime')
+        return success
+
+    @staticmethod
+    async def task_for_user_async(user: dict[str, Any], tasks: list[str]) -> bool:
+        """
+        执行单个用户的自动化任务（异步模式）
+
+        :param user: 用户配置信息
+        :param tasks: 需要执行的任务名称列表（见 ScheduleIndex.TASK_ORDER）
+        :return: 所有任务是否执行成功
+        """
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_user_logger(user.get("username"))
+        # 创建异步客户端（挂载共享连接池）
+        client = AsyncUtils.create_client()
+        # 模块参数
+        module_parameter: dict[str, Any] = {
+            "user": user,
+            "user_login_info": {},
+            "requests_session": client,
+            "logger": logger,
+        }
+        # 提醒邮箱
+        email: str = user.get("email")
+        # 执行结果
+        success = True
 
-        # 签到
         try:
-            if sign_in_time and (sign_in_time.get("start") == now.hour or sign_in_time.get("end") == now.hour):
-                SignIn(module_parameter).sign_in()
+            # 自动化任务开始
+            logger.info(f"自动化任务执行开始...")
+
+            # 检查是否存在登陆信息，不存在则重新获取
+            logger.info(f"获取登陆信息")
+            # 读取用户登陆信息
+            user_login_info: dict[str, Any] = LoginInfoStore.get_instance().get(user.get("username"))
+
+            if not user_login_info:
+                logger.info(f"未获取到登陆信息, 调用登陆模块进行获取登陆信息")
+                try:
+                    await AsyncLogin(module_parameter).login()
+                except BusinessException:
+                    logger.error(f"获取登陆信息失败, 自动化任务结束")
+                    EmailNotifier.get_instance().notify(
+                        email, "在获取登陆信息时, 发生未知错误导致获取失败, 影响自动化任务: 签到 周报 月报", logger)
+                    return False
             else:
-                logger.info(f"签到任务不在用户指定时间")
-        except BusinessException as e:
-            logger.error(f"{e}")
-            Utils.send_email(email, str(e), logger)
+                # 加载Authorization
+                client.headers.update({
+                    "Authorization": user_login_info.get("loginInfo").get("token"),
+                })
+                # 更新登陆信息
+                module_parameter.update(user_login_info=user_login_info)
+            logger.info(f"获取登陆信息完成")
+
+            # 任务名称与执行函数
+            task_functions = {
+                ScheduleIndex.TASK_SIGN_IN: lambda: AsyncSignIn(module_parameter).sign_in(),
+                ScheduleIndex.TASK_WEEKLY_REPORT: lambda: AsyncWeeklyReport(module_parameter).submit_weekly_report(),
+                ScheduleIndex.TASK_MONTHLY_REPORT: lambda: AsyncMonthlyReport(module_parameter).sub_monthly_report(),
+            }
+
+            for task in tasks:
+                with Metrics.timer("moguding_task_duration_seconds", {"task": task},
+                                   description="Task duration by task name and result") as labels:
+                    try:
+                        await task_functions[task]()
+                    except BusinessException as e:
+                        labels["result"] = "failure"
+                        success = False
+                        logger.error(f"{e}")
+                        EmailNotifier.get_instance().notify(email, str(e), logger)
+
+            logger.info(f"自动化任务执行结束...")
+        finally:
+            # 资源释放
+            await client.aclose()
+
+        return success
+
+    @staticmethod
+    def jitter_delays(count: int) -> list[float] | None:
+        """
+        在 SCHEDULE_JITTER_SECONDS 时间窗口内为每个用户生成随机延迟（升序）
+
+        :param count: 用户数量
+        :return: 延迟时间列表（秒），未开启错峰执行时返回None
+        """
+        jitter = min(float(os.getenv("SCHEDULE_JITTER_SECONDS", "0")), 3540.0)
+        if jitter <= 0:
+            return None
+        return sorted(random.uniform(0, jitter) for _ in range(count))
+
+    @staticmethod
+    def trigger() -> None:
+        """
+        在后台线程中执行本轮任务，避免开启错峰执行等导致本轮跨过下一个整点时，schedule 跳过下一轮
+        """
+        now = datetime.datetime.now()
+        threading.Thread(target=ScheduledTask.task, args=(now,), name=f"scheduled-{now:%H%M}", daemon=True).start()
+
+    @staticmethod
+    def task(now: datetime.datetime = None) -> list[TaskResult]:
+        """
+        执行当前整点到期的用户任务
+
+        :param now: 整点触发时间，上一轮未结束时本轮等待后仍按该时间执行到期任务
+        :return: 用户执行结果
+        """
+        now = now or datetime.datetime.now()
+
+        # 仅获取当前时间需要执行任务的用户
+        schedule_index = ScheduledTask.get_schedule_index()
+        due_tasks: dict[str, list[str]] = schedule_index.due(now)
+
+        if not due_tasks:
+            return []
+
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+
+        users: list[dict[str, Any]] = schedule_index.get_users(list(due_tasks))
+
+        # 错峰执行: 在时间窗口内为每个用户分配随机延迟，避免整点集中请求
+        delays: list[float] | None = ScheduledTask.jitter_delays(len(users))
+        if delays:
+            random.shuffle(users)
+
+        logger.info(f"本轮需要执行任务的用户数: {len(users)}")
+
+        with ScheduledTask.run_lock(logger):
+            start = time.perf_counter()
+            results: list[TaskResult] = ScheduledTask.execute(users, due_tasks, delays, "scheduled")
 
-        # 提交周报
+            # 记录执行结果
+            for result in results:
+                if not result.success:
+                    logger.error(f"用户任务执行失败 > 用户: {result.username}, 原因: {result.error}, "
+                                 f"耗时: {result.duration:.2f}s")
+            succeeded = sum(1 for result in results if result.success)
+            duration = time.perf_counter() - start
+            logger.info(f"本轮任务执行完毕 > 成功: {succeeded}, 失败: {len(results) - succeeded}, "
+                        f"总耗时: {duration:.2f}s")
+
+            # 导出本轮运行指标
+            ScheduledTask.export_metrics(now, results, duration)
+
+        return results
+
+    @staticmethod
+    @contextmanager
+    def run_lock(logger: loguru_logger) -> Iterator[None]:
+        """
+        获取运行锁，上一轮任务未结束时等待
+
+        :param logger: 日志对象
+        """
+        if not ScheduledTask._RUN_LOCK.acquire(blocking=False):
+            logger.warning(f"上一轮任务尚未结束, 等待上一轮任务结束后执行")
+            ScheduledTask._RUN_LOCK.acquire()
         try:
-            if weekly_report_time and weekly_report_time.get("week") == (now.weekday() + 1) and weekly_report_time.get(
-                    "time") == now.hour:
-                WeeklyReport(module_parameter).submit_weekly_report()
+            yield
+        finally:
+            ScheduledTask._RUN_LOCK.release()
+
+    @staticmethod
+    def execute(users: list[dict[str, Any]], due_tasks: dict[str, list[str]], delays: list[float] = None,
+                profile_name: str = "scheduled") -> list[TaskResult]:
+        """
+        按执行模式执行多个用户的任务，结束后发送合并的提醒邮件
+
+        :param users: 用户配置信息列表
+        :param due_tasks: 用户名称 → 需要执行的任务名称列表
+        :param delays: 每个用户的延迟时间（秒）
+        :param profile_name: 剖析结果名称
+        :return: 用户执行结果
+        """
+        mode = ScheduledTask.execution_mode()
+        # --profile 模式下剖析本轮运行（协程模式下所有用户运行在当前线程的事件循环中）
+        with Profiler.run(profile_name, profile_caller=mode == "async"):
+            if mode == "async":
+                # 所有用户任务作为协程运行在同一个事件循环中
+                results: list[TaskResult] = AsyncUtils.run(AsyncTaskExecutor().run(
+                    lambda user: ScheduledTask.task_for_user_async(user, due_tasks[user.get("username")]),
+                    users, delays))
             else:
-                logger.info(f"周报任务不在用户指定时间")
+                # 使用有界线程池分批执行每个用户的任务，按抽样比例剖析用户任务线程
+                results: list[TaskResult] = TaskExecutor().run(Profiler.wrap_user(
+                    lambda user: ScheduledTask.task_for_user(user, due_tasks[user.get("username")])), users, delays)
+
+        # 任务结束，发送合并的提醒邮件
+        EmailNotifier.get_instance().flush()
+        return results
+
+    @staticmethod
+    def export_metrics(started_at: datetime.datetime, results: list[TaskResult], duration: float,
+                       instance: str = None) -> None:
+        """
+        记录每个用户的执行耗时，并导出本轮运行的指标（设置 METRICS_DIR 时）
+
+        :param started_at: 本轮开始时间
+        :param results: 用户执行结果
+        :param duration: 本轮总耗时（秒）
+        :param instance: 实例名称（工作进程模式下区分各进程的指标文件）
+        """
+        for result in results:
+            Metrics.observe("moguding_user_run_duration_seconds", result.duration,
+                            {"result": "success" if result.success else "failure"},
+                            description="Per-user run duration")
+
+        succeeded = sum(1 for result in results if result.success)
+        try:
+            Metrics.export({
+                "startedAt": started_at.isoformat(timespec="seconds"),
+                "mode": ScheduledTask.execution_mode(),
+                "users": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "durationSeconds": round(duration, 3),
+            }, instance)
+        except OSError as e:
+            LoggerManager.get_system_logger().error(f"导出运行指标失败 > 原因: {e}")
+
+    @staticmethod
+    def prewarm_user(user: dict[str, Any], due_time: datetime.datetime) -> bool:
+        """
+        预热单个用户的登陆信息
+
+        :param user: 用户配置信息
+        :param due_time: 用户任务到期时间
+        :return: 是否预热成功
+        """
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_user_logger(user.get("username"))
+        # 创建会话对象（挂载共享连接池）
+        requests_session: Session = HttpTransport.create_session()
+        # 模块参数
+        module_parameter: dict[str, Any] = {
+            "user": user,
+            "user_login_info": LoginInfoStore.get_instance().get(user.get("username")) or {},
+            "requests_session": requests_session,
+            "logger": logger,
+        }
+
+        try:
+            TokenPrewarm(module_parameter).prewarm(due_time)
+            return True
         except BusinessException as e:
+            # 预热失败不影响到期任务，到期任务会按原流程重新登陆
             logger.error(f"{e}")
-            Utils.send_email(email, str(e), logger)
+            return False
+        finally:
+            # 资源释放
+            requests_session.close()
+
+    @staticmethod
+    def prewarm() -> None:
+        """
+        为下一个整点需要执行任务的用户提前验证或刷新token
+        """
+        # 下一个整点
+        due_time = (datetime.datetime.now() + datetime.timedelta(hours=1)).replace(minute=0, second=0,
+                                                                                    microsecond=0)
+        schedule_index = ScheduledTask.get_schedule_index()
+        users: list[dict[str, Any]] = schedule_index.get_users(list(schedule_index.due(due_time)))
+
+        if not users:
+            return
+
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+        logger.info(f"预热登陆信息 > 用户数: {len(users)}, 任务时间: {due_time:%H:%M}")
+
+        results: list[TaskResult] = TaskExecutor().run(lambda user: ScheduledTask.prewarm_user(user, due_time), users)
+
+        succeeded = sum(1 for result in results if result.success)
+        logger.info(f"预热登陆信息完毕 > 成功: {succeeded}, 失败: {len(results) - succeeded}")
+
+    @staticmethod
+    def pregenerate_user(user: dict[str, Any], tasks: list[str]) -> bool:
+        """
+        预生成单个用户需要提交的周报、月报内容
+
+        :param user: 用户配置信息
+        :param tasks: 即将执行的任务名称列表（见 ScheduleIndex.TASK_ORDER）
+        :return: 是否预生成成功
+        """
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_user_logger(user.get("username"))
+        # 创建会话对象（挂载共享连接池）
+        requests_session: Session = HttpTransport.create_session()
+        # 模块参数
+        module_parameter: dict[str, Any] = {
+            "user": user,
+            "user_login_info": {},
+            "requests_session": requests_session,
+            "logger": logger,
+        }
 
-        # 提交月报
         try:
-            if monthly_report_time and monthly_report_time.get("day") == now.day and monthly_report_time.get(
-                    "time") == now.hour:
-                MonthlyReport(module_parameter).sub_monthly_report()
+            # 读取用户登陆信息，不存在则重新获取
+            user_login_info: dict[str, Any] = LoginInfoStore.get_instance().get(user.get("username"))
+            if not user_login_info:
+                Login(module_parameter).login()
             else:
-                logger.info(f"月报任务不在用户指定时间")
+                # 加载Authorization
+                requests_session.headers.update({
+                    "Authorization": user_login_info.get("loginInfo").get("token"),
+                })
+                # 更新登陆信息
+                module_parameter.update(user_login_info=user_login_info)
+
+            if ScheduleIndex.TASK_WEEKLY_REPORT in tasks:
+                WeeklyReport(module_parameter).pregenerate()
+            if ScheduleIndex.TASK_MONTHLY_REPORT in tasks:
+                MonthlyReport(module_parameter).pregenerate()
+            return True
         except BusinessException as e:
+            # 预生成失败不影响到期任务，到期任务会按原流程生成内容
             logger.error(f"{e}")
-            Utils.send_email(email, str(e), logger)
-
-        # 资源释放
-        requests_session.close()
-
-        logger.info(f"自动化任务执行结束...")
+            return False
+        finally:
+            # 资源释放
+            requests_session.close()
 
     @staticmethod
-    def task() -> None:
-        threads: list[threading.Thread] = []
+    def pregenerate() -> None:
+        """
+        在空闲时段为未来24小时内需要提交周报、月报的用户预先生成报告内容
+        """
+        now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+        schedule_index = ScheduledTask.get_schedule_index()
 
-        # 读取 users 文件
-        users: list[dict[str, Any]] = Utils.operate_json_file(USERS_PATH).get("users")
+        # 汇总未来24小时内每个用户需要执行的报告任务
+        report_tasks: dict[str, list[str]] = {}
+        for hour in range(1, 25):
+            for username, tasks in schedule_index.due(now + datetime.timedelta(hours=hour)).items():
+                for task in tasks:
+                    if task != ScheduleIndex.TASK_SIGN_IN and task not in report_tasks.setdefault(username, []):
+                        report_tasks[username].append(task)
+        report_tasks = {username: tasks for username, tasks in report_tasks.items() if tasks}
 
-        if not users:
+        if not report_tasks:
             return
 
-        for user in users:
-            # 创建一个线程来执行每个用户的任务
-            thread = threading.Thread(target=ScheduledTask.task_for_user, args=(user,))
-            threads.append(thread)
-            thread.start()
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+        logger.info(f"预生成报告内容 > 用户数: {len(report_tasks)}")
+
+        users: list[dict[str, Any]] = schedule_index.get_users(list(report_tasks))
+        # ai生成耗时较长，使用较小的线程池，避免占用整点任务的资源
+        results: list[TaskResult] = TaskExecutor(max_workers=int(os.getenv("REPORT_PREGENERATE_WORKERS", "4"))).run(
+            lambda user: ScheduledTask.pregenerate_user(user, report_tasks[user.get("username")]), users)
 
-        # 等待所有线程执行完成
-        for thread in threads:
-            thread.join()
+        succeeded = sum(1 for result in results if result.success)
+        logger.info(f"预生成报告内容完毕 > 成功: {succeeded}, 失败: {len(results) - succeeded}")
 
     @staticmethod
     def start() -> None:
         # 设置任务，在每小时的整点执行
-        schedule.every().hour.at(":00").do(ScheduledTask.task)
+        schedule.every().hour.at(":00").do(ScheduledTask.trigger)
+        ScheduledTask.schedule_background_jobs()
         # 保持脚本运行，等待并执行定时任务
         while True:
             schedule.run_pending()  # 检查是否有任务需要执行
             time.sleep(1)  # 每秒检查一次
 
+    @staticmethod
+    def schedule_background_jobs() -> None:
+        """
+        设置登陆信息预热与报告内容预生成任务（定时任务模式与协调进程共用）
+        """
+        # 设置登陆信息预热任务，在整点前执行，在后台线程中运行以免阻塞整点任务
+        prewarm_minutes = int(os.getenv("TOKEN_PREWARM_MINUTES", "10"))
+        if 0 < prewarm_minutes < 60:
+            schedule.every().hour.at(f":{60 - prewarm_minutes:02d}").do(
+                lambda: threading.Thread(target=ScheduledTask.prewarm, name="token-prewarm", daemon=True).start())
+        # 设置报告内容预生成任务，每天在空闲时段执行，在后台线程中运行
+        pregenerate_hour = int(os.getenv("REPORT_PREGENERATE_HOUR", "3"))
+        if 0 <= pregenerate_hour < 24:
+            schedule.every().day.at(f"{pregenerate_hour:02d}:30").do(
+                lambda: threading.Thread(target=ScheduledTask.pregenerate, name="report-pregenerate",
+                                         daemon=True).start())
+
+
+class QueueCoordinator:
+    """
+    协调进程（--coordinator）: 每个整点将到期的用户任务写入任务队列，由工作进程领取执行
+    """
+
+    @staticmethod
+    def enqueue(now: datetime.datetime = None) -> int:
+        """
+        将当前整点到期的用户任务入队，开启错峰执行时为每个任务设置延迟的可领取时间
+
+        :param now: 当前时间
+        :return: 新入队的任务数量
+        """
+        now = now or datetime.datetime.now()
+        schedule_index = ScheduledTask.get_schedule_index()
+        due_tasks: dict[str, list[str]] = schedule_index.due(now)
+
+        if not due_tasks:
+            return 0
+
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+
+        users: list[dict[str, Any]] = schedule_index.get_users(list(due_tasks))
+        delays: list[float] | None = ScheduledTask.jitter_delays(len(users))
+        if delays:
+            random.shuffle(users)
+        base_time = time.time()
+
+        slot = now.replace(minute=0, second=0, microsecond=0).isoformat(timespec="minutes")
+        inserted = WorkQueue.get_instance().enqueue(slot, [
+            (user, due_tasks[user.get("username")], base_time + (delays[index] if delays else 0))
+            for index, user in enumerate(users)
+        ])
+        logger.info(f"用户任务入队 > 整点: {slot}, 到期用户数: {len(users)}, 新入队: {inserted}")
+        return inserted
+
+    @staticmethod
+    def purge() -> None:
+        """
+        删除超过保留天数（WORK_QUEUE_RETENTION_DAYS）的已结束任务
+        """
+        retention_days = float(os.getenv("WORK_QUEUE_RETENTION_DAYS", "7"))
+        deleted = WorkQueue.get_instance().purge(time.time() - retention_days * 86400)
+        if deleted:
+            LoggerManager.get_system_logger().info(f"清理已结束的队列任务 > 数量: {deleted}")
+
+    @staticmethod
+    def start() -> None:
+        # 设置入队任务，在每小时的整点执行
+        schedule.every().hour.at(":00").do(QueueCoordinator.enqueue)
+        schedule.every().day.at("04:00").do(QueueCoordinator.purge)
+        ScheduledTask.schedule_background_jobs()
+        # 保持脚本运行，等待并执行定时任务
+        while True:
+            schedule.run_pending()  # 检查是否有任务需要执行
+            time.sleep(1)  # 每秒检查一次
+
+
+class QueueWorker:
+    """
+    工作进程（--worker）: 从任务队列领取用户任务并执行，可在同一主机启动多个进程（WORKER_PROCESSES），
+    也可以在多台主机上运行，用户按领取顺序自动分摊到各个进程，无需手动拆分 users.json。
+    """
+
+    @staticmethod
+    def execute_job(job: Job, worker: str) -> bool:
+        """
+        执行一个队列任务并回报结果
+
+        :param job: 队列任务
+        :param worker: 工作进程id
+        :return: 所有任务是否执行成功
+        """
+        success, error, start = False, None, time.perf_counter()
+        try:
+            success = ScheduledTask.task_for_user(job.user, job.tasks)
+            return success
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            QueueWorker.report(job, worker, success, error, time.perf_counter() - start)
+
+    @staticmethod
+    async def execute_job_async(job: Job, worker: str) -> bool:
+        """
+        执行一个队列任务并回报结果（异步模式）
+
+        :param job: 队列任务
+        :param worker: 工作进程id
+        :return: 所有任务是否执行成功
+        """
+        success, error, start = False, None, time.perf_counter()
+        try:
+            success = await ScheduledTask.task_for_user_async(job.user, job.tasks)
+            return success
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            await asyncio.to_thread(QueueWorker.report, job, worker, success, error, time.perf_counter() - start)
+
+    @staticmethod
+    def report(job: Job, worker: str, success: bool, error: str | None, duration: float) -> None:
+        if not success and error is None:
+            error = "任务执行失败"
+        if not WorkQueue.get_instance().complete(job.id, worker, success, error, duration):
+            LoggerManager.get_system_logger().warning(
+                f"回报任务结果失败, 租约已过期 > 任务: {job.id}, 用户: {job.username}")
+
+    @staticmethod
+    def heartbeat(worker: str, stop_event: threading.Event) -> None:
+        # 定期续约正在执行的任务
+        interval = WorkQueue.lease_seconds() / 3
+        while not stop_event.wait(interval):
+            try:
+                WorkQueue.get_instance().renew(worker)
+            except Exception as e:
+                LoggerManager.get_system_logger().error(f"任务续约失败 > 原因: {e}")
+
+    @staticmethod
+    def run() -> None:
+        """
+        循环领取并执行任务，每次领取的数量不超过线程池大小（协程模式下为最大并发用户数）
+        """
+        worker = f"{socket.gethostname()}-{os.getpid()}"
+        queue = WorkQueue.get_instance()
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+        # 没有可领取任务时的轮询间隔
+        poll_seconds = max(0.1, float(os.getenv("WORK_QUEUE_POLL_SECONDS", "2")))
+
+        mode = ScheduledTask.execution_mode()
+        batch_size = TaskExecutor().max_workers if mode == "thread" else AsyncTaskExecutor().max_concurrency
+
+        stop_event = threading.Event()
+        threading.Thread(target=QueueWorker.heartbeat, args=(worker, stop_event), name="work-queue-heartbeat",
+                         daemon=True).start()
+        logger.info(f"工作进程启动 > id: {worker}, 模式: {mode}, 每次领取: {batch_size}")
+
+        try:
+            while True:
+                jobs: list[Job] = queue.claim(worker, batch_size)
+                if not jobs:
+                    # 等待下一个任务的可领取时间，最长等待一个轮询间隔
+                    next_available = queue.next_available()
+                    wait = poll_seconds if next_available is None else next_available - time.time()
+                    time.sleep(min(poll_seconds, max(0.1, wait)))
+                    continue
+
+                now = datetime.datetime.now()
+                start = time.perf_counter()
+                # 按对象查找任务（同一批次中可能包含同一用户不同整点的任务）
+                jobs_by_user: dict[int, Job] = {id(job.user): job for job in jobs}
+                users: list[dict[str, Any]] = [job.user for job in jobs]
+
+                with Profiler.run("worker", profile_caller=mode == "async"):
+                    if mode == "async":
+                        results: list[TaskResult] = AsyncUtils.run(AsyncTaskExecutor().run(
+                            lambda user: QueueWorker.execute_job_async(jobs_by_user[id(user)], worker), users))
+                    else:
+                        results: list[TaskResult] = TaskExecutor().run(Profiler.wrap_user(
+                            lambda user: QueueWorker.execute_job(jobs_by_user[id(user)], worker)), users)
+
+                # 本批任务结束，发送合并的提醒邮件
+                EmailNotifier.get_instance().flush()
+
+                succeeded = sum(1 for result in results if result.success)
+                duration = time.perf_counter() - start
+                logger.info(f"本批任务执行完毕 > 成功: {succeeded}, 失败: {len(results) - succeeded}, "
+                            f"总耗时: {duration:.2f}s")
+                ScheduledTask.export_metrics(now, results, duration, worker)
+        finally:
+            stop_event.set()
+
+    @staticmethod
+    def start() -> None:
+        processes = max(1, int(os.getenv("WORKER_PROCESSES", "1")))
+        if processes == 1:
+            QueueWorker.run()
+            return
+
+        # 每个进程独立领取任务，使用 spawn 方式启动，避免子进程继承父进程的数据库连接
+        context = multiprocessing.get_context("spawn")
+        children = [context.Process(target=QueueWorker.run, name=f"queue-worker-{index}")
+                    for index in range(processes)]
+        # 收到 SIGTERM 时正常退出，并结束所有子进程（子进程未完成的任务在租约过期后由其他工作进程领取）
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            for child in children:
+                child.start()
+            for child in children:
+                child.join()
+        finally:
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+
+class ControlApi:
+    """
+    常驻进程（--daemon）的本地控制接口: 为指定用户触发签到、周报、月报，查询执行状态，重新加载用户配置。
+    请求在常驻进程中执行，复用已加载的模块、共享连接池与已保存的登陆信息，无需每次启动新进程。
+    """
+    RUNS: ControlRunRegistry | None = None
+    SERVER: ControlServer | None = None
+
+    @staticmethod
+    def enabled() -> bool:
+        return "--daemon" in sys.argv or bool(os.getenv("CONTROL_API_PORT") or os.getenv("CONTROL_API_SOCKET"))
+
+    @staticmethod
+    def health(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        runs = ControlApi.RUNS.list()
+        return 200, {
+            "status": "ok",
+            "pid": os.getpid(),
+            "mode": ScheduledTask.execution_mode(),
+            "users": len(ScheduledTask.get_roster().users),
+            "activeRuns": sum(1 for run in runs if not run.done.is_set()),
+        }
+
+    @staticmethod
+    def list_users(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        return 200, {"users": list(ScheduledTask.get_roster().users)}
+
+    @staticmethod
+    def reload(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        diff: RosterDiff = ScheduledTask.reload_roster()
+        return 200, {
+            "added": [user.get("username") for user in diff.added],
+            "changed": [user.get("username") for user in diff.changed],
+            "removed": diff.removed,
+            "errors": diff.errors,
+            "warnings": diff.warnings,
+            "users": len(ScheduledTask.ROSTER.users),
+        }
+
+    @staticmethod
+    def create_run(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        """
+        触发任务: {"users": ["用户名称", ...], "tasks": ["signIn", "weeklyReport", "monthlyReport"], "wait": false}
+        """
+        usernames, tasks = body.get("users"), body.get("tasks")
+        if not isinstance(usernames, list) or not usernames or not all(isinstance(name, str) for name in usernames):
+            return 400, {"error": "users 必须是非空的用户名称列表"}
+        if not isinstance(tasks, list) or not tasks or any(task not in ScheduleIndex.TASK_ORDER for task in tasks):
+            return 400, {"error": f"tasks 必须是非空的任务名称列表, 可选: {', '.join(ScheduleIndex.TASK_ORDER)}"}
+
+        # 使用最新的用户配置
+        roster = ScheduledTask.get_roster()
+        # 去重，并一次性取出用户配置，避免检查与取出之间用户配置被重新加载
+        configs: dict[str, dict[str, Any] | None] = {name: roster.users.get(name) for name in usernames}
+        unknown = [name for name, user in configs.items() if user is None]
+        if unknown:
+            return 404, {"error": f"用户不存在: {', '.join(unknown)}"}
+
+        # 按任务顺序执行
+        usernames = list(configs)
+        tasks = [task for task in ScheduleIndex.TASK_ORDER if task in tasks]
+        run: ControlRun = ControlApi.RUNS.create(usernames, tasks)
+        users: list[dict[str, Any]] = list(configs.values())
+        threading.Thread(target=ControlApi.execute_run, args=(run, users), name=f"control-run-{run.id}",
+                         daemon=True).start()
+
+        # wait 为 true 时等待执行结束（最长 CONTROL_API_WAIT_SECONDS 秒）
+        if body.get("wait") and run.done.wait(float(os.getenv("CONTROL_API_WAIT_SECONDS", "300"))):
+            return 200, run.to_dict()
+        return 202, run.to_dict()
+
+    @staticmethod
+    def execute_run(run: ControlRun, users: list[dict[str, Any]]) -> None:
+        # 获取logger
+        logger: loguru_logger = LoggerManager.get_system_logger()
+        logger.info(f"控制接口触发任务 > id: {run.id}, 用户数: {len(users)}, 任务: {', '.join(run.tasks)}")
+        try:
+            # 与整点任务及其他触发的任务依次执行（剖析会话与本轮运行指标为进程内共享），等待期间状态为 pending
+            with ScheduledTask.run_lock(logger):
+                run.status, run.started_at = "running", time.time()
+                try:
+                    results: list[TaskResult] = ScheduledTask.execute(
+                        users, {user.get("username"): run.tasks for user in users}, profile_name="control")
+                finally:
+                    # 触发任务的请求不计入下一轮整点任务的运行汇总
+                    Metrics.reset_run()
+            run.results = [dataclasses.asdict(result) for result in results]
+            run.status = "succeeded" if all(result.success for result in results) else "failed"
+        except Exception as e:
+            run.status, run.error = "failed", f"{type(e).__name__}: {e}"
+            logger.exception(f"控制接口任务执行失败 > id: {run.id}, 原因: {e}")
+        finally:
+            run.finished_at = time.time()
+            run.done.set()
+        logger.info(f"控制接口任务执行完毕 > id: {run.id}, 状态: {run.status}, "
+                    f"耗时: {run.finished_at - (run.started_at or run.created_at):.2f}s")
+
+    @staticmethod
+    def list_runs(body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        return 200, {"runs": [run.to_dict(detail=False) for run in ControlApi.RUNS.list()]}
+
+    @staticmethod
+    def get_run(body: dict[str, Any], run_id: str) -> tuple[int, dict[str, Any]]:
+        run = ControlApi.RUNS.get(run_id)
+        if run is None:
+            return 404, {"error": f"执行记录不存在: {run_id}"}
+        return 200, run.to_dict()
+
+    @staticmethod
+    def start() -> ControlServer:
+        ControlApi.RUNS = ControlRunRegistry()
+        server = ControlServer(LoggerManager.get_system_logger())
+        server.route("GET", "/health", ControlApi.health)
+        server.route("GET", "/users", ControlApi.list_users)
+        server.route("POST", "/reload", ControlApi.reload)
+        server.route("GET", "/runs", ControlApi.list_runs)
+        server.route("POST", "/runs", ControlApi.create_run)
+        server.route("GET", "/runs/{id}", ControlApi.get_run)
+        try:
+            ControlApi.SERVER = server.start()
+        except (OSError, ValueError) as e:
+            LoggerManager.get_system_logger().error(f"控制接口启动失败 > 原因: {e}")
+            sys.exit(1)
+        return server
+
 
 class ExecutedSeparately:
     @staticmethod
     def start() -> None:
         print("获取用户信息中...")
-        # 读取 users 文件
-        users: list[dict[str, Any]] = Utils.operate_json_file(USERS_PATH).get("users")
+        # 读取并校验用户配置
+        diff: RosterDiff = Roster(ScheduledTask.users_path()).load()
+        for error in diff.errors:
+            print(f"用户配置无效, 已跳过 > {error}")
+        users: list[dict[str, Any]] = diff.added
 
         # 检查用户列表是否为空
         if not users:
@@ -187,10 +962,8 @@ class ExecutedSeparately:
 
         # 获取选择的用户信息
         user = users[user_index]
-        # 创建会话对象
-        requests_session: Session = requests.Session()
-        # 伪装请求头
-        requests_session.headers.update(Constant.HEADERS)
+        # 创建会话对象（挂载共享连接池）
+        requests_session: Session = HttpTransport.create_session()
         # 获取logger
         logger: loguru_logger = LoggerManager.get_user_logger(user.get("username"))
 
@@ -203,11 +976,12 @@ class ExecutedSeparately:
         }
         # 检查是否存在登陆信息，不存在则重新获取
         # 读取用户登陆信息
-        user_login_info: dict[str, Any] = Utils.operate_json_file(USERS_LOGIN_INFO_PATH).get(user.get("username"))
+        user_login_info: dict[str, Any] = LoginInfoStore.get_instance().get(user.get("username"))
 
         if not user_login_info:
             try:
-                Login(module_parameter).login()
+                with Profiler.run("single-login"):
+                    Login(module_parameter).login()
             except BusinessException:
                 input("获取登陆信息失败, 请在用户日志中查看详情")
                 sys.exit(0)
@@ -236,7 +1010,8 @@ class ExecutedSeparately:
             try:
                 print("正在处理签到任务, 请耐心等待")
                 logger.info("手动执行签到任务")
-                SignIn(module_parameter).sign_in()
+                with Profiler.run("single-sign-in"):
+                    SignIn(module_parameter).sign_in()
                 input()
             except BusinessException:
                 input("签到任务失败, 请在用户日志中查看详情")
@@ -245,7 +1020,8 @@ class ExecutedSeparately:
             try:
                 print("正在处理周报任务, 请耐心等待")
                 logger.info("手动执行周报任务")
-                WeeklyReport(module_parameter).submit_weekly_report()
+                with Profiler.run("single-weekly-report"):
+                    WeeklyReport(module_parameter).submit_weekly_report()
                 input()
             except BusinessException:
                 input("提交周报任务失败, 请在用户日志中查看详情")
@@ -254,7 +1030,8 @@ class ExecutedSeparately:
             try:
                 print("正在处理月报任务, 请耐心等待")
                 logger.info("手动执行月报任务")
-                MonthlyReport(module_parameter).sub_monthly_report()
+                with Profiler.run("single-monthly-report"):
+                    MonthlyReport(module_parameter).sub_monthly_report()
                 input()
             except BusinessException:
                 input("提交月报任务失败, 请在用户日志中查看详情")
@@ -263,19 +1040,33 @@ class ExecutedSeparately:
 if __name__ == '__main__':
     # 加载 .env 文件
     load_dotenv()
+    Constant.load_env()
     # 获取命令行参数列表
     args = sys.argv
-    # 检测文件是否存在
-    if not USERS_PATH.exists():
+    # 检测文件是否存在（工作进程从任务队列获取用户配置，不需要 users.json）
+    if not ScheduledTask.users_path().exists() and not ("--worker" in args and "--coordinator" not in args):
         input("用户配置文件不存在, 请根据users.example.json示例, 添加users.json用户配置文件")
         sys.exit(0)
-    if not USERS_LOGIN_INFO_PATH.exists():
-        Utils.operate_json_file(USERS_LOGIN_INFO_PATH, "w", {})
+    # 初始化登陆信息存储（首次使用时自动迁移 users_login_info.json）
+    LoginInfoStore.get_instance()
 
-    # 检查是否有参数传入，并且第一个参数是否为 "--single"
-    if len(args) > 1 and args[1] == "--single":
+    # 检查是否传入 "--single" 参数
+    if "--single" in args:
         # 如果满足条件，执行单独运行模式
         ExecutedSeparately.start()
+    elif "--coordinator" in args and "--worker" in args:
+        # 同一进程中同时运行协调进程与工作进程
+        threading.Thread(target=QueueCoordinator.start, name="queue-coordinator", daemon=True).start()
+        QueueWorker.start()
+    elif "--coordinator" in args:
+        # 协调进程: 按计划将到期的用户任务入队
+        QueueCoordinator.start()
+    elif "--worker" in args:
+        # 工作进程: 领取并执行队列中的用户任务
+        QueueWorker.start()
     else:
+        # 常驻进程模式下启动本地控制接口
+        if ControlApi.enabled():
+            ControlApi.start()
         # 否则执行定时任务模式
         ScheduledTask.start()
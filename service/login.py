@@ -1,20 +1,27 @@
+import asyncio
 import json
+import os
 import time
-from pathlib import Path
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from loguru import logger as loguru_logger
 from requests import Session
 
+from common.async_utils import AsyncUtils
+from common.captcha_corpus import CaptchaCorpus
+from common.captcha_solver import CaptchaSolver
 from common.constant import Constant
 from common.exception import BusinessException
+from common.login_info_store import LoginInfoStore
+from common.metrics import Metrics
+from common.signing import Signing
 from common.utils import Utils
 
-file_lock = Lock()
-
 
 class Login:
+    # 等待其他进程登陆时检查登陆租约的间隔（秒）
+    LEASE_POLL_INTERVAL = 0.5
 
     def __init__(self, module_parameter: dict[str, Any]) -> None:
         # 创建会话对象
@@ -29,6 +36,10 @@ class Login:
         self.logger: loguru_logger = module_parameter.get("logger")
         # UUID
         self.uuid = "slider-" + Utils.generate_uuid()
+        # 登陆租约持有者（投机验证时 uuid 会被替换为候选验证码的uuid，租约持有者保持不变）
+        self.lease_owner = "login-" + Utils.generate_uuid()
+        # 本次登陆提交图形验证码验证的次数
+        self.captcha_attempts = 0
         # 异常类
         self.exception = BusinessException("获取用户登陆信息失败")
         # 创建请求参数字典
@@ -41,30 +52,59 @@ class Login:
             "method": "post"
         }
 
-    def send_verify_request(self, data: dict[str, str], slider_auth_data_str: str, captcha_data: dict[str, Any]) -> \
-            dict[str, Any] | None:
+    def identify_slider_auth_data(self, captcha_data: dict[str, dict[str, Any]]) -> str | None:
+        """
+        识别验证码图片，计算滑块需要滑动的距离。
+
+        :param captcha_data: 包含验证码信息的数据
+        :return: 滑动验证数据（未加密），识别失败返回None
+        """
+        offset = CaptchaSolver.identify_offset(captcha_data.get("data").get("jigsawImageBase64"),
+                                               captcha_data.get("data").get("originalImageBase64"))
+
+        # 识别失败
+        if offset is None:
+            return None
+
+        # 构建滑动验证数据
+        return CaptchaSolver.build_slider_auth_data(offset)
+
+    def build_verify_request(self, slider_auth_data_str: str, captcha_data: dict[str, Any]) -> dict[str, Any]:
         """
-        构建请求数据并发送请求，检查图形验证码的验证结果。
+        构建检查图形验证码的请求参数。
 
-        :param data: 请求的基础数据
-        :param slider_auth_data_str: 滑动验证数据（已加密）
+        :param slider_auth_data_str: 滑动验证数据（未加密）
         :param captcha_data: 验证码相关的数据
-        :return: 验证结果数据，如果发生异常，返回None
+        :return: 请求参数
         """
-        # 更新请求数据
+        # 记录滑动验证数据，登陆时使用
         self.slider_auth_data_str = slider_auth_data_str
-        data.update({
+
+        # 构建请求体
+        data: dict[str, str] = {
+            "captchaType": "blockPuzzle",
+            "token": captcha_data.get("data").get("token"),
+            "t": Signing.timestamp(),
             "pointJson": Utils.aes_encrypt_base64(slider_auth_data_str, captcha_data.get("data").get("secretKey"))
-        })
+        }
 
         # 请求参数构造
         self.request_parameter_dict.update({
             "url": Constant.BASE_URL + "/session/captcha/v1/check",
             "data": data
         })
+        return self.request_parameter_dict
 
-        # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+    def handle_verify_response(self, res: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        检查图形验证码的验证结果。
+
+        :param res: 验证请求的响应数据
+        :return: 验证结果数据，验证失败返回None
+        """
+        self.captcha_attempts += 1
+        Metrics.inc("moguding_captcha_verifications_total", {"result": res.get("code")},
+                    description="Captcha verifications by response code")
 
         # 验证码通过返回响应数据
         if res.get("code") == 200:
@@ -78,29 +118,79 @@ class Login:
         # 默认返回None表示失败
         return None
 
-    def get_captcha(self) -> dict[str, Any] | None:
+    def build_captcha_request(self, client_uid: str = None) -> dict[str, Any]:
+        """
+        构建获取图形验证码的请求参数（返回新的参数字典，可并发使用）。
+
+        :param client_uid: 客户端标识，默认为当前登陆流程的UUID
+        :return: 请求参数
+        """
         # 构建请求体
         data: dict[str, str | int] = {
             "captchaType": "blockPuzzle",
             "ts": int(time.time() * 1000),
-            "clientUid": self.uuid,
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000)))
+            "clientUid": client_uid or self.uuid,
+            "t": Signing.timestamp()
         }
 
         # 请求参数构造
-        self.request_parameter_dict.update({
-            "url": Constant.BASE_URL + "/session/captcha/v1/get",
-            "data": data,
-        })
+        return dict(self.request_parameter_dict, url=Constant.BASE_URL + "/session/captcha/v1/get", data=data)
 
+    def get_captcha(self, client_uid: str = None) -> dict[str, Any] | None:
         # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+        res: dict = Utils.send_request(**self.build_captcha_request(client_uid))
 
         if res.get("code") == 200:
             return res
 
         return None
 
+    def fetch_captcha_candidate(self) -> dict[str, Any] | None:
+        """
+        使用新的客户端标识获取一个图形验证码并在本地识别，用于推测式验证。
+
+        :return: 候选验证码 {"uuid", "captcha_data", "offset", "confidence"}，获取失败返回None
+        """
+        client_uid = "slider-" + Utils.generate_uuid()
+        try:
+            captcha_data = self.get_captcha(client_uid)
+        except BusinessException:
+            return None
+
+        if not captcha_data:
+            return None
+
+        identify_result = CaptchaSolver.identify(captcha_data.get("data").get("jigsawImageBase64"),
+                                                 captcha_data.get("data").get("originalImageBase64"))
+        if identify_result is None:
+            CaptchaCorpus.capture(captcha_data, None, None)
+
+        return {
+            "uuid": client_uid,
+            "captcha_data": captcha_data,
+            "offset": identify_result[0] if identify_result else None,
+            "confidence": identify_result[1] if identify_result else 0.0,
+        }
+
+    def verify_captcha_candidate(self, candidate: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        提交候选验证码的识别结果，验证通过后切换为该验证码的客户端标识。
+
+        :param candidate: 候选验证码
+        :return: 验证结果数据，验证失败返回None
+        """
+        captcha_data: dict[str, Any] = candidate.get("captcha_data")
+        slider_auth_data_str = CaptchaSolver.build_slider_auth_data(candidate.get("offset"))
+
+        res: dict = Utils.send_request(**self.build_verify_request(slider_auth_data_str, captcha_data))
+        CaptchaCorpus.capture(captcha_data, slider_auth_data_str, res)
+
+        auth_data = self.handle_verify_response(res)
+        if auth_data:
+            # 登陆请求需要使用获取该验证码时的客户端标识
+            self.uuid = candidate.get("uuid")
+        return auth_data
+
     def solve_captcha(self, captcha_data: dict[str, dict[str, Any]]) -> dict | None:
         """
         解决验证码，检查滑块与拼图的匹配。
@@ -108,62 +198,142 @@ class Login:
         :param captcha_data: 包含验证码信息的数据
         :return: 验证码验证结果
         """
+        slider_auth_data_str = self.identify_slider_auth_data(captcha_data)
+
+        # 如果识别不通过，返回None
+        if not slider_auth_data_str:
+            CaptchaCorpus.capture(captcha_data, None, None)
+            return None
+
+        # 发送请求
+        res: dict = Utils.send_request(**self.build_verify_request(slider_auth_data_str, captcha_data))
+        CaptchaCorpus.capture(captcha_data, slider_auth_data_str, res)
+
+        # 返回验证结果
+        return self.handle_verify_response(res)
+
+    def build_login_request(self, auth_data: dict[str, Any], captcha_data: dict[str, Any]) -> dict[str, Any]:
         # 构建请求体
         data: dict[str, str] = {
-            "captchaType": "blockPuzzle",
-            "token": captcha_data.get("data").get("token"),
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000)))
+            "phone": Signing.aes_encrypt_static(self.user.get("phone")),
+            "password": Signing.aes_encrypt_static(self.user.get("password")),
+            "loginType": "web",
+            "uuid": self.uuid,
+            "t": Signing.timestamp(),
+            "captcha": Utils.aes_encrypt_base64(
+                auth_data.get("data").get("token") + "---" + self.slider_auth_data_str,
+                captcha_data.get("data").get("secretKey"))
         }
 
-        # 获取滑块图像信息
-        slider_data: dict = Utils.picture_identify(
-            Utils.decode_base64_image(captcha_data.get("data").get("jigsawImageBase64"))
-        )
+        # 请求参数构造
+        self.request_parameter_dict.update({
+            "url": Constant.BASE_URL + "/session/user/v6/login",
+            "data": data
+        })
+        return self.request_parameter_dict
 
-        # 获取拼图图像信息
-        jigsaw_data: dict = Utils.picture_identify(
-            Utils.decode_base64_image(captcha_data.get("data").get("originalImageBase64"))
-        )
+    def handle_login_response(self, res: dict[str, Any]) -> None:
+        # 检查返回的 JSON 是否表示成功
+        if res.get("code") != 200:
+            self.logger.error(f"登陆失败 > 失败原因: {res.get('msg')}")
+            raise self.exception
 
-        # 判断数据是否为空
-        if not slider_data or not jigsaw_data:
-            return None
+        # 获取响应数据并解码获取token
+        login_info = json.loads(Utils.aes_decrypt_hex(res.get("data")))
+        # 记录token签发时间，保留已观测到的有效期
+        now = time.time()
+        token_info: dict[str, Any] = self.user_login_info.get("tokenInfo") or {}
+        token_info.update({
+            "issuedAt": now,
+            "lastValidatedAt": now,
+        })
+        self.user_login_info.update({
+            "loginInfo": login_info,
+            "tokenInfo": token_info
+        })
 
-        # 滑块图形y值
-        slider_data_y: int = list(slider_data.keys())[0]
-
-        # 判断滑块值与拼图值是否相等，相等直接构建需要滑动的距离
-        if slider_data_y in jigsaw_data.keys():
-            # 获取需要滑动的距离
-            need_slide_distance = Utils.generate_random_float(jigsaw_data.get(slider_data_y))
-            # 构建请求数据
-            slider_auth_data_str = '{{"x":{},"y":5}}'.format(need_slide_distance)
-            # 发送请求并返回结果
-            return self.send_verify_request(data, slider_auth_data_str, captcha_data)
-
-        # 如果不相等，进行范围判断（正负3的范围）
-        for jigsaw_slider_key in jigsaw_data.keys():
-            if (slider_data_y - 3) < jigsaw_slider_key < (slider_data_y + 3):
-                # 获取需要滑动的距离
-                need_slide_distance = Utils.generate_random_float(jigsaw_data.get(jigsaw_slider_key))
-                # 构建请求数据
-                slider_auth_data_str = '{{"x":{},"y":5}}'.format(need_slide_distance)
-                # 发送请求并返回结果
-                return self.send_verify_request(data, slider_auth_data_str, captcha_data)
-
-        # 如果验证不通过，返回None
-        return None
+        # 更新请求头
+        self.session.headers.update({
+            "Authorization": login_info.get("token"),
+            "Sign": Signing.default_sign(self.user_login_info)
+        })
 
-    def login(self) -> None:
-        self.logger.info(f"登陆")
+    def build_plan_request(self) -> dict[str, Any]:
+        # 请求参数构造
+        self.request_parameter_dict.update({
+            "url": Constant.BASE_URL + "/practice/plan/v4/getPlanByStu",
+            "data": {
+                "t": Signing.timestamp()
+            }
+        })
+        return self.request_parameter_dict
 
+    def handle_plan_response(self, res: dict[str, Any]) -> None:
+        # 检查返回的 JSON 是否表示成功
+        if res.get("code") != 200:
+            self.logger.error(f"获取实习计划失败 > 失败原因: {res.get('msg')}")
+            raise self.exception
+
+        # 获取响应数据
+        self.user_login_info.update({
+            "planInfo": res.get("data")[0]
+        })
+
+    def record_token_expired(self) -> None:
+        """
+        记录token失效，根据签发时间计算并保存观测到的token有效期
+        """
+        token_info: dict[str, Any] = self.user_login_info.get("tokenInfo") or {}
+        issued_at = token_info.get("issuedAt")
+        if not issued_at:
+            return
+
+        now = time.time()
+        lifetime = now - issued_at
+        # 取观测到的最短有效期，保守估计
+        observed_lifetime = token_info.get("observedLifetime")
+        token_info.update({
+            "expiredAt": now,
+            "observedLifetime": min(lifetime, observed_lifetime) if observed_lifetime else lifetime,
+        })
+        self.user_login_info.update({
+            "tokenInfo": token_info
+        })
+        self.logger.info(f"token失效, 本次token有效期: {lifetime / 3600:.2f}小时")
+
+    def relogin(self) -> None:
+        """
+        token失效后重新登陆
+        """
+        self.record_token_expired()
+        self.login()
+
+    def save_login_info(self) -> None:
+        # 更新用户登陆信息（仅写入当前用户）
+        LoginInfoStore.get_instance().set(self.user.get("username"), self.user_login_info)
+
+    @staticmethod
+    def captcha_prefetch() -> int:
+        """
+        获取推测式验证时并发预取的验证码数量，小于等于1时按顺序逐个处理
+
+        :return: 预取数量
+        """
+        return max(1, int(os.getenv("CAPTCHA_PREFETCH", "1")))
+
+    def pass_captcha(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        """
+        按顺序获取、识别、验证图形验证码，最多3次
+
+        :return: (验证结果数据, 验证码数据)
+        """
         # 图形验证码处理
         auth_data = dict()
         captcha_data = dict()
         # 3次认证机会，超过失败
-        self.logger.info(f"图形验证码处理")
         retries = 3
         for _ in range(1, retries + 1):
+            self.renew_login_lease()
             # 获取图形验证码数据
             captcha_data: dict[str, Any] = self.get_captcha()
 
@@ -186,92 +356,421 @@ class Login:
         if not auth_data:
             raise self.exception
 
+        return auth_data, captcha_data
+
+    @staticmethod
+    def next_captcha_candidate(candidates: list[dict[str, Any]]) -> dict[str, Any] | None:
         """
-        登陆请求
+        取出置信度最高的候选验证码，丢弃无法识别的验证码
+
+        :param candidates: 候选验证码列表
+        :return: 候选验证码，没有可用的候选时返回None
         """
-        # 构建请求体
-        data: dict[str, str] = {
-            "phone": Utils.aes_encrypt(self.user.get("phone")),
-            "password": Utils.aes_encrypt(self.user.get("password")),
-            "loginType": "web",
-            "uuid": self.uuid,
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
-            "captcha": Utils.aes_encrypt_base64(
-                auth_data.get("data").get("token") + "---" + self.slider_auth_data_str,
-                captcha_data.get("data").get("secretKey"))
-        }
+        candidates[:] = [candidate for candidate in candidates if candidate and candidate.get("offset") is not None]
+        if not candidates:
+            return None
+        candidates.sort(key=lambda candidate: candidate.get("confidence"), reverse=True)
+        return candidates.pop(0)
 
-        # 请求参数构造
-        self.request_parameter_dict.update({
-            "url": Constant.BASE_URL + "/session/user/v6/login",
-            "data": data
-        })
+    def pass_captcha_speculative(self, prefetch: int) -> tuple[dict[str, Any], dict[str, Any]]:
+        """
+        推测式处理图形验证码: 并发预取多个验证码并在本地识别，优先提交置信度最高的一个，
+        验证失败时直接使用已预取的下一个验证码，全部用完后再预取下一批。
 
-        # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+        :param prefetch: 每批预取的验证码数量
+        :return: (验证结果数据, 验证码数据)
+        """
+        # 最多提交3次验证，最多预取3批
+        retries = 3
+        attempts = 0
+        batches = 0
+        candidates: list[dict[str, Any]] = []
+
+        with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="captcha-prefetch") as executor:
+            while attempts < retries:
+                self.renew_login_lease()
+                candidate = self.next_captcha_candidate(candidates)
+
+                if candidate is None:
+                    if batches >= retries:
+                        break
+                    # 并发预取一批验证码
+                    batches += 1
+                    candidates = list(executor.map(lambda _: self.fetch_captcha_candidate(), range(prefetch)))
+                    if not any(candidates):
+                        self.logger.error(f"获取图形验证码数据失败 (批次 {batches}/{retries})")
+                        time.sleep(60)
+                    continue
+
+                # 提交置信度最高的验证码
+                attempts += 1
+                auth_data = self.verify_captcha_candidate(candidate)
+                if auth_data:
+                    return auth_data, candidate.get("captcha_data")
+
+                self.logger.error(f"自动认证图形验证码失败 (尝试 {attempts}/{retries}, "
+                                  f"置信度 {candidate.get('confidence'):.2f})")
 
-        # 检查返回的 JSON 是否表示成功
-        if res.get("code") != 200:
-            self.logger.error(f"登陆失败 > 失败原因: {res.get('msg')}")
-            raise self.exception
+        # 认证失败，抛出业务异常
+        raise self.exception
 
-        # 获取响应数据并解码获取token
-        login_info = json.loads(Utils.aes_decrypt_hex(res.get("data")))
-        self.user_login_info.update({
-            "loginInfo": login_info
-        })
+    def record_captcha_attempts(self) -> None:
+        """
+        记录本次登陆提交图形验证码验证的次数
+        """
+        Metrics.observe("moguding_login_captcha_attempts", self.captcha_attempts,
+                        buckets=(1, 2, 3, 4, 5, 6, 9), description="Captcha verifications per login")
+        self.captcha_attempts = 0
+
+    @staticmethod
+    def stage_timer(stage: str):
+        """
+        记录登陆流程各阶段（captcha、login、plan）的耗时
+        """
+        return Metrics.timer("moguding_login_stage_duration_seconds", {"stage": stage},
+                             description="Login duration by stage")
 
-        self.logger.info(f"登陆完成")
+    @staticmethod
+    def lease_seconds() -> float:
+        """
+        获取登陆租约时长（秒），持有租约的进程异常退出时，其他进程最多等待该时长后自行登陆
 
-        # 获取实习计划
-        self.logger.info(f"获取实习计划")
+        :return: 租约时长
+        """
+        return max(10.0, float(os.getenv("LOGIN_LEASE_SECONDS", "300")))
 
+    def load_fresh_login_info(self, previous_token: str | None) -> bool:
         """
-        实习计划请求
+        读取其他进程（或线程）写入的登陆信息，token 与本次登陆前不同时直接使用，不再重新登陆
+
+        :param previous_token: 本次登陆前的token
+        :return: 是否已使用新的登陆信息
         """
-        # 更新请求头
+        user_login_info: dict[str, Any] = LoginInfoStore.get_instance().get(self.user.get("username")) or {}
+        token = (user_login_info.get("loginInfo") or {}).get("token")
+        if not token or token == previous_token or not user_login_info.get("planInfo"):
+            return False
+
+        # 原地更新，与其他模块共享的登陆信息保持一致
+        self.user_login_info.clear()
+        self.user_login_info.update(user_login_info)
         self.session.headers.update({
-            "Authorization": login_info.get("token"),
-            "Sign": Utils.md5_encrypt(
-                login_info.get("userId") + login_info.get("roleKey") + Constant.MD5_SALT)
+            "Authorization": token,
+            "Sign": Signing.default_sign(self.user_login_info)
         })
+        self.logger.info(f"其他进程已完成登陆, 使用新的登陆信息")
+        return True
 
-        # 请求参数构造
-        self.request_parameter_dict.update({
-            "url": Constant.BASE_URL + "/practice/plan/v4/getPlanByStu",
-            "data": {
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000)))
-            }
-        })
+    def acquire_login_lease(self) -> bool:
+        """
+        获取当前用户的登陆租约，其他进程（或线程）正在为该用户登陆时等待其完成
+
+        :return: True 表示已获取租约需要登陆，False 表示已使用其他持有者写入的登陆信息
+        """
+        store = LoginInfoStore.get_instance()
+        username = self.user.get("username")
+        previous_token = (self.user_login_info.get("loginInfo") or {}).get("token")
+
+        deadline = time.monotonic() + self.lease_seconds()
+        waited = False
+        while not store.acquire_lease(username, self.lease_owner, self.lease_seconds()):
+            if not waited:
+                self.logger.info(f"其他进程正在登陆, 等待登陆完成")
+                waited = True
+            if time.monotonic() >= deadline:
+                self.logger.error(f"等待其他进程登陆超时")
+                Metrics.inc("moguding_login_lease_total", {"result": "timeout"},
+                            description="Login lease outcomes")
+                raise self.exception
+            time.sleep(self.LEASE_POLL_INTERVAL)
+
+        if self.load_fresh_login_info(previous_token):
+            store.release_lease(username, self.lease_owner)
+            Metrics.inc("moguding_login_lease_total", {"result": "reused"}, description="Login lease outcomes")
+            return False
+
+        Metrics.inc("moguding_login_lease_total", {"result": "acquired"}, description="Login lease outcomes")
+        return True
+
+    def renew_login_lease(self) -> None:
+        """
+        续期当前用户的登陆租约，在验证码重试与登陆请求之间调用，避免登陆耗时超过租约时长后其他进程同时登陆
+        """
+        if not LoginInfoStore.get_instance().acquire_lease(self.user.get("username"), self.lease_owner,
+                                                          self.lease_seconds()):
+            self.logger.error(f"登陆租约已过期并被其他进程获取")
+            raise self.exception
+
+    def login(self) -> None:
+        # 同一用户同一时间只有一个进程登陆，等待期间其他进程已完成登陆时直接使用新的登陆信息
+        if not self.acquire_login_lease():
+            return
+        try:
+            self.perform_login()
+        finally:
+            LoginInfoStore.get_instance().release_lease(self.user.get("username"), self.lease_owner)
+
+    def perform_login(self) -> None:
+        with Metrics.timer("moguding_login_duration_seconds", description="Login duration"):
+            self.logger.info(f"登陆")
+
+            # 图形验证码处理
+            self.logger.info(f"图形验证码处理")
+            prefetch = self.captcha_prefetch()
+            try:
+                with self.stage_timer("captcha"):
+                    if prefetch > 1:
+                        auth_data, captcha_data = self.pass_captcha_speculative(prefetch)
+                    else:
+                        auth_data, captcha_data = self.pass_captcha()
+            finally:
+                self.record_captcha_attempts()
+
+            """
+            登陆请求
+            """
+            # 获取请求结果
+            self.renew_login_lease()
+            with self.stage_timer("login"):
+                res: dict = Utils.send_request(**self.build_login_request(auth_data, captcha_data))
+                self.handle_login_response(res)
+
+            self.logger.info(f"登陆完成")
+
+            # 获取实习计划
+            self.logger.info(f"获取实习计划")
+
+            """
+            实习计划请求
+            """
+            # 获取请求结果
+            with self.stage_timer("plan"):
+                res: dict = Utils.send_request(**self.build_plan_request())
+                self.handle_plan_response(res)
+
+            self.logger.info(f"获取实习计划完成")
+
+            # 更新用户登陆信息
+            self.save_login_info()
+
+            self.logger.info(f"登陆流程完毕")
+
+
+class AsyncLogin(Login):
+    """
+    登陆模块的异步版本，请求通过 AsyncUtils 发送，会话对象为 httpx.AsyncClient
+    """
+
+    async def solve_captcha(self, captcha_data: dict[str, dict[str, Any]]) -> dict | None:
+        # 图像识别为CPU操作，放到线程中执行，避免阻塞事件循环
+        slider_auth_data_str = await asyncio.to_thread(self.identify_slider_auth_data, captcha_data)
+
+        # 如果识别不通过，返回None
+        if not slider_auth_data_str:
+            CaptchaCorpus.capture(captcha_data, None, None)
+            return None
 
+        # 发送请求并返回结果
+        res: dict = await AsyncUtils.send_request(**self.build_verify_request(slider_auth_data_str, captcha_data))
+        CaptchaCorpus.capture(captcha_data, slider_auth_data_str, res)
+        return self.handle_verify_response(res)
+
+    async def get_captcha(self, client_uid: str = None) -> dict[str, Any] | None:
         # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+        res: dict = await AsyncUtils.send_request(**self.build_captcha_request(client_uid))
 
-        # 检查返回的 JSON 是否表示成功
-        if res.get("code") != 200:
-            self.logger.error(f"获取实习计划失败 > 失败原因: {res.get('msg')}")
+        if res.get("code") == 200:
+            return res
+
+        return None
+
+    async def fetch_captcha_candidate(self) -> dict[str, Any] | None:
+        client_uid = "slider-" + Utils.generate_uuid()
+        try:
+            captcha_data = await self.get_captcha(client_uid)
+        except BusinessException:
+            return None
+
+        if not captcha_data:
+            return None
+
+        # 图像识别为CPU操作，放到线程中执行
+        identify_result = await asyncio.to_thread(CaptchaSolver.identify,
+                                                  captcha_data.get("data").get("jigsawImageBase64"),
+                                                  captcha_data.get("data").get("originalImageBase64"))
+        if identify_result is None:
+            CaptchaCorpus.capture(captcha_data, None, None)
+
+        return {
+            "uuid": client_uid,
+            "captcha_data": captcha_data,
+            "offset": identify_result[0] if identify_result else None,
+            "confidence": identify_result[1] if identify_result else 0.0,
+        }
+
+    async def verify_captcha_candidate(self, candidate: dict[str, Any]) -> dict[str, Any] | None:
+        captcha_data: dict[str, Any] = candidate.get("captcha_data")
+        slider_auth_data_str = CaptchaSolver.build_slider_auth_data(candidate.get("offset"))
+
+        res: dict = await AsyncUtils.send_request(**self.build_verify_request(slider_auth_data_str, captcha_data))
+        CaptchaCorpus.capture(captcha_data, slider_auth_data_str, res)
+
+        auth_data = self.handle_verify_response(res)
+        if auth_data:
+            # 登陆请求需要使用获取该验证码时的客户端标识
+            self.uuid = candidate.get("uuid")
+        return auth_data
+
+    async def pass_captcha(self) -> tuple[dict[str, Any], dict[str, Any]]:
+        # 图形验证码处理
+        auth_data = dict()
+        captcha_data = dict()
+        # 3次认证机会，超过失败
+        retries = 3
+        for _ in range(1, retries + 1):
+            await self.renew_login_lease()
+            # 获取图形验证码数据
+            captcha_data: dict[str, Any] = await self.get_captcha()
+
+            # 未获取到图形验证码数据，跳过当前循环
+            if not captcha_data:
+                self.logger.error(f"获取图形验证码数据失败 (尝试 {_}/{retries})")
+                await asyncio.sleep(60)
+                continue
+
+            # 自动认证图形验证码
+            auth_data: dict[str, Any] = await self.solve_captcha(captcha_data)
+
+            # 认证通过，则跳出循环
+            if auth_data:
+                break
+
+            self.logger.error(f"自动认证图形验证码失败 (尝试 {_}/{retries})")
+
+        # 认证失败，抛出业务异常
+        if not auth_data:
             raise self.exception
 
-        # 获取响应数据
-        self.user_login_info.update({
-            "planInfo": res.get("data")[0]
-        })
+        return auth_data, captcha_data
 
-        self.logger.info(f"获取实习计划完成")
+    async def pass_captcha_speculative(self, prefetch: int) -> tuple[dict[str, Any], dict[str, Any]]:
+        # 最多提交3次验证，最多预取3批
+        retries = 3
+        attempts = 0
+        batches = 0
+        candidates: list[dict[str, Any]] = []
+
+        while attempts < retries:
+            await self.renew_login_lease()
+            candidate = self.next_captcha_candidate(candidates)
+
+            if candidate is None:
+                if batches >= retries:
+                    break
+                # 并发预取一批验证码
+                batches += 1
+                candidates = list(await asyncio.gather(*(self.fetch_captcha_candidate() for _ in range(prefetch))))
+                if not any(candidates):
+                    self.logger.error(f"获取图形验证码数据失败 (批次 {batches}/{retries})")
+                    await asyncio.sleep(60)
+                continue
 
-        # 更新用户登陆信息
-        file_path = (Path(__file__).parent.parent / "data/users_login_info.json").resolve()
+            # 提交置信度最高的验证码
+            attempts += 1
+            auth_data = await self.verify_captcha_candidate(candidate)
+            if auth_data:
+                return auth_data, candidate.get("captcha_data")
+
+            self.logger.error(f"自动认证图形验证码失败 (尝试 {attempts}/{retries}, "
+                              f"置信度 {candidate.get('confidence'):.2f})")
 
-        with file_lock:
-            # 读取 users_login_info 文件
-            users_login_info = Utils.operate_json_file(file_path)
-            # 写入 users_login_info 文件
-            users_login_info.update({
-                self.user.get("username"): self.user_login_info
-            })
-            Utils.operate_json_file(file_path, "w", users_login_info)
+        # 认证失败，抛出业务异常
+        raise self.exception
+
+    async def acquire_login_lease(self) -> bool:
+        store = LoginInfoStore.get_instance()
+        username = self.user.get("username")
+        previous_token = (self.user_login_info.get("loginInfo") or {}).get("token")
+
+        deadline = time.monotonic() + self.lease_seconds()
+        waited = False
+        while not await asyncio.to_thread(store.acquire_lease, username, self.lease_owner, self.lease_seconds()):
+            if not waited:
+                self.logger.info(f"其他进程正在登陆, 等待登陆完成")
+                waited = True
+            if time.monotonic() >= deadline:
+                self.logger.error(f"等待其他进程登陆超时")
+                Metrics.inc("moguding_login_lease_total", {"result": "timeout"},
+                            description="Login lease outcomes")
+                raise self.exception
+            await asyncio.sleep(self.LEASE_POLL_INTERVAL)
+
+        if await asyncio.to_thread(self.load_fresh_login_info, previous_token):
+            await asyncio.to_thread(store.release_lease, username, self.lease_owner)
+            Metrics.inc("moguding_login_lease_total", {"result": "reused"}, description="Login lease outcomes")
+            return False
+
+        Metrics.inc("moguding_login_lease_total", {"result": "acquired"}, description="Login lease outcomes")
+        return True
+
+    async def renew_login_lease(self) -> None:
+        if not await asyncio.to_thread(LoginInfoStore.get_instance().acquire_lease, self.user.get("username"),
+                                       self.lease_owner, self.lease_seconds()):
+            self.logger.error(f"登陆租约已过期并被其他进程获取")
+            raise self.exception
 
-        self.logger.info(f"登陆流程完毕")
+    async def login(self) -> None:
+        if not await self.acquire_login_lease():
+            return
+        try:
+            await self.perform_login()
+        finally:
+            await asyncio.to_thread(LoginInfoStore.get_instance().release_lease, self.user.get("username"),
+                                    self.lease_owner)
+
+    async def perform_login(self) -> None:
+        with Metrics.timer("moguding_login_duration_seconds", description="Login duration"):
+            self.logger.info(f"登陆")
+
+            # 图形验证码处理
+            self.logger.info(f"图形验证码处理")
+            prefetch = self.captcha_prefetch()
+            try:
+                with self.stage_timer("captcha"):
+                    if prefetch > 1:
+                        auth_data, captcha_data = await self.pass_captcha_speculative(prefetch)
+                    else:
+                        auth_data, captcha_data = await self.pass_captcha()
+            finally:
+                self.record_captcha_attempts()
+
+            # 登陆请求
+            await self.renew_login_lease()
+            with self.stage_timer("login"):
+                res: dict = await AsyncUtils.send_request(**self.build_login_request(auth_data, captcha_data))
+                self.handle_login_response(res)
+
+            self.logger.info(f"登陆完成")
+
+            # 实习计划请求
+            self.logger.info(f"获取实习计划")
+            with self.stage_timer("plan"):
+                res: dict = await AsyncUtils.send_request(**self.build_plan_request())
+                self.handle_plan_response(res)
+
+            self.logger.info(f"获取实习计划完成")
+
+            # 更新用户登陆信息（文件读写放到线程中执行）
+            await asyncio.to_thread(self.save_login_info)
+
+            self.logger.info(f"登陆流程完毕")
+
+    async def relogin(self) -> None:
+        """
+        token失效后重新登陆
+        """
+        self.record_token_expired()
+        await self.login()
 
 
 if __name__ == '__main__':
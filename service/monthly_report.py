@@ -1,13 +1,18 @@
+import asyncio
 import time
 from datetime import datetime
 from typing import Any
 
 from requests import Session
 
+from common.async_utils import AsyncUtils
 from common.constant import Constant
 from common.exception import BusinessException
+from common.report_content_store import ReportContentStore
+from common.report_ledger import ReportLedger
+from common.signing import Signing
 from common.utils import Utils
-from service.login import Login
+from service.login import AsyncLogin, Login
 
 
 class MonthlyReport:
@@ -34,19 +39,15 @@ class MonthlyReport:
             "method": "post"
         }
 
-    def sub_monthly_report(self) -> None:
-        self.logger.info(f"处理月报")
+    def get_sub_month_list(self) -> list[str]:
+        """
+        根据实习计划的起止时间，获取所有提交月
 
-        # 登陆信息
-        login_info: dict[str, Any] = self.user_login_info.get("loginInfo")
+        :return: 提交月列表，格式为 "YYYY-MM"
+        """
         # 实习计划信息
         plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
-        # 岗位信息
-        job_setting: dict[str, Any] = self.user.get("configInfo").get("jobSetting")
 
-        """
-        获取提交月
-        """
         # 转换为 datetime 对象
         start_date = datetime.strptime(plan_info.get("startTime"), '%Y-%m-%d %H:%M:%S')
         end_date = datetime.strptime(plan_info.get("endTime"), '%Y-%m-%d %H:%M:%S')
@@ -66,56 +67,53 @@ class MonthlyReport:
             year_increment = 1 if current_date.month == 12 else 0
             current_date = current_date.replace(year=current_date.year + year_increment, month=next_month)
 
-        """
-        获取最后一次月报提交时间
-        """
+        return sub_month_list
+
+    def update_list_sign_header(self) -> None:
+        # 构建请求头
+        self.session.headers.update({
+            "Sign": Signing.report_list_sign(self.user_login_info, "month")
+        })
+
+    def build_last_report_request(self) -> dict[str, Any]:
+        # 实习计划信息
+        plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
+
         # 构建请求体
         data = {
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
+            "t": Signing.timestamp(),
             "currPage": 1,
             "pageSize": 25,
             "planId": plan_info.get("planId"),
             "reportType": "month"
         }
         # 构建请求头
-        self.session.headers.update({
-            "Sign": Utils.md5_encrypt(
-                login_info.get("userId") + login_info.get("roleKey") + "month" + Constant.MD5_SALT)
-        })
+        self.update_list_sign_header()
 
         # 请求参数构造
         self.request_parameter_dict.update({
             "url": Constant.BASE_URL + "/practice/paper/v2/listByStu",
             "data": data
         })
+        return self.request_parameter_dict
 
-        # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
-
-        # 判断是否获取成功
-        if res.get("code") == 401:
-            # token失效
-            self.logger.error(f"获取提交月失败 > 失败原因: token失效 (即将重新获取token)")
-            # 重新获取登陆信息
-            Login(self.module_parameter).login()
-            # 更新Sign以及data
-            data.update({
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000)))
-            })
-            self.session.headers.update({
-                "Sign": Utils.md5_encrypt(
-                    login_info.get("userId") + login_info.get("roleKey") + "month" + Constant.MD5_SALT)
-            })
-            # 重新发送请求
-            res: dict = Utils.send_request(**self.request_parameter_dict)
+    def refresh_last_report_request(self) -> dict[str, Any]:
+        # 重新登陆后，更新Sign以及data
+        self.request_parameter_dict.get("data").update({
+            "t": Signing.timestamp()
+        })
+        self.update_list_sign_header()
+        return self.request_parameter_dict
 
-            # 仍未成功，则失败
-            if res.get("code") != 200:
-                self.logger.error(f"获取提交月失败 > 失败原因: {res.get('msg')}")
-                raise self.exception
+    def get_need_sub_time_list(self, sub_month_list: list[str], res: dict[str, Any]) -> list[str]:
+        """
+        根据最后一次月报提交时间，计算需要提交月报的月份
 
-        # 其他异常情况
-        elif res.get("code") != 200:
+        :param sub_month_list: 提交月列表
+        :param res: 获取最后一次月报提交时间请求的响应数据
+        :return: 需要提交月报的月份
+        """
+        if res.get("code") != 200:
             self.logger.error(f"获取提交月失败 > 失败原因: {res.get('msg')}")
             raise self.exception
 
@@ -124,18 +122,207 @@ class MonthlyReport:
 
         # 最后一次提交月
         last_sub_week = month_report_data[0].get("yearmonth") if month_report_data else "2024-10"
+
+        return self.filter_sub_month_list(sub_month_list, last_sub_week)
+
+    @staticmethod
+    def filter_sub_month_list(sub_month_list: list[str], last_sub_month: str) -> list[str]:
+        """
+        根据最后一次提交月，计算需要提交月报的月份
+
+        :param sub_month_list: 提交月列表
+        :param last_sub_month: 最后一次提交月，格式为 "YYYY-MM"
+        :return: 需要提交月报的月份
+        """
         # 当前系统时间
         current_time = datetime.now()
 
         # 将最后一次提交时间转换为 datetime 对象（设置为该月的 1 号）
-        last_submit_datetime = datetime.strptime(last_sub_week, "%Y-%m")
+        last_submit_datetime = datetime.strptime(last_sub_month, "%Y-%m")
 
         # 获取在最后一次提交时间之后，且不超过当前系统时间的日期（不包含最后一次提交时间）
-        need_sub_time_list = [
+        return [
             _ for _ in sub_month_list
             if last_submit_datetime < datetime.strptime(_, "%Y-%m") < current_time
         ]
 
+    def generate_content(self, sub_time: str) -> str:
+        """
+        利用ai生成月报内容，最多尝试3次
+
+        :param sub_time: 提交月，格式为 "YYYY-MM"
+        :return: 月报内容
+        """
+        # 岗位信息
+        job_setting: dict[str, Any] = self.user.get("configInfo").get("jobSetting")
+
+        sub_time_split = sub_time.split("-")
+
+        content = None
+
+        for _ in range(1, 4):
+            # 利用ai生成周报
+            content = Utils.report_assistant(
+                f"撰写一份{job_setting.get('post')}{sub_time_split[0]}年{sub_time_split[1]}月月报，只要纯文本，语言简洁，不要太多的格式")
+            if type(content) == str:
+                break
+
+            self.logger.error(f"生成周报失败 > 失败原因: {content}")
+
+            # 如果已达到最大重试次数, 停止生成
+            if _ == 3:
+                self.logger.error(f"生成周报失败，超过最大重试次数！")
+                raise self.exception
+
+        return content
+
+    def get_content(self, sub_time: str) -> str:
+        """
+        获取月报内容，优先使用预生成的内容，没有则利用ai生成并保存，提交失败时无需重新生成
+
+        :param sub_time: 提交月，格式为 "YYYY-MM"
+        :return: 月报内容
+        """
+        store = ReportContentStore.get_instance()
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+
+        content = store.get_ready(self.user.get("username"), plan_id, "month", sub_time)
+        if content:
+            self.logger.info(f"使用已生成的{sub_time}月报内容")
+            return content
+
+        content = self.generate_content(sub_time)
+        store.put(self.user.get("username"), plan_id, "month", sub_time, content)
+        return content
+
+    def handle_save_response(self, res: dict[str, Any], sub_time: str) -> None:
+        """
+        检查提交月报结果，提交成功后将内容标记为已使用，并记录到本地提交记录
+
+        :param res: 提交月报请求的响应数据
+        :param sub_time: 提交月，格式为 "YYYY-MM"
+        """
+        if res.get("code") != 200:
+            self.logger.error(f"提交{sub_time}月报失败 > 失败原因: {res.get('msg')}")
+            raise self.exception
+
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+        ReportContentStore.get_instance().mark_consumed(self.user.get("username"), plan_id, "month", sub_time)
+        ReportLedger.get_instance().record_submitted(self.user.get("username"), plan_id, "month", sub_time)
+
+    def build_save_request(self, sub_time: str, content: str) -> dict[str, Any]:
+        # 实习计划信息
+        plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
+
+        sub_time_split = sub_time.split("-")
+
+        # 构建请求
+        data = {
+            "t": Signing.timestamp(),
+            "imageList": [],
+            "title": f"{sub_time_split[0]}年{sub_time_split[1]}月月报",
+            "content": content,
+            "planId": plan_info.get("planId"),
+            "reportType": "month",
+            "yearmonth": sub_time
+        }
+
+        # 请求参数构造
+        self.request_parameter_dict.update({
+            "url": Constant.BASE_URL + "/practice/paper/v6/save",
+            "data": data
+        })
+
+        # 构建请求头
+        self.session.headers.update({
+            "Sign": Signing.report_save_sign(self.user_login_info, data["reportType"], data["title"])
+        })
+        return self.request_parameter_dict
+
+    def check_ledger(self, sub_month_list: list[str]) -> bool:
+        """
+        根据本地提交记录判断是否没有需要提交的月报
+
+        :param sub_month_list: 提交月列表
+        :return: 是否没有需要提交的月报，False表示需要请求服务端确认
+        """
+        entry = ReportLedger.get_instance().get(
+            self.user.get("username"), self.user_login_info.get("planInfo").get("planId"), "month")
+        if not ReportLedger.get_instance().is_fresh(entry):
+            return False
+
+        return not self.filter_sub_month_list(sub_month_list, entry.get("lastPeriod"))
+
+    def reconcile_months(self, sub_month_list: list[str], res: dict[str, Any]) -> list[str]:
+        """
+        根据服务端提交列表计算需要提交月报的月份，并更新本地提交记录
+
+        :param sub_month_list: 提交月列表
+        :param res: 获取最后一次月报提交时间请求的响应数据
+        :return: 需要提交月报的月份
+        """
+        need_sub_time_list = self.get_need_sub_time_list(sub_month_list, res)
+
+        month_report_data = res.get("data")
+        ReportLedger.get_instance().reconcile(
+            self.user.get("username"), self.user_login_info.get("planInfo").get("planId"), "month",
+            month_report_data[0].get("yearmonth") if month_report_data else None)
+
+        return need_sub_time_list
+
+    def get_pending_months(self) -> list[str]:
+        """
+        获取需要提交月报的月份
+
+        :return: 需要提交月报的月份，格式为 "YYYY-MM"
+        """
+        # 获取提交月
+        sub_month_list = self.get_sub_month_list()
+
+        # 本地提交记录显示没有需要提交的月报
+        if self.check_ledger(sub_month_list):
+            return []
+
+        """
+        获取最后一次月报提交时间
+        """
+        # 获取请求结果
+        res: dict = Utils.send_request(**self.build_last_report_request())
+
+        # 判断是否获取成功
+        if res.get("code") == 401:
+            # token失效
+            self.logger.error(f"获取提交月失败 > 失败原因: token失效 (即将重新获取token)")
+            # 重新获取登陆信息
+            Login(self.module_parameter).relogin()
+            # 重新发送请求
+            res: dict = Utils.send_request(**self.refresh_last_report_request())
+
+        return self.reconcile_months(sub_month_list, res)
+
+    def pregenerate(self) -> None:
+        """
+        预先生成需要提交的月报内容并保存，不进行提交
+        """
+        self.logger.info(f"预生成月报内容")
+
+        store = ReportContentStore.get_instance()
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+
+        for sub_time in self.get_pending_months():
+            if store.get_ready(self.user.get("username"), plan_id, "month", sub_time):
+                continue
+
+            self.logger.info(f"预生成{sub_time}月报内容")
+            store.put(self.user.get("username"), plan_id, "month", sub_time, self.generate_content(sub_time))
+
+        self.logger.info(f"预生成月报内容完毕")
+
+    def sub_monthly_report(self) -> None:
+        self.logger.info(f"处理月报")
+
+        need_sub_time_list = self.get_pending_months()
+
         # 需要提交月报的时间段为空，则不进行处理月报
         if not need_sub_time_list:
             self.logger.info(f"暂未需要处理的月报")
@@ -150,55 +337,77 @@ class MonthlyReport:
 
             self.logger.info(f"生成{sub_time_split[0]}年{sub_time_split[1]}月月报内容")
 
-            content = None
-
-            for _ in range(1, 4):
-                # 利用ai生成周报
-                content = Utils.report_assistant(
-                    f"撰写一份{job_setting.get('post')}{sub_time_split[0]}年{sub_time_split[1]}月月报，只要纯文本，语言简洁，不要太多的格式")
-                if type(content) == str:
-                    break
-
-                self.logger.error(f"生成周报失败 > 失败原因: {content}")
-
-                # 如果已达到最大重试次数, 停止生成
-                if _ == 3:
-                    self.logger.error(f"生成周报失败，超过最大重试次数！")
-                    raise self.exception
+            content = self.get_content(sub_time)
 
             """
             提交月报
             """
-            # 构建请求
-            data = {
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
-                "imageList": [],
-                "title": f"{sub_time_split[0]}年{sub_time_split[1]}月月报",
-                "content": content,
-                "planId": plan_info.get("planId"),
-                "reportType": "month",
-                "yearmonth": sub_time
-            }
-
-            # 请求参数构造
-            self.request_parameter_dict.update({
-                "url": Constant.BASE_URL + "/practice/paper/v6/save",
-                "data": data
-            })
-
-            # 构建请求头
-            self.session.headers.update({
-                "Sign": Utils.md5_encrypt(
-                    login_info.get("userId") + data["reportType"] + plan_info.get("planId") + data[
-                        "title"] + Constant.MD5_SALT)
-            })
+            res: dict = Utils.send_request(**self.build_save_request(sub_time, content))
+            self.handle_save_response(res, sub_time)
+
+            self.logger.info(f"提交{sub_time_split[0]}年{sub_time_split[1]}月月报成功")
+
+            time.sleep(60)
+
+        self.logger.info(f"月报处理完毕")
+
+
+class AsyncMonthlyReport(MonthlyReport):
+    """
+    月报模块的异步版本
+    """
+
+    async def get_pending_months(self) -> list[str]:
+        # 获取提交月
+        sub_month_list = self.get_sub_month_list()
+
+        # 本地提交记录显示没有需要提交的月报
+        if self.check_ledger(sub_month_list):
+            return []
+
+        # 获取最后一次月报提交时间
+        res: dict = await AsyncUtils.send_request(**self.build_last_report_request())
+
+        # 判断是否获取成功
+        if res.get("code") == 401:
+            # token失效
+            self.logger.error(f"获取提交月失败 > 失败原因: token失效 (即将重新获取token)")
+            # 重新获取登陆信息
+            await AsyncLogin(self.module_parameter).relogin()
+            # 重新发送请求
+            res: dict = await AsyncUtils.send_request(**self.refresh_last_report_request())
+
+        return self.reconcile_months(sub_month_list, res)
+
+    async def sub_monthly_report(self) -> None:
+        self.logger.info(f"处理月报")
+
+        need_sub_time_list = await self.get_pending_months()
+
+        # 需要提交月报的时间段为空，则不进行处理月报
+        if not need_sub_time_list:
+            self.logger.info(f"暂未需要处理的月报")
+            return
+
+        # 需要提交月报的时间段不为空，则进行月报提交
+        for sub_time in need_sub_time_list:
+
+            sub_time_split = sub_time.split("-")
+
+            self.logger.info(f"提交{sub_time_split[0]}年{sub_time_split[1]}月月报")
+
+            self.logger.info(f"生成{sub_time_split[0]}年{sub_time_split[1]}月月报内容")
+
+            # ai生成为阻塞调用，放到线程中执行
+            content = await asyncio.to_thread(self.get_content, sub_time)
 
             # 提交月报
-            Utils.send_request(**self.request_parameter_dict)
+            res: dict = await AsyncUtils.send_request(**self.build_save_request(sub_time, content))
+            self.handle_save_response(res, sub_time)
 
             self.logger.info(f"提交{sub_time_split[0]}年{sub_time_split[1]}月月报成功")
 
-            time.sleep(60)
+            await asyncio.sleep(60)
 
         self.logger.info(f"月报处理完毕")
 
@@ -1,13 +1,14 @@
-import time
 from datetime import datetime
 from typing import Any
 
 from requests import Session
 
+from common.async_utils import AsyncUtils
 from common.constant import Constant
 from common.exception import BusinessException
+from common.signing import Signing
 from common.utils import Utils
-from service.login import Login
+from service.login import AsyncLogin, Login
 
 
 class SignIn:
@@ -34,17 +35,11 @@ class SignIn:
             "method": "post"
         }
 
-    def sign_in(self) -> None:
-
-        self.logger.info(f"签到")
-
+    def build_sign_in_request(self) -> dict[str, Any]:
         # 上下班判断
         current_time = datetime.now()
         sing_in_type = "START" if current_time.hour < 12 else "END"
 
-        """
-        签到请求
-        """
         # 地址信息
         address_setting: dict[str, Any] = self.user.get("configInfo").get("addressSetting")
         # 实习计划信息
@@ -99,53 +94,89 @@ class SignIn:
             "isBeyondFence": None,
             "practiceAddress": None,
             "tpJobId": None,
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000))).lower()
+            "t": Signing.timestamp().lower()
         }
         # 构造请求头
-        self.session.headers.update({
-            "Sign": Utils.md5_encrypt(
-                data.get("device") + sing_in_type + plan_info.get("planId") + login_info.get(
-                    "userId") + address_setting.get(
-                    "address") + Constant.MD5_SALT)
-        })
+        self.update_sign_header(data)
         # 请求参数构造
         self.request_parameter_dict.update({
             "url": Constant.BASE_URL + "/attendence/clock/v4/save",
             "data": data
         })
+        return self.request_parameter_dict
+
+    def update_sign_header(self, data: dict[str, Any]) -> None:
+        # 地址信息
+        address_setting: dict[str, Any] = self.user.get("configInfo").get("addressSetting")
+        # 构造请求头
+        self.session.headers.update({
+            "Sign": Signing.clock_sign(self.user_login_info, data.get("device"), data.get("type"),
+                                       address_setting.get("address"))
+        })
+
+    def refresh_sign_in_request(self) -> dict[str, Any]:
+        # 重新登陆后，更新Sign以及data
+        data: dict[str, Any] = self.request_parameter_dict.get("data")
+        self.update_sign_header(data)
+        data.update({
+            "createTime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "t": Signing.timestamp().lower()
+        })
+        return self.request_parameter_dict
+
+    def check_sign_in_response(self, res: dict[str, Any]) -> None:
+        if res.get("code") != 200:
+            self.logger.error(f"签到失败 > 失败原因: {res.get('msg')}")
+            raise self.exception
+
+    def sign_in(self) -> None:
 
+        self.logger.info(f"签到")
+
+        """
+        签到请求
+        """
         # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+        res: dict = Utils.send_request(**self.build_sign_in_request())
 
         # 判断是否签到成功
         if res.get("code") == 401:
             # token失效
             self.logger.error(f"签到失败 > 失败原因: token失效 (即将重新获取token)")
             # 重新获取登陆信息
-            Login(self.module_parameter).login()
-            # 更新Sign以及data
-            self.session.headers.update({
-                "Sign": Utils.md5_encrypt(
-                    data.get("device") + sing_in_type + plan_info.get("planId") + login_info.get(
-                        "userId") + address_setting.get(
-                        "address") + Constant.MD5_SALT)
-            })
-            data.update({
-                "createTime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000))).lower()
-            })
+            Login(self.module_parameter).relogin()
             # 重新发送签到请求
-            res: dict = Utils.send_request(**self.request_parameter_dict)
+            res: dict = Utils.send_request(**self.refresh_sign_in_request())
 
-            # 仍未签到成功，则失败
-            if res.get("code") != 200:
-                self.logger.error(f"签到失败 > 失败原因: {res.get('msg')}")
-                raise self.exception
+        # 仍未签到成功，则失败
+        self.check_sign_in_response(res)
 
-        # 其他异常情况
-        elif res.get("code") != 200:
-            self.logger.error(f"签到失败 > 失败原因: {res.get('msg')}")
-            raise self.exception
+        self.logger.info(f"签到完成")
+
+
+class AsyncSignIn(SignIn):
+    """
+    签到模块的异步版本
+    """
+
+    async def sign_in(self) -> None:
+
+        self.logger.info(f"签到")
+
+        # 获取请求结果
+        res: dict = await AsyncUtils.send_request(**self.build_sign_in_request())
+
+        # 判断是否签到成功
+        if res.get("code") == 401:
+            # token失效
+            self.logger.error(f"签到失败 > 失败原因: token失效 (即将重新获取token)")
+            # 重新获取登陆信息
+            await AsyncLogin(self.module_parameter).relogin()
+            # 重新发送签到请求
+            res: dict = await AsyncUtils.send_request(**self.refresh_sign_in_request())
+
+        # 仍未签到成功，则失败
+        self.check_sign_in_response(res)
 
         self.logger.info(f"签到完成")
 
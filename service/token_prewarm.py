@@ -0,0 +1,95 @@
+import os
+import time
+from datetime import datetime
+from typing import Any
+
+from requests import Session
+
+from common.exception import BusinessException
+from common.signing import Signing
+from common.utils import Utils
+from service.login import Login
+
+
+class TokenPrewarm:
+    """
+    登陆信息预热，在用户任务到期前检查token是否有效，失效或即将失效时提前重新登陆，
+    使到期任务只需发送业务请求，而不必在任务时间窗口内执行验证码与登陆流程。
+    """
+
+    def __init__(self, module_parameter: dict[str, Any]) -> None:
+        # 模块参数
+        self.module_parameter = module_parameter
+        # 会话对象
+        self.session: Session = self.module_parameter.get("requests_session")
+        # 获取logger
+        self.logger = self.module_parameter.get("logger")
+        # 获取用户登陆信息
+        self.user_login_info: dict[str, Any] = self.module_parameter.get("user_login_info")
+        # 异常类
+        self.exception = BusinessException("预热登陆信息失败")
+
+    @staticmethod
+    def predict_expired(user_login_info: dict[str, Any], at: datetime, margin: float = None) -> bool:
+        """
+        根据token签发时间与观测到的有效期，预测token在指定时间是否已失效
+
+        :param user_login_info: 用户登陆信息
+        :param at: 预测时间
+        :param margin: 安全余量（秒），默认读取 TOKEN_EXPIRE_MARGIN_SECONDS
+        :return: 是否预测失效，没有观测数据时返回False
+        """
+        token_info: dict[str, Any] = user_login_info.get("tokenInfo") or {}
+        issued_at = token_info.get("issuedAt")
+        observed_lifetime = token_info.get("observedLifetime")
+        if not issued_at or not observed_lifetime:
+            return False
+
+        if margin is None:
+            margin = float(os.getenv("TOKEN_EXPIRE_MARGIN_SECONDS", "1800"))
+
+        return at.timestamp() >= issued_at + observed_lifetime - margin
+
+    def prewarm(self, due_time: datetime) -> None:
+        """
+        预热用户登陆信息
+
+        :param due_time: 用户下一次任务的到期时间
+        """
+        login = Login(self.module_parameter)
+
+        # 没有登陆信息，直接登陆
+        if not self.user_login_info.get("loginInfo"):
+            self.logger.info(f"预热登陆信息 > 未获取到登陆信息, 提前登陆")
+            login.login()
+            return
+
+        # 预测任务执行时token已失效，提前重新登陆
+        if self.predict_expired(self.user_login_info, due_time):
+            self.logger.info(f"预热登陆信息 > token预计在任务执行前失效, 提前重新登陆")
+            login.login()
+            return
+
+        # 发送一次实习计划请求验证token，同时刷新实习计划信息
+        login_info: dict[str, Any] = self.user_login_info.get("loginInfo")
+        self.session.headers.update({
+            "Authorization": login_info.get("token"),
+            "Sign": Signing.default_sign(self.user_login_info)
+        })
+        res: dict = Utils.send_request(**login.build_plan_request())
+
+        if res.get("code") == 401:
+            self.logger.info(f"预热登陆信息 > token已失效, 提前重新登陆")
+            login.relogin()
+            return
+
+        login.handle_plan_response(res)
+        self.user_login_info.setdefault("tokenInfo", {}).update({
+            "lastValidatedAt": time.time()
+        })
+        login.save_login_info()
+        self.logger.info(f"预热登陆信息 > token有效")
+
+
+if __name__ == '__main__':
+    pass
@@ -1,13 +1,20 @@
+import asyncio
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
 from requests import Session
 
+from common.async_utils import AsyncUtils
 from common.constant import Constant
 from common.exception import BusinessException
+from common.report_content_store import ReportContentStore
+from common.report_ledger import ReportLedger
+from common.signing import Signing
 from common.utils import Utils
-from service.login import Login
+from service.login import AsyncLogin, Login
 
 
 class WeeklyReport:
@@ -34,22 +41,13 @@ class WeeklyReport:
             "method": "post"
         }
 
-    def submit_weekly_report(self) -> None:
-        self.logger.info(f"处理周报")
-
+    def build_weeks_request(self) -> dict[str, Any]:
         # 实习计划信息
         plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
-        # 登陆信息
-        login_info: dict[str, Any] = self.user_login_info.get("loginInfo")
-        # 岗位信息
-        job_setting: dict[str, Any] = self.user.get("configInfo").get("jobSetting")
 
-        """
-        获取提交周
-        """
         # 构建请求体
         data = {
-            "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
+            "t": Signing.timestamp(),
             "planId": plan_info.get("planId")
         }
 
@@ -58,30 +56,23 @@ class WeeklyReport:
             "url": Constant.BASE_URL + "/practice/paper/v3/getWeeks1",
             "data": data
         })
+        return self.request_parameter_dict
 
-        # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
-
-        # 判断是否获取成功
-        if res.get("code") == 401:
-            # token失效
-            self.logger.error(f"获取提交周失败 > 失败原因: token失效 (即将重新获取token)")
-            # 重新获取登陆信息
-            Login(self.module_parameter).login()
-            # 更新data
-            data.update({
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000)))
-            })
-            # 重新发送请求
-            res: dict = Utils.send_request(**self.request_parameter_dict)
+    def refresh_weeks_request(self) -> dict[str, Any]:
+        # 重新登陆后，更新data
+        self.request_parameter_dict.get("data").update({
+            "t": Signing.timestamp()
+        })
+        return self.request_parameter_dict
 
-            # 仍未成功，则失败
-            if res.get("code") != 200:
-                self.logger.error(f"获取提交周失败 > 失败原因: {res.get('msg')}")
-                raise self.exception
+    def parse_weeks_response(self, res: dict[str, Any]) -> list[list[str]]:
+        """
+        解析提交周数据
 
-        # 其他异常情况
-        elif res.get("code") != 200:
+        :param res: 获取提交周请求的响应数据
+        :return: 提交时间列表，元素为 [结束时间, 开始时间]
+        """
+        if res.get("code") != 200:
             self.logger.error(f"获取提交周失败 > 失败原因: {res.get('msg')}")
             raise self.exception
 
@@ -94,30 +85,101 @@ class WeeklyReport:
                 _.get("startTime")
             ])
 
-        """
-        获取最后一次周报提交时间
-        """
+        return sub_time_list
+
+    def build_last_report_request(self) -> dict[str, Any]:
+        # 实习计划信息
+        plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
+
         # 构建请求头
         self.session.headers.update({
-            "Sign": Utils.md5_encrypt(
-                login_info.get("userId") + login_info.get("roleKey") + "week" + Constant.MD5_SALT)
+            "Sign": Signing.report_list_sign(self.user_login_info, "week")
         })
 
         # 请求参数构造
         self.request_parameter_dict.update({
             "url": Constant.BASE_URL + "/practice/paper/v2/listByStu",
             "data": {
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
+                "t": Signing.timestamp(),
                 "currPage": 1,
                 "pageSize": 25,
                 "planId": plan_info.get("planId"),
                 "reportType": "week"
             }
         })
+        return self.request_parameter_dict
 
-        # 获取请求结果
-        res: dict = Utils.send_request(**self.request_parameter_dict)
+    def refresh_last_report_request(self) -> dict[str, Any]:
+        # 重新登陆后，更新Sign以及data
+        return self.build_last_report_request()
+
+    def get_cached_weeks(self) -> list[list[str]] | None:
+        """
+        读取缓存的实习计划周历，仅保留已开始的周；周历未覆盖当前时间（实习计划结束前）时返回None
+
+        :return: 提交时间列表，元素为 [结束时间, 开始时间]
+        """
+        # 实习计划信息
+        plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
+        weeks = ReportLedger.get_instance().get_calendar(plan_info.get("planId"))
+        if weeks is None:
+            return None
+
+        now = datetime.now()
+        latest_end_time = max((datetime.strptime(week[0], '%Y-%m-%d %H:%M:%S') for week in weeks), default=None)
+        plan_end_time = plan_info.get("endTime")
+        if (latest_end_time is None or latest_end_time < now) and (
+                not plan_end_time or datetime.strptime(plan_end_time, '%Y-%m-%d %H:%M:%S') > now):
+            return None
+
+        return [week for week in weeks if datetime.strptime(week[1], '%Y-%m-%d %H:%M:%S') <= now]
+
+    def check_ledger(self, sub_time_list: list[list[str]]) -> tuple[int, list[list[str]]] | None:
+        """
+        根据本地提交记录判断是否没有需要提交的周报
+
+        :param sub_time_list: 提交时间列表
+        :return: 没有需要提交的周报时返回 (最后一次提交周, [])，否则返回None（需要请求服务端确认）
+        """
+        entry = ReportLedger.get_instance().get(
+            self.user.get("username"), self.user_login_info.get("planInfo").get("planId"), "week")
+        if not ReportLedger.get_instance().is_fresh(entry) or not entry.get("lastEndTime"):
+            return None
+
+        last_sub_time = datetime.strptime(entry.get("lastEndTime"), '%Y-%m-%d %H:%M:%S')
+        if any(datetime.strptime(week[1], '%Y-%m-%d %H:%M:%S') > last_sub_time for week in sub_time_list):
+            return None
+
+        return int(entry.get("lastPeriod")), []
+
+    def reconcile_weeks(self, sub_time_list: list[list[str]], res: dict[str, Any]) -> tuple[int, list[list[str]]]:
+        """
+        根据服务端提交列表计算需要提交周报的时间段，并更新本地提交记录
 
+        :param sub_time_list: 提交时间列表
+        :param res: 获取最后一次周报提交时间请求的响应数据
+        :return: 最后一次提交周, 需要提交周报的时间段
+        """
+        last_sub_week, need_sub_time_list = self.get_need_sub_time_list(sub_time_list, res)
+
+        if res.get("code") == 200:
+            weekly_report_data = res.get("data")
+            ReportLedger.get_instance().reconcile(
+                self.user.get("username"), self.user_login_info.get("planInfo").get("planId"), "week",
+                str(last_sub_week) if weekly_report_data else None,
+                weekly_report_data[0].get("endTime") if weekly_report_data else None)
+
+        return last_sub_week, need_sub_time_list
+
+    @staticmethod
+    def get_need_sub_time_list(sub_time_list: list[list[str]], res: dict[str, Any]) -> tuple[int, list[list[str]]]:
+        """
+        根据最后一次周报提交时间，计算需要提交周报的时间段
+
+        :param sub_time_list: 提交时间列表
+        :param res: 获取最后一次周报提交时间请求的响应数据
+        :return: 最后一次提交周, 需要提交周报的时间段
+        """
         # 周报数据
         weekly_report_data = res.get("data")
         last_sub_week = 0
@@ -139,68 +201,346 @@ class WeeklyReport:
                 if start_time > last_sub_time:
                     need_sub_time_list.append(time_period)
 
+        return last_sub_week, need_sub_time_list
+
+    def generate_content(self, sub_week: int) -> str:
+        """
+        利用ai生成周报内容，最多尝试3次
+
+        :param sub_week: 提交周
+        :return: 周报内容
+        """
+        # 岗位信息
+        job_setting: dict[str, Any] = self.user.get("configInfo").get("jobSetting")
+
+        content = None
+
+        for _ in range(1, 4):
+            # 利用ai生成周报
+            content = Utils.report_assistant(
+                f"撰写一份{job_setting.get('post')}第{sub_week}周周报，只要纯文本，语言简洁，不要太多的格式，以及不要出现具体的时间日期")
+            if type(content) == str:
+                break
+
+            self.logger.error(f"生成周报失败 > 失败原因: {content}")
+
+            # 如果已达到最大重试次数, 停止生成
+            if _ == 3:
+                self.logger.error(f"生成周报失败，超过最大重试次数！")
+                raise self.exception
+
+        return content
+
+    def get_content(self, sub_week: int) -> str:
+        """
+        获取周报内容，优先使用预生成的内容，没有则利用ai生成并保存，提交失败时无需重新生成
+
+        :param sub_week: 提交周
+        :return: 周报内容
+        """
+        store = ReportContentStore.get_instance()
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+
+        content = store.get_ready(self.user.get("username"), plan_id, "week", str(sub_week))
+        if content:
+            self.logger.info(f"使用已生成的第{sub_week}周周报内容")
+            return content
+
+        content = self.generate_content(sub_week)
+        store.put(self.user.get("username"), plan_id, "week", str(sub_week), content)
+        return content
+
+    def handle_save_response(self, res: dict[str, Any], sub_week: int, sub_time: list[str]) -> None:
+        """
+        检查提交周报结果，提交成功后将内容标记为已使用，并记录到本地提交记录
+
+        :param res: 提交周报请求的响应数据
+        :param sub_week: 提交周
+        :param sub_time: 提交周的时间段，[结束时间, 开始时间]
+        """
+        if res.get("code") != 200:
+            self.logger.error(f"提交第{sub_week}周周报失败 > 失败原因: {res.get('msg')}")
+            raise self.exception
+
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+        ReportContentStore.get_instance().mark_consumed(self.user.get("username"), plan_id, "week", str(sub_week))
+        ReportLedger.get_instance().record_submitted(self.user.get("username"), plan_id, "week", str(sub_week),
+                                                     sub_time[0])
+
+    def build_save_request(self, sub_week: int, sub_time: list[str], content: str) -> dict[str, Any]:
+        # 实习计划信息
+        plan_info: dict[str, Any] = self.user_login_info.get("planInfo")
+
+        # 构建请求体
+        data = {
+            "t": Signing.timestamp(),
+            "imageList": [],
+            "title": f"第{sub_week}周周记",
+            "content": content,
+            "planId": plan_info.get("planId"),
+            "reportType": "week",
+            "weeks": f"第{sub_week}周",
+            "startTime": sub_time[1],
+            "endTime": sub_time[0]
+        }
+        # 构建请求头
+        self.session.headers.update({
+            "Sign": Signing.report_save_sign(self.user_login_info, data["reportType"], data["title"])
+        })
+        # 请求参数构造
+        self.request_parameter_dict.update({
+            "url": Constant.BASE_URL + "/practice/paper/v6/save",
+            "data": data
+        })
+        return self.request_parameter_dict
+
+    def get_pending_weeks(self) -> tuple[int, list[list[str]]]:
+        """
+        获取需要提交周报的时间段，优先使用缓存的周历与本地提交记录，没有需要提交的周报时不请求服务端
+
+        :return: 最后一次提交周, 需要提交周报的时间段
+        """
+        # 获取提交周，优先使用缓存的周历
+        sub_time_list = self.get_cached_weeks()
+
+        if sub_time_list is None:
+            res: dict = Utils.send_request(**self.build_weeks_request())
+
+            # 判断是否获取成功
+            if res.get("code") == 401:
+                # token失效
+                self.logger.error(f"获取提交周失败 > 失败原因: token失效 (即将重新获取token)")
+                # 重新获取登陆信息
+                Login(self.module_parameter).relogin()
+                # 重新发送请求
+                res: dict = Utils.send_request(**self.refresh_weeks_request())
+
+            # 提交时间列表
+            sub_time_list = self.parse_weeks_response(res)
+            ReportLedger.get_instance().put_calendar(self.user_login_info.get("planInfo").get("planId"),
+                                                     sub_time_list)
+
+        # 本地提交记录显示没有需要提交的周报
+        result = self.check_ledger(sub_time_list)
+        if result is not None:
+            return result
+
+        """
+        获取最后一次周报提交时间
+        """
+        # 获取请求结果
+        res: dict = Utils.send_request(**self.build_last_report_request())
+
+        # 判断是否获取成功
+        if res.get("code") == 401:
+            # token失效
+            self.logger.error(f"获取最后一次周报失败 > 失败原因: token失效 (即将重新获取token)")
+            # 重新获取登陆信息
+            Login(self.module_parameter).relogin()
+            # 重新发送请求
+            res: dict = Utils.send_request(**self.refresh_last_report_request())
+
+        return self.reconcile_weeks(sub_time_list, res)
+
+    def pregenerate(self) -> None:
+        """
+        预先生成需要提交的周报内容并保存，不进行提交
+        """
+        self.logger.info(f"预生成周报内容")
+
+        last_sub_week, need_sub_time_list = self.get_pending_weeks()
+
+        store = ReportContentStore.get_instance()
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+
+        for _ in need_sub_time_list:
+            last_sub_week = last_sub_week + 1
+            if store.get_ready(self.user.get("username"), plan_id, "week", str(last_sub_week)):
+                continue
+
+            self.logger.info(f"预生成第{last_sub_week}周周报内容")
+            store.put(self.user.get("username"), plan_id, "week", str(last_sub_week),
+                      self.generate_content(last_sub_week))
+
+        self.logger.info(f"预生成周报内容完毕")
+
+    @staticmethod
+    def backlog_concurrency() -> int:
+        """
+        获取补交周报时同时生成内容的数量
+
+        :return: 同时生成内容的数量
+        """
+        return max(1, int(os.getenv("WEEKLY_BACKLOG_CONCURRENCY", "3")))
+
+    @staticmethod
+    def submit_interval() -> float:
+        """
+        获取连续提交周报的最小间隔时间（秒）
+
+        :return: 最小间隔时间
+        """
+        return max(0.0, float(os.getenv("WEEKLY_SUBMIT_INTERVAL", "60")))
+
+    def plan_backlog(self, last_sub_week: int, need_sub_time_list: list[list[str]]) -> list[tuple[int, list[str]]]:
+        """
+        计算需要提交的周及其时间段，跳过本地记录已提交成功的周（服务端列表尚未更新时避免重复提交）
+
+        :param last_sub_week: 最后一次提交周
+        :param need_sub_time_list: 需要提交周报的时间段（倒序）
+        :return: (提交周, 时间段) 列表，按提交顺序排列
+        """
+        store = ReportContentStore.get_instance()
+        plan_id: str = self.user_login_info.get("planInfo").get("planId")
+
+        backlog = []
+        for sub_week, sub_time in enumerate(reversed(need_sub_time_list), start=last_sub_week + 1):
+            if store.is_consumed(self.user.get("username"), plan_id, "week", str(sub_week)):
+                self.logger.info(f"第{sub_week}周周报已提交, 跳过")
+                continue
+            backlog.append((sub_week, sub_time))
+        return backlog
+
+    def submit_weekly_report(self) -> None:
+        self.logger.info(f"处理周报")
+
+        last_sub_week, need_sub_time_list = self.get_pending_weeks()
+        backlog = self.plan_backlog(last_sub_week, need_sub_time_list)
+
         # 需要提交周报的时间段为空，则不进行处理周报
-        if not need_sub_time_list:
+        if not backlog:
             self.logger.info(f"暂未需要处理的周报")
             return
 
         # 需要提交周报的时间段不为空，则进行周报提交
-        for sub_time in reversed(need_sub_time_list):
-            # 提交周
-            last_sub_week = last_sub_week + 1
+        # 后续周的内容在后台并发生成，与前面周的提交同时进行
+        executor = ThreadPoolExecutor(max_workers=min(len(backlog), self.backlog_concurrency()),
+                                      thread_name_prefix="weekly-report")
+        try:
+            futures = [executor.submit(self.get_content, sub_week) for sub_week, _ in backlog]
+            last_submit_time = None
+
+            for (sub_week, sub_time), future in zip(backlog, futures):
+                self.logger.info(f"提交第{sub_week}周周报")
+
+                self.logger.info(f"生成第{sub_week}周周报内容")
+
+                content = future.result()
+
+                # 按最小间隔时间控制提交速率
+                if last_submit_time is not None:
+                    wait = last_submit_time + self.submit_interval() - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+
+                """
+                提交周报
+                """
+                res: dict = Utils.send_request(**self.build_save_request(sub_week, sub_time, content))
+                last_submit_time = time.monotonic()
+                self.handle_save_response(res, sub_week, sub_time)
+
+                self.logger.info(f"提交第{sub_week}周周报成功")
+        finally:
+            # 提交失败时取消尚未开始的生成任务，已生成的内容保留在内容存储中
+            executor.shutdown(wait=False, cancel_futures=True)
 
-            self.logger.info(f"提交第{last_sub_week}周周报")
-
-            self.logger.info(f"生成第{last_sub_week}周周报内容")
-
-            content = None
-
-            for _ in range(1, 4):
-                # 利用ai生成周报
-                content = Utils.report_assistant(
-                    f"撰写一份{job_setting.get('post')}第{last_sub_week}周周报，只要纯文本，语言简洁，不要太多的格式，以及不要出现具体的时间日期")
-                if type(content) == str:
-                    break
-
-                self.logger.error(f"生成周报失败 > 失败原因: {content}")
-
-                # 如果已达到最大重试次数, 停止生成
-                if _ == 3:
-                    self.logger.error(f"生成周报失败，超过最大重试次数！")
-                    raise self.exception
-            """
-            提交周报
-            """
-            # 构建请求体
-            data = {
-                "t": Utils.aes_encrypt(str(int(time.time() * 1000))),
-                "imageList": [],
-                "title": f"第{last_sub_week}周周记",
-                "content": content,
-                "planId": plan_info.get("planId"),
-                "reportType": "week",
-                "weeks": f"第{last_sub_week}周",
-                "startTime": sub_time[1],
-                "endTime": sub_time[0]
-            }
-            # 构建请求头
-            self.session.headers.update({
-                "Sign": Utils.md5_encrypt(
-                    login_info.get("userId") + data["reportType"] + plan_info.get("planId") + data[
-                        "title"] + Constant.MD5_SALT)
-            })
-            # 请求参数构造
-            self.request_parameter_dict.update({
-                "url": Constant.BASE_URL + "/practice/paper/v6/save",
-                "data": data
-            })
-
-            # 提交周报
-            Utils.send_request(**self.request_parameter_dict)
-
-            self.logger.info(f"提交第{last_sub_week}周周报成功")
-
-            time.sleep(60)
+        self.logger.info(f"周报处理完毕")
+
+
+class AsyncWeeklyReport(WeeklyReport):
+    """
+    周报模块的异步版本
+    """
+
+    async def get_pending_weeks(self) -> tuple[int, list[list[str]]]:
+        # 获取提交周，优先使用缓存的周历
+        sub_time_list = self.get_cached_weeks()
+
+        if sub_time_list is None:
+            res: dict = await AsyncUtils.send_request(**self.build_weeks_request())
+
+            # 判断是否获取成功
+            if res.get("code") == 401:
+                # token失效
+                self.logger.error(f"获取提交周失败 > 失败原因: token失效 (即将重新获取token)")
+                # 重新获取登陆信息
+                await AsyncLogin(self.module_parameter).relogin()
+                # 重新发送请求
+                res: dict = await AsyncUtils.send_request(**self.refresh_weeks_request())
+
+            # 提交时间列表
+            sub_time_list = self.parse_weeks_response(res)
+            ReportLedger.get_instance().put_calendar(self.user_login_info.get("planInfo").get("planId"),
+                                                     sub_time_list)
+
+        # 本地提交记录显示没有需要提交的周报
+        result = self.check_ledger(sub_time_list)
+        if result is not None:
+            return result
+
+        # 获取最后一次周报提交时间
+        res: dict = await AsyncUtils.send_request(**self.build_last_report_request())
+
+        # 判断是否获取成功
+        if res.get("code") == 401:
+            # token失效
+            self.logger.error(f"获取最后一次周报失败 > 失败原因: token失效 (即将重新获取token)")
+            # 重新获取登陆信息
+            await AsyncLogin(self.module_parameter).relogin()
+            # 重新发送请求
+            res: dict = await AsyncUtils.send_request(**self.refresh_last_report_request())
+
+        return self.reconcile_weeks(sub_time_list, res)
+
+    async def submit_weekly_report(self) -> None:
+        self.logger.info(f"处理周报")
+
+        last_sub_week, need_sub_time_list = await self.get_pending_weeks()
+
+        backlog = self.plan_backlog(last_sub_week, need_sub_time_list)
+
+        # 需要提交周报的时间段为空，则不进行处理周报
+        if not backlog:
+            self.logger.info(f"暂未需要处理的周报")
+            return
+
+        # 需要提交周报的时间段不为空，则进行周报提交
+        # 后续周的内容在后台并发生成（ai生成为阻塞调用，放到线程中执行），与前面周的提交同时进行
+        semaphore = asyncio.Semaphore(self.backlog_concurrency())
+
+        async def generate(sub_week: int) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self.get_content, sub_week)
+
+        tasks = [asyncio.create_task(generate(sub_week)) for sub_week, _ in backlog]
+        try:
+            last_submit_time = None
+
+            for (sub_week, sub_time), task in zip(backlog, tasks):
+                self.logger.info(f"提交第{sub_week}周周报")
+
+                self.logger.info(f"生成第{sub_week}周周报内容")
+
+                content = await task
+
+                # 按最小间隔时间控制提交速率
+                if last_submit_time is not None:
+                    wait = last_submit_time + self.submit_interval() - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                # 提交周报
+                res: dict = await AsyncUtils.send_request(**self.build_save_request(sub_week, sub_time, content))
+                last_submit_time = time.monotonic()
+                self.handle_save_response(res, sub_week, sub_time)
+
+                self.logger.info(f"提交第{sub_week}周周报成功")
+        finally:
+            # 提交失败时取消尚未开始的生成任务，已生成的内容保留在内容存储中
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         self.logger.info(f"周报处理完毕")
 
@@ -0,0 +1,9 @@
+import pytest
+
+from common.logger_manager import LoggerManager
+
+
+@pytest.fixture(autouse=True, scope="session")
+def log_dir(tmp_path_factory: pytest.TempPathFactory) -> None:
+    # 测试产生的日志写入临时目录
+    LoggerManager.LOG_BASE_DIR = tmp_path_factory.mktemp("log")
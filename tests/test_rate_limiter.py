@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+from requests import HTTPError, Response
+from requests.exceptions import ReadTimeout
+
+from common.rate_limiter import DEFAULT_FAMILY, RateLimiter
+
+
+def http_error(status: int) -> HTTPError:
+    response = Response()
+    response.status_code = status
+    return HTTPError(response=response)
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "1")
+
+
+def test_success_increases_limit_additively() -> None:
+    limiter = RateLimiter("test", rate=0, initial_concurrency=4, max_concurrency=5)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(0.01)
+    # 4 个请求正常结束，并发上限约增加 1
+    assert limiter.limit == pytest.approx(4.92, abs=0.01)
+
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.limit == 5
+
+
+@pytest.mark.parametrize("error", [http_error(503), http_error(429), ReadTimeout()])
+def test_overload_halves_limit(error: Exception) -> None:
+    limiter = RateLimiter("test", rate=0, initial_concurrency=16)
+    limiter.acquire()
+    limiter.release(0.01, error)
+    assert limiter.limit == 8
+    assert limiter.in_flight == 0
+
+
+def test_client_error_keeps_limit() -> None:
+    limiter = RateLimiter("test", rate=0, initial_concurrency=16)
+    limiter.acquire()
+    limiter.release(0.01, http_error(404))
+    assert limiter.limit == 16
+
+
+def test_slow_response_halves_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_LATENCY_FLOOR_MS", "100")
+    limiter = RateLimiter("test", rate=0, initial_concurrency=16)
+    limiter.acquire()
+    limiter.release(0.05)
+    limit = limiter.limit
+
+    # 耗时超过基线耗时的 3 倍且超过最低阈值
+    limiter.acquire()
+    limiter.release(0.5)
+    assert limiter.limit == limit / 2
+
+
+def test_decrease_cooldown_and_minimum() -> None:
+    limiter = RateLimiter("test", rate=0, initial_concurrency=4, min_concurrency=2)
+    limiter.release(0.01, http_error(503))
+    limiter.release(0.01, http_error(503))
+    # 冷却时间内只减小一次
+    assert limiter.limit == 2
+
+    limiter.last_decrease -= RateLimiter.DECREASE_COOLDOWN
+    limiter.release(0.01, http_error(503))
+    assert limiter.limit == 2
+
+
+def test_concurrency_limit_blocks_until_release() -> None:
+    limiter = RateLimiter("test", rate=0, initial_concurrency=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()), daemon=True)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(0.01)
+    assert acquired.wait(1)
+    assert limiter.in_flight == 2
+
+
+def test_token_bucket_limits_rate() -> None:
+    limiter = RateLimiter("test", rate=10, initial_concurrency=64)
+    # 令牌桶容量为 1 秒的请求数
+    waited = [limiter.acquire() for _ in range(10)]
+    assert max(waited) < 0.05
+
+    assert limiter.acquire() >= 0.05
+
+
+def test_acquire_async_waits_for_tokens() -> None:
+    limiter = RateLimiter("test", rate=10, initial_concurrency=64)
+    for _ in range(10):
+        limiter.acquire()
+
+    assert asyncio.run(limiter.acquire_async()) >= 0.05
+    assert limiter.in_flight == 11
+
+
+def test_disabled_limiter_does_not_track_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")
+    limiter = RateLimiter("test", rate=1, initial_concurrency=1)
+    for _ in range(5):
+        assert limiter.acquire() == 0.0
+    assert limiter.in_flight == 0
+
+
+def test_for_url_groups_by_endpoint_family() -> None:
+    assert RateLimiter.for_url("https://api.example.com/session/captcha/v1/get").name == "captcha"
+    assert RateLimiter.for_url("https://api.example.com/attendence/clock/v4/save").name == "clock_save"
+    assert RateLimiter.for_url("https://other.example.com/practice/plan/v3/getPlanByStu").name == DEFAULT_FAMILY
+    assert (RateLimiter.for_url("https://api.example.com/session/captcha/v1/check")
+            is RateLimiter.for_url("https://other.example.com/session/captcha/v1/get"))
@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+from requests import HTTPError, Response
+
+from common.async_utils import AsyncUtils
+from common.exception import BusinessException
+from common.logger_manager import LoggerManager
+from common.retry_policy import CircuitBreaker
+from common.utils import Utils
+
+
+def http_error(status: int) -> HTTPError:
+    response = Response()
+    response.status_code = status
+    return HTTPError(response=response)
+
+
+def half_open_breaker(host: str) -> CircuitBreaker:
+    # 注册到熔断器表中（send_request 按主机获取），打开后立即可以进入半开状态
+    breaker = CircuitBreaker(host, failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    CircuitBreaker._BREAKERS[host] = breaker
+    breaker.record_failure()
+    time.sleep(0.02)
+    return breaker
+
+
+def request_config() -> dict:
+    return {
+        "logger": LoggerManager.get_system_logger(),
+        "business_exception": BusinessException("请求失败"),
+    }
+
+
+def test_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker("opens.test", failure_threshold=3, open_seconds=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_allows_limited_probes_and_closes_on_success() -> None:
+    breaker = CircuitBreaker("probe.test", failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.STATE_HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens() -> None:
+    breaker = CircuitBreaker("reopen.test", failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+
+    breaker.record_error(http_error(503))
+    assert breaker.state == CircuitBreaker.STATE_OPEN
+    assert not breaker.allow()
+
+
+def test_client_errors_do_not_count_as_failures() -> None:
+    breaker = CircuitBreaker("client-error.test", failure_threshold=1, open_seconds=60)
+    breaker.record_error(http_error(404))
+    assert breaker.state == CircuitBreaker.STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_release_probe_frees_half_open_slot() -> None:
+    breaker = CircuitBreaker("release.test", failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_unrecorded_probe_exception_does_not_wedge_breaker() -> None:
+    # 探测请求抛出 RequestException 以外的异常时，熔断器不能一直停留在半开状态
+    breaker = half_open_breaker("sync-probe.test")
+
+    class FailingSession:
+        def get(self, url: str, **kwargs) -> Response:
+            raise RuntimeError("unexpected")
+
+    config = dict(request_config(), session=FailingSession())
+    with pytest.raises(RuntimeError):
+        Utils.send_request(config, "http://sync-probe.test/api", retries=1)
+
+    assert breaker.state == CircuitBreaker.STATE_HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cancelled_async_probe_does_not_wedge_breaker() -> None:
+    breaker = half_open_breaker("async-probe.test")
+
+    class SlowClient:
+        async def request(self, method: str, url: str, **kwargs) -> None:
+            await asyncio.sleep(10)
+
+    async def main() -> None:
+        config = dict(request_config(), session=SlowClient())
+        task = asyncio.create_task(AsyncUtils.send_request(config, "http://async-probe.test/api", retries=1))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.state == CircuitBreaker.STATE_HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,132 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from common.roster import Roster
+
+
+def user(username: str, password: str = "secret", hour: Any = "09") -> dict[str, Any]:
+    return {
+        "username": username,
+        "phone": "13800000000",
+        "password": password,
+        "configInfo": {"timeSetting": {"signInTime": {"start": hour, "end": "18"}}},
+    }
+
+
+def write(path: Path, content: str) -> None:
+    # 推进修改时间，避免同一时钟刻度内的两次写入被视为未修改
+    mtime = path.stat().st_mtime_ns + 1_000_000 if path.exists() else None
+    path.write_text(content, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def write_json(path: Path, users: list[Any]) -> None:
+    write(path, json.dumps({"users": users}, ensure_ascii=False))
+
+
+def test_first_load_adds_all_users(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    write_json(path, [user("a"), user("b")])
+    roster = Roster(path)
+
+    diff = roster.load()
+    assert [item["username"] for item in diff.added] == ["a", "b"]
+    assert not (diff.changed or diff.removed or diff.errors)
+    assert list(roster.users) == ["a", "b"]
+
+
+def test_diff_between_loads(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    write_json(path, [user("a"), user("b"), user("c")])
+    roster = Roster(path)
+    roster.load()
+
+    write_json(path, [user("a", hour="10"), user("b", password="changed"), user("d")])
+    diff = roster.load()
+    assert [item["username"] for item in diff.added] == ["d"]
+    assert [item["username"] for item in diff.changed] == ["a", "b"]
+    assert diff.removed == ["c"]
+    assert diff.credentials_changed == ["b"]
+
+
+def test_unchanged_content_returns_empty_diff(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    write_json(path, [user("a")])
+    roster = Roster(path)
+    roster.load()
+
+    assert not roster.load()
+    # 仅修改时间变化（如被 touch）时不重新解析
+    write_json(path, [user("a")])
+    assert not roster.load()
+    assert list(roster.users) == ["a"]
+
+
+def test_invalid_and_duplicate_entries_are_skipped(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    invalid = dict(user("b"), password="")
+    write_json(path, [user("a"), invalid, ["not", "an", "object"], user("a", hour="10"), user("c", hour="25")])
+    roster = Roster(path)
+
+    diff = roster.load()
+    assert list(roster.users) == ["a", "c"]
+    assert roster.users["a"]["configInfo"]["timeSetting"]["signInTime"]["start"] == "09"
+    assert diff.errors == [
+        "第2个用户(b): 缺少 password",
+        "第3个用户: 用户配置不是JSON对象",
+        "第4个用户: 用户名称重复: a",
+    ]
+    assert diff.warnings == ["第5个用户(c): signInTime.start 无效: 25"]
+
+
+def test_malformed_file_is_reparsed_after_fix(tmp_path: Path) -> None:
+    path = tmp_path / "users.json"
+    write(path, "{")
+    roster = Roster(path)
+    try:
+        roster.load()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("JSON格式错误时应抛出异常")
+
+    write_json(path, [user("a")])
+    assert [item["username"] for item in roster.load().added] == ["a"]
+
+
+def test_jsonl_reports_line_numbers(tmp_path: Path) -> None:
+    path = tmp_path / "users.jsonl"
+    write(path, "\n".join([json.dumps(user("a")), "", "{broken", json.dumps(user("b"))]) + "\n")
+    roster = Roster(path)
+
+    diff = roster.load()
+    assert list(roster.users) == ["a", "b"]
+    assert len(diff.errors) == 1 and diff.errors[0].startswith("第3行: JSON格式错误")
+
+    # 修改一行，仅该用户变化
+    write(path, "\n".join([json.dumps(user("a")), json.dumps(user("b", hour="11"))]) + "\n")
+    diff = roster.load()
+    assert [item["username"] for item in diff.changed] == ["b"]
+    assert not (diff.added or diff.removed or diff.errors)
+
+
+def test_directory_tracks_added_changed_and_deleted_files(tmp_path: Path) -> None:
+    directory = tmp_path / "users"
+    directory.mkdir()
+    write(directory / "a.json", json.dumps(user("a")))
+    write(directory / "b.json", json.dumps(user("b")))
+    roster = Roster(directory)
+    assert len(roster.load().added) == 2
+    assert not roster.load()
+
+    write(directory / "a.json", json.dumps(user("a", password="changed")))
+    (directory / "b.json").unlink()
+    write(directory / "c.json", json.dumps(user("c")))
+    diff = roster.load()
+    assert [item["username"] for item in diff.added] == ["c"]
+    assert [item["username"] for item in diff.changed] == ["a"]
+    assert diff.removed == ["b"]
+    assert diff.credentials_changed == ["a"]
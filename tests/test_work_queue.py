@@ -0,0 +1,113 @@
+import types
+from pathlib import Path
+
+import pytest
+
+from common import work_queue
+from common.work_queue import WorkQueue
+
+
+class Clock:
+    """
+    可手动推进的时钟，替换 work_queue 模块中的 time
+    """
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(work_queue, "time", types.SimpleNamespace(time=clock.time))
+    monkeypatch.setenv("WORK_QUEUE_LEASE_SECONDS", "60")
+    monkeypatch.setenv("WORK_QUEUE_MAX_ATTEMPTS", "2")
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path: Path, clock: Clock) -> WorkQueue:
+    return WorkQueue(tmp_path / "work_queue.db")
+
+
+def user(username: str) -> dict:
+    return {"username": username, "password": "secret"}
+
+
+def test_enqueue_ignores_duplicate_slot_and_user(queue: WorkQueue, clock: Clock) -> None:
+    slot = "2026-10-18T09:00"
+    assert queue.enqueue(slot, [(user("a"), ["signIn"], clock.now), (user("b"), ["signIn"], clock.now)]) == 2
+    assert queue.enqueue(slot, [(user("a"), ["signIn"], clock.now), (user("c"), ["signIn"], clock.now)]) == 1
+    # 不同整点的同一用户单独入队
+    assert queue.enqueue("2026-10-18T10:00", [(user("a"), ["signIn"], clock.now)]) == 1
+
+    assert queue.stats(slot) == {WorkQueue.STATUS_PENDING: 3}
+    assert queue.stats() == {WorkQueue.STATUS_PENDING: 4}
+
+
+def test_claim_respects_available_at(queue: WorkQueue, clock: Clock) -> None:
+    queue.enqueue("slot", [(user("a"), ["signIn"], clock.now + 30)])
+    assert queue.claim("worker-1", 10) == []
+    assert queue.next_available() == clock.now + 30
+
+    clock.now += 30
+    jobs = queue.claim("worker-1", 10)
+    assert [(job.username, job.tasks, job.attempts) for job in jobs] == [("a", ["signIn"], 1)]
+    assert jobs[0].user == user("a")
+    # 已领取的任务不会被再次领取
+    assert queue.claim("worker-2", 10) == []
+
+
+def test_expired_lease_is_reclaimed(queue: WorkQueue, clock: Clock) -> None:
+    queue.enqueue("slot", [(user("a"), ["signIn"], clock.now)])
+    job = queue.claim("worker-1", 1)[0]
+
+    # 租约期内续约后不能被其他工作进程领取
+    clock.now += 50
+    assert queue.renew("worker-1") == 1
+    clock.now += 50
+    assert queue.claim("worker-2", 1) == []
+
+    # 租约过期后由其他工作进程重新领取
+    clock.now += 11
+    reclaimed = queue.claim("worker-2", 1)
+    assert [(item.id, item.attempts) for item in reclaimed] == [(job.id, 2)]
+
+
+def test_complete_rejected_after_another_worker_takes_job(queue: WorkQueue, clock: Clock) -> None:
+    queue.enqueue("slot", [(user("a"), ["signIn"], clock.now)])
+    job = queue.claim("worker-1", 1)[0]
+    clock.now += 61
+    assert queue.claim("worker-2", 1)
+
+    assert not queue.complete(job.id, "worker-1", True)
+    assert queue.renew("worker-1") == 0
+    assert queue.complete(job.id, "worker-2", True, duration=1.5)
+    assert queue.stats() == {WorkQueue.STATUS_SUCCEEDED: 1}
+    # 已结束的任务不能重复回报
+    assert not queue.complete(job.id, "worker-2", False, "重复回报")
+
+
+def test_job_fails_after_max_attempts(queue: WorkQueue, clock: Clock) -> None:
+    queue.enqueue("slot", [(user("a"), ["signIn"], clock.now)])
+    assert queue.claim("worker-1", 1)
+    clock.now += 61
+    assert queue.claim("worker-2", 1)
+
+    # 第二次领取的租约也过期后，领取次数已达上限，任务标记为失败
+    clock.now += 61
+    assert queue.claim("worker-3", 1) == []
+    assert queue.stats() == {WorkQueue.STATUS_FAILED: 1}
+
+
+def test_purge_removes_finished_jobs_only(queue: WorkQueue, clock: Clock) -> None:
+    queue.enqueue("slot", [(user("a"), ["signIn"], clock.now), (user("b"), ["signIn"], clock.now + 3600)])
+    job = queue.claim("worker-1", 10)[0]
+    assert queue.complete(job.id, "worker-1", False, "失败")
+
+    clock.now += 10
+    assert queue.purge(clock.now) == 1
+    assert queue.stats() == {WorkQueue.STATUS_PENDING: 1}